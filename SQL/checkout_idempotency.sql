@@ -0,0 +1,10 @@
+USE onlineshop;
+
+-- Idempotent checkout: every checkout form carries a random token that is
+-- stored with the order. The UNIQUE key makes a repeated submission
+-- (double click, proxy retry) fail instead of creating a second order;
+-- OrderMethods.place_order then returns the id of the first one.
+
+ALTER TABLE orders
+    ADD COLUMN idempotency_key CHAR(32) NULL,
+    ADD UNIQUE KEY uq_orders_idempotency_key (idempotency_key);
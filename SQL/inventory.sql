@@ -0,0 +1,15 @@
+USE onlineshop;
+
+-- Stock per product (models/orders/inventory.py).
+-- Kept out of `product` so stock updates during checkout do not lock the
+-- catalog row. Products without a row here are not stock-tracked.
+-- Checkout locks the rows of the ordered products (SELECT ... FOR UPDATE,
+-- in product_id order) and decrements them in the order transaction.
+
+CREATE TABLE IF NOT EXISTS inventory (
+    product_id INT PRIMARY KEY,
+    quantity   INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT chk_inventory_quantity CHECK (quantity >= 0),
+    FOREIGN KEY (product_id) REFERENCES product(product_id) ON DELETE CASCADE
+);
@@ -0,0 +1,16 @@
+USE onlineshop;
+
+-- Index of the invoice archive (models/orders/invoice_store.py):
+-- one row per order with the file in invoices/<shard>/, its size and
+-- checksum, so finding an invoice is a primary key read instead of a
+-- directory scan. Old flat files: python -m models.orders.invoice_store
+
+CREATE TABLE IF NOT EXISTS invoice_file (
+    order_id    INT PRIMARY KEY,
+    path        VARCHAR(255) NOT NULL,
+    size_bytes  INT NOT NULL,
+    sha256      CHAR(64) NOT NULL,
+    compression VARCHAR(10) NULL,
+    created_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE
+);
@@ -0,0 +1,23 @@
+USE onlineshop;
+
+-- Invoice generation queue (models/orders/invoice_jobs.py).
+-- checkout only inserts a 'pending' row; worker threads (or
+-- python -m models.orders.invoice_jobs) render the invoice file and set
+-- 'ready' + path. Failed attempts are retried with backoff up to
+-- max_attempts, then the job stays 'failed'.
+
+CREATE TABLE IF NOT EXISTS invoice_job (
+    order_id        INT PRIMARY KEY,
+    is_company      TINYINT(1) NOT NULL DEFAULT 0,
+    status          ENUM('pending','running','ready','failed') NOT NULL DEFAULT 'pending',
+    attempts        INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at      DATETIME NULL,
+    finished_at     DATETIME NULL,
+    path            VARCHAR(255) NULL,
+    last_error      VARCHAR(500) NULL,
+    created_at      DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_invoice_job_next (status, next_attempt_at),
+    FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE
+);
@@ -0,0 +1,20 @@
+USE onlineshop;
+
+-- Paged order history (/my_orders, OrderMethods.get_order_history_page):
+--  - subtotal (before company discount) is stored on the order header when
+--    the order is saved, so discounts and lifetime sums need no order_items join
+--  - the index serves "WHERE customer_id = ? ORDER BY order_date DESC, order_id DESC"
+--    and the keyset condition on (order_date, order_id)
+
+ALTER TABLE orders ADD COLUMN subtotal DECIMAL(10,2) NULL AFTER total;
+
+-- backfill existing orders
+UPDATE orders o
+JOIN (
+    SELECT order_id, ROUND(SUM(price * quantity), 2) AS subtotal
+    FROM order_items
+    GROUP BY order_id
+) s ON s.order_id = o.order_id
+SET o.subtotal = s.subtotal;
+
+CREATE INDEX idx_orders_customer_date ON orders (customer_id, order_date, order_id);
@@ -0,0 +1,40 @@
+USE onlineshop;
+
+-- Denormalized read model for the catalog: one row per product with
+-- subtype fields and rating aggregates (same columns as v_prod).
+-- Kept up to date by ProductMethods / ReviewMethods (models/products/read_model.py).
+-- Full rebuild:  python -m models.products.read_model
+
+CREATE TABLE IF NOT EXISTS product_read (
+    product_id     INT PRIMARY KEY,
+    product        VARCHAR(160) NOT NULL,
+    price          DECIMAL(10,2) NOT NULL,
+    weight         DECIMAL(10,2) NOT NULL,
+    category       ENUM('electronics','clothing','books') NOT NULL,
+
+    brand          VARCHAR(100),
+    warranty_years INT,
+    size           VARCHAR(20),
+    author         VARCHAR(160),
+    page_count     INT,
+
+    avg_rating     DOUBLE,
+    review_count   INT,
+
+    INDEX idx_product_read_category (category, product_id),
+    INDEX idx_product_read_price (price, product_id),
+    INDEX idx_product_read_name (product),
+    INDEX idx_product_read_brand (brand),
+    INDEX idx_product_read_author (author),
+    INDEX idx_product_read_size (size)
+);
+
+-- initial fill
+REPLACE INTO product_read
+SELECT
+    product_id, product, price, weight, category,
+    brand, warranty_years, size, author, page_count,
+    avg_rating, review_count
+FROM v_prod;
+
+SELECT * FROM product_read;
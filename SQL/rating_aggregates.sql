@@ -0,0 +1,71 @@
+USE onlineshop;
+
+-- Rating aggregates per product and per customer.
+-- Maintained incrementally by models/reviews/rating_aggregates.py in the same
+-- transaction as every review insert/delete, so v_rating no longer needs the
+-- GROUP BY views v_rating_products / v_rating_customers.
+
+CREATE TABLE IF NOT EXISTS product_rating (
+    product_id   INT PRIMARY KEY,
+    review_count INT    NOT NULL DEFAULT 0,
+    rating_sum   DOUBLE NOT NULL DEFAULT 0,
+    min_rating   FLOAT,
+    max_rating   FLOAT,
+    FOREIGN KEY (product_id) REFERENCES product(product_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS customer_rating (
+    customer_id  INT PRIMARY KEY,
+    review_count INT    NOT NULL DEFAULT 0,
+    rating_sum   DOUBLE NOT NULL DEFAULT 0,
+    min_rating   FLOAT,
+    max_rating   FLOAT,
+    FOREIGN KEY (customer_id) REFERENCES customers(customer_id) ON DELETE CASCADE
+);
+
+-- initial fill / full rebuild
+DELETE FROM product_rating;
+INSERT INTO product_rating (product_id, review_count, rating_sum, min_rating, max_rating)
+SELECT product_id, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+FROM review
+GROUP BY product_id;
+
+DELETE FROM customer_rating;
+INSERT INTO customer_rating (customer_id, review_count, rating_sum, min_rating, max_rating)
+SELECT customer_id, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+FROM review
+GROUP BY customer_id;
+
+-- v_rating on top of the aggregate tables: every join is a primary key lookup
+CREATE OR REPLACE VIEW v_rating AS
+SELECT
+    -- Review fields
+    r.review_id                                   AS review_id,
+    r.rating                                      AS review_rating,
+    r.comment                                     AS review_comment,
+    r.created_at                                  AS review_date,
+
+    -- Customer fields
+    c.customer_id                                 AS customer_id,
+    c.name                                        AS customer_name,
+    COALESCE(cr.review_count, 0)                  AS customer_total_reviews,
+    ROUND(cr.rating_sum / cr.review_count, 1)     AS customer_average_rating,
+    cr.min_rating                                 AS customer_min_rating,
+    cr.max_rating                                 AS customer_max_rating,
+
+    -- Product fields
+    p.product_id                                  AS product_id,
+    p.product                                     AS product_name,
+    p.category                                    AS category,
+    COALESCE(pr.review_count, 0)                  AS product_total_reviews,
+    ROUND(pr.rating_sum / pr.review_count, 1)     AS product_average_rating,
+    pr.min_rating                                 AS product_min_rating,
+    pr.max_rating                                 AS product_max_rating
+
+FROM review r
+JOIN customers c ON c.customer_id = r.customer_id
+JOIN product   p ON p.product_id   = r.product_id
+LEFT JOIN product_rating  pr ON pr.product_id  = p.product_id
+LEFT JOIN customer_rating cr ON cr.customer_id = c.customer_id;
+
+SELECT * FROM v_rating ORDER BY review_date DESC, review_id DESC;
@@ -5,22 +5,61 @@ from controllers.customers_controller import customers_bp
 from controllers.reviews_controller import reviews_bp
 from controllers.orders_controller import orders_bp
 
+from models.orders.invoice_jobs import invoice_queue
 from utils.cart_helpers import eur
+from utils.services import close_services
+from utils.request_metrics import request_metrics
+from utils.profiler import profiler
 
-app = Flask(__name__, template_folder="views/templates", static_folder="static")
 
-app.secret_key = "change_me_to_a_random_secret_key"
+def create_app(config: dict | None = None) -> Flask:
+    """
+    App factory. Importing this module or creating the app does not touch
+    the database: model services are created per app context on first use
+    (utils/services.py) and every process opens its own connection pool,
+    so pre-fork servers are safe:
 
-app.register_blueprint(products_bp)
-app.register_blueprint(customers_bp)
-app.register_blueprint(reviews_bp)
-app.register_blueprint(orders_bp)
+        gunicorn -w 4 "app:create_app()"
 
-app.jinja_env.filters["eur"] = eur
+    Call it once per process: request_metrics and profiler are process-wide
+    and register their hooks on the app they are given. It also starts the
+    invoice worker threads of the process (background DB work); without
+    --preload each gunicorn worker runs the factory and gets its own.
+    """
+    app = Flask(__name__, template_folder="views/templates", static_folder="static")
 
-@app.route("/")
-def home():
-    return render_template("home.html")
+    app.secret_key = "change_me_to_a_random_secret_key"
+    if config:
+        app.config.update(config)
 
+    app.register_blueprint(products_bp)
+    app.register_blueprint(customers_bp)
+    app.register_blueprint(reviews_bp)
+    app.register_blueprint(orders_bp)
+
+    app.jinja_env.filters["eur"] = eur
+
+    # ProductMethods, OrderMethods, ... of the request end with it
+    app.teardown_appcontext(close_services)
+
+    # ---- per-request SQL count / DB time / render time, Server-Timing, /metrics (needs METRICS_TOKEN) ----
+    request_metrics.init_app(app)
+
+    # ---- invoice worker threads of this process (INVOICE_WORKERS=False: none, e.g. tests) ----
+    if app.config.get("INVOICE_WORKERS", True):
+        invoice_queue.start()
+
+    # ---- on-demand sampling profiler, /admin/profile (needs PROFILER_TOKEN, gthread workers) ----
+    profiler.init_app(app)
+
+    @app.route("/")
+    def home():
+        return render_template("home.html")
+
+    return app
+
+
+# `python app.py`; `flask run` and WSGI servers use the factory ("app:create_app()"),
+# so importing this module builds no app
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -3,9 +3,11 @@ from cli.product_managment import run_product_management
 from cli.reviews_main import run_review_management
 from utils.input_helpers import pause
 from cli.orders_main import run_order_management
+from cli.presenters import setup_console_logging
 
 
 def main() -> None:
+    setup_console_logging()
     while True:
         print("\n====================")
         print(" MAIN MENU ")
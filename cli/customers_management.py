@@ -5,6 +5,7 @@ from utils.input_helpers import (
     pause,
 )
 from models.customers.validator import _Rules
+from cli.presenters import print_row, print_rows, print_rows_streamed
 
 def run_customer_management() -> None:
     cm = CustomerMethods()
@@ -25,13 +26,17 @@ def run_customer_management() -> None:
         match choice:
             case "1":
                 print("\n--- Show all customers ---")
-                cm.get_all_customers()
+                print_rows_streamed(
+                    cm.iter_all_customers(),
+                    empty_message="No customers found.",
+                    error_message="Error loading all customers:",
+                )
                 pause()
 
             case "2":
                 print("\n--- Show customer by ID ---")
                 customer_id = get_int_input("Customer ID: ")
-                cm.get_customer(customer_id)
+                print_row(cm.get_customer(customer_id), empty_message="No customers found with this ID.")
                 pause()
 
             case "3":
@@ -63,7 +68,7 @@ def run_customer_management() -> None:
                         birthdate=birthdate or None,
                         company_number=company_number or None,
                     )
-                    cm.get_customer(new_id)
+                    print_row(cm.get_customer(new_id), empty_message="No customers found with this ID.")
 
                 except ValueError as e:
                     # коротке повідомлення з Validator / save_customer
@@ -75,7 +80,7 @@ def run_customer_management() -> None:
             case "4":
                 print("\n--- Update customer ---")
                 customer_id = get_int_input("Customer ID: ")
-                cm.get_customer(customer_id)
+                print_row(cm.get_customer(customer_id), empty_message="No customers found with this ID.")
                 name = _Rules.clean_text_fields(optional_input("New name (blank = skip): ")).title()
                 address = _Rules.clean_text_fields(optional_input("New address (blank = skip): "))
                 phone = _Rules.clean_text_fields(optional_input("New phone (blank = skip): "))
@@ -87,7 +92,7 @@ def run_customer_management() -> None:
                         address=address or None,
                         phone=phone or None,
                     )
-                    cm.get_customer(customer_id)
+                    print_row(cm.get_customer(customer_id), empty_message="No customers found with this ID.")
                 except ValueError as e:
                     print(f" Input error: {e}")
                 pause()
@@ -105,7 +110,7 @@ def run_customer_management() -> None:
                     continue  #  Повертаємось на початок циклу customer-меню
 
                 # Show full customer info
-                cm.get_customer(customer_id)
+                print_row(cm.get_customer(customer_id), empty_message="No customers found with this ID.")
                 print(f"\nDo you really want to delete the customer {name}? (y/n)?")
                 choice = input("y/n: ").lower()
 
@@ -120,7 +125,7 @@ def run_customer_management() -> None:
                 print("\n--- Find customers by kind ---")
                 kind = input("Kind (private/company): ").strip().lower()
                 try:
-                    cm.find_customers_by_kind(kind)
+                    print_rows(cm.find_customers_by_kind(kind), empty_message="No customers for this kind.")
                 except ValueError as e:
                     print(f"Input error: {e}")
                 pause()
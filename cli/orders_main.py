@@ -1,9 +1,11 @@
 from models.orders.shopping_cart import ShoppingCart
 from models.orders.order_methods import OrderMethods
 from models.customers.customer_methods import CustomerMethods
-from models.orders.order import Order
+from models.orders.inventory import OutOfStockError
+from models.orders.invoice_store import InvoiceStore
 from models.products.product_methods import ProductMethods
 from utils.input_helpers import get_int_input, pause
+from cli.presenters import print_cart, print_row
 
 
 def run_order_management() -> None:
@@ -25,6 +27,7 @@ def run_order_management() -> None:
         print("4) Calculate total")
         print("5) Save order")
         print("6) Create invoice")
+        print("7) Show invoice")
         print("0) Back to main menu")
 
         choice = input("Select option: ").strip()
@@ -41,6 +44,7 @@ def run_order_management() -> None:
                     customer_id = get_int_input("Customer ID: ")
                     customer = cm.get_customer(customer_id)
                     if customer:
+                        print_row(customer)
                         cart.customer_id = customer_id
                         break
                     print("Invalid customer ID. Try again.")
@@ -61,7 +65,7 @@ def run_order_management() -> None:
                     cart.add_product(pid, qty)
 
                 # Show result
-                cart.show_cart(pm)
+                print_cart(cart, pm)
                 pause()
 
 
@@ -90,7 +94,7 @@ def run_order_management() -> None:
 
 
             case "3":
-                cart.show_cart(pm)
+                print_cart(cart, pm)
                 pause()
 
 
@@ -115,7 +119,12 @@ def run_order_management() -> None:
                     pause()
                     continue
 
-                order_id = om.save_order(cart, cart.is_company)
+                try:
+                    order_id = om.save_order(cart, cart.is_company)
+                except OutOfStockError as e:
+                    for line in e.lines:
+                        print(f"Product {line['product_id']}: {line['available']} in stock, {line['requested']} ordered.")
+                    order_id = None
                 if order_id:
                     print(f"Order saved! ID = {order_id}")
 
@@ -123,14 +132,22 @@ def run_order_management() -> None:
 
 
             case "6":
-                if not cart.products:
-                    print("Cart is empty.")
-                    pause()
-                    continue
+                # invoices belong to saved orders (option 5)
+                order_id = get_int_input("Order ID: ")
+                fname = om.create_invoice(order_id)
+                if fname:
+                    print("Invoice created:", fname)
+                pause()
+
 
-                order = Order(cart, is_company=cart.is_company)
-                fname = order.create_invoice()
-                print("Invoice created:", fname)
+            case "7":
+                order_id = get_int_input("Order ID: ")
+                try:
+                    text = InvoiceStore(om.storage).read(order_id)
+                except ValueError as e:   # checksum mismatch
+                    print(e)
+                    text = None
+                print(text if text is not None else f"No invoice for order {order_id}.")
                 pause()
 
 
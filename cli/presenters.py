@@ -0,0 +1,174 @@
+"""
+Console output for the CLI menus.
+
+The *Methods classes only return rows; everything that is printed as a
+table lives here and is used only by the cli/ package.
+"""
+import logging
+from itertools import islice
+
+from pymysql import MySQLError
+from tabulate import tabulate
+
+TABLE_FORMAT = "rounded_grid"
+
+
+def setup_console_logging(level: int = logging.INFO) -> None:
+    """
+    Show messages of the model layer (saved / updated / not found ...)
+    on the console. The web app keeps the default level (warnings only).
+    """
+    logging.basicConfig(level=level, format="%(message)s")
+
+
+def print_rows(rows, *, empty_message: str = "No rows found.") -> None:
+    """Print a list of dict rows as one table."""
+    if rows:
+        print(tabulate(rows, headers="keys", tablefmt=TABLE_FORMAT))
+    else:
+        print(empty_message)
+
+
+def print_row(row, *, empty_message: str = "Not found.") -> None:
+    """Print a single dict row as a table."""
+    print_rows([row] if row else [], empty_message=empty_message)
+
+
+def print_rows_streamed(
+        rows,
+        *,
+        batch_size: int = 50,
+        empty_message: str = "No rows found.",
+        error_message: str = "Error loading rows:",
+) -> int:
+    """
+    Print an iterable of dict rows (e.g. from Storage.iter_rows) as
+    tables of `batch_size` rows each, so only one batch is in memory.
+    A database error while streaming is printed with `error_message`
+    (the menu keeps running). Returns the number of printed rows.
+    """
+    it = iter(rows)
+    total = 0
+    try:
+        while True:
+            batch = list(islice(it, batch_size))
+            if not batch:
+                break
+            print(tabulate(batch, headers="keys", tablefmt=TABLE_FORMAT))
+            total += len(batch)
+    except MySQLError as e:
+        print(error_message, e)
+        return total
+    if total == 0:
+        print(empty_message)
+    else:
+        print(f"{total} rows.")
+    return total
+
+
+# ---------- products ----------
+
+_CATEGORY_COLUMNS = {
+    "books": ["ID", "Product", "Price", "Weight", "Author", "Pages", "AvgRating", "Reviews"],
+    "electronics": ["ID", "Product", "Price", "Weight", "Brand", "Warranty", "AvgRating", "Reviews"],
+    "clothing": ["ID", "Product", "Price", "Weight", "Size", "AvgRating", "Reviews"],
+}
+
+
+def print_products_by_category(rows: list[dict], category: str) -> None:
+    """Products of one category with only the columns of that category."""
+    if not rows:
+        print("No products for this category.")
+        return
+    headers = _CATEGORY_COLUMNS.get(category)
+    if headers is None:
+        print("Unknown category.")
+        return
+    table = [[row.get(h, "") for h in headers] for row in rows]
+    print(tabulate(table, headers=headers, tablefmt=TABLE_FORMAT))
+
+
+# ---------- reviews ----------
+
+def _review_lines(rows: list[dict]) -> list[dict]:
+    return [
+        {
+            "date": r["review_date"],
+            "rating": r["review_rating"],
+            "comment": r["review_comment"],
+        }
+        for r in rows
+    ]
+
+
+def print_reviews_for_product(rows: list[dict], product_id: int) -> None:
+    if not rows:
+        print(f"No reviews found for product ID {product_id}.")
+        return
+    first = rows[0]
+    print(f"Total {first['product_total_reviews']} reviews for product ID {product_id} "
+          f"{first['product_name']}, average rating: {first['product_average_rating']}/5")
+    print(tabulate(_review_lines(rows), headers="keys", tablefmt=TABLE_FORMAT))
+
+
+def print_reviews_for_customer(rows: list[dict], customer_id: int) -> None:
+    if not rows:
+        print(f"No reviews found for customer ID {customer_id}.")
+        return
+    first = rows[0]
+    print(f"Total {first['customer_total_reviews']} reviews written by customer "
+          f"ID {customer_id} {first['customer_name']}, average rating: {first['customer_average_rating']}/5")
+    print(tabulate(_review_lines(rows), headers="keys", tablefmt=TABLE_FORMAT))
+
+
+def print_product_rating_summary(row: dict | None, product_id: int) -> None:
+    if not row:
+        print(f"Product with ID {product_id} not found.")
+        return
+    print(f"Rating summary for product [{row['product_id']}] {row['product_name']}:")
+    if row["review_count"] == 0:
+        print("No reviews yet.")
+        return
+    print(f"Reviews: {row['review_count']}")
+    print(f"Average rating: {float(row['avg_rating']):.2f}/5")
+    print(f"Min rating: {float(row['min_rating']):.1f}")
+    print(f"Max rating: {float(row['max_rating']):.1f}")
+
+
+def print_customer_rating_summary(row: dict | None, customer_id: int) -> None:
+    if not row or not row["customer_total_reviews"]:
+        print(f"No reviews found for customer ID {customer_id}.")
+        return
+    print(f"Rating summary for customer {customer_id} {row['customer_name']}:")
+    print(f"Reviews: {row['customer_total_reviews']}")
+    print(f"Average rating: {float(row['customer_average_rating']):.2f}/5")
+    print(f"Min rating: {float(row['customer_min_rating']):.1f}")
+    print(f"Max rating: {float(row['customer_max_rating']):.1f}")
+
+
+# ---------- shopping cart ----------
+
+def print_cart(cart, pm) -> None:
+    """Cart lines with product data (one query via pm.get_products_by_ids)."""
+    if not cart.products:
+        print("Cart is empty.")
+        return
+
+    print("\n--- Shopping Cart ---")
+    products = pm.get_products_by_ids(cart.products.keys())
+    rows = []
+    for pid, qty in cart.products.items():
+        p = products.get(pid)
+        if not p:
+            continue
+        rows.append({
+            "product_id": p["product_id"],
+            "product": p["product"],
+            "price": p["price"],
+            "category": p["category"],
+            "brand": p["brand"],
+            "quantity": qty,
+        })
+
+    print(tabulate(rows, headers="keys", tablefmt=TABLE_FORMAT))
+    print(f"Total (last calculated) = {cart.total_sum:.2f} EUR")
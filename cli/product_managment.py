@@ -5,6 +5,13 @@ from utils.input_helpers import (
     pause, get_optional_int_input, get_float_input, get_optional_float_input
 )
 from models.customers.validator import _Rules
+from cli.presenters import (
+    print_products_by_category,
+    print_row,
+    print_rows,
+    print_rows_streamed,
+    setup_console_logging,
+)
 
 
 def run_product_management() -> None:
@@ -20,6 +27,7 @@ def run_product_management() -> None:
         print("5) Delete product")
         print("6) Find products by category")
         print("7) Find products under max price")
+        print("8) Rebuild product read model")
         print("0) Back / Exit")
 
         choice = input("Select option: ").strip()
@@ -27,13 +35,17 @@ def run_product_management() -> None:
         match choice:
             case "1":
                 print("\n--- Show all products ---")
-                pm.get_all_products()
+                print_rows_streamed(
+                    pm.iter_all_products(),
+                    empty_message="No products found.",
+                    error_message="Error loading all products:",
+                )
                 pause()
 
             case "2":
                 print("\n--- Show product by ID ---")
                 product_id = get_int_input("Product ID: ")
-                pm.get_product(product_id)
+                print_row(pm.get_product(product_id), empty_message="No product found.")
                 pause()
 
             case "3":
@@ -72,7 +84,7 @@ def run_product_management() -> None:
                     warranty_years=warranty_years,
                     size=size,
                 )
-                pm.get_product(new_id)
+                print_row(pm.get_product(new_id), empty_message="No product found.")
                 pause()
 
 
@@ -91,7 +103,7 @@ def run_product_management() -> None:
                     price=price,
                     weight=weight,
                 )
-                pm.get_product(product_id)
+                print_row(pm.get_product(product_id), empty_message="No product found.")
                 pause()
 
 
@@ -105,6 +117,8 @@ def run_product_management() -> None:
                     pause()
                     continue
 
+                print_row(row)
+
                 name = row ["product"]
 
                 confirm = input(f"Do you really want to delete '{name}' (ID {product_id})? [Y/N]: ").strip().lower()
@@ -145,14 +159,21 @@ def run_product_management() -> None:
 
                     category = categories[choice]
 
-                    pm.find_products_by_category(category)
+                    print_products_by_category(pm.find_products_by_category(category), category)
 
                     continue
 
             case "7":
                 print("\n--- Find products under max price ---")
                 max_price = get_float_input("Max price: ")
-                pm.find_products_under_price(max_price)
+                print_rows(pm.find_products_under_price(max_price), empty_message="No products under this price.")
+                pause()
+
+            case "8":
+                print("\n--- Rebuild product read model ---")
+                count = pm.read_model.rebuild()
+                pm.cache.invalidate()
+                print(f"product_read rebuilt: {count} products.")
                 pause()
 
             case "0":
@@ -167,4 +188,5 @@ def run_product_management() -> None:
 
 
 if __name__ == "__main__":
+    setup_console_logging()
     run_product_management()
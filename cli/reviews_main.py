@@ -1,7 +1,14 @@
-from tabulate import tabulate
-
 from models.reviews.review_methods import ReviewMethods
 from utils.input_helpers import get_int_input, optional_input, pause, get_float_input
+from cli.presenters import (
+    print_customer_rating_summary,
+    print_product_rating_summary,
+    print_reviews_for_customer,
+    print_reviews_for_product,
+    print_row,
+    print_rows_streamed,
+    setup_console_logging,
+)
 
 
 def run_review_management() -> None:
@@ -30,11 +37,11 @@ def run_review_management() -> None:
                 # 1) All reviews
                 case "1":
                     print("\n--- All reviews ---")
-                    rows = rm.get_all_reviews()
-                    if not rows:
-                        print("No reviews in the system yet.")
-                    else:
-                        print(tabulate(rows, headers="keys", tablefmt="rounded_grid"))
+                    print_rows_streamed(
+                        rm.iter_all_reviews(),
+                        empty_message="No reviews in the system yet.",
+                        error_message="Error loading reviews:",
+                    )
                     pause()
 
                 # 2) Create review
@@ -61,28 +68,28 @@ def run_review_management() -> None:
                 case "3":
                     print("\n--- Show reviews for product ---")
                     product_id = get_int_input("Product ID: ")
-                    rm.get_reviews_for_product(product_id)
+                    print_reviews_for_product(rm.get_reviews_for_product(product_id), product_id)
                     pause()
 
                 # 4) Rating summary for product
                 case "4":
                     print("\n--- Rating summary for product ---")
                     product_id = get_int_input("Product ID: ")
-                    rm.get_rating_summary_for_product(product_id)
+                    print_product_rating_summary(rm.get_rating_summary_for_product(product_id), product_id)
                     pause()
 
                 # 5) Reviews for customer
                 case "5":
                     print("\n--- Show reviews for customer ---")
                     customer_id = get_int_input("Customer ID: ")
-                    rm.get_reviews_for_customer(customer_id)
+                    print_reviews_for_customer(rm.get_reviews_for_customer(customer_id), customer_id)
                     pause()
 
                 # 6) Rating summary for customer
                 case "6":
                     print("\n--- Rating summary for customer ---")
                     customer_id = get_int_input("Customer ID: ")
-                    rm.get_rating_summary_for_customer(customer_id)
+                    print_customer_rating_summary(rm.get_rating_summary_for_customer(customer_id), customer_id)
                     pause()
 
                 # 7) Delete review
@@ -99,6 +106,7 @@ def run_review_management() -> None:
                         if not row:
                             print("No such review. Try again.")
                             continue
+                        print_row(row)
 
                         confirm = input(f"Do you really want to delete ID {review_id}? [Y/N]: ").strip().lower()
 
@@ -124,4 +132,5 @@ def run_review_management() -> None:
 
 
 if __name__ == "__main__":
+    setup_console_logging()
     run_review_management()
@@ -1,15 +1,31 @@
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql
 from pymysql.cursors import DictCursor
 
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "1111",
+    "database": "onlineshop",
+}
+
+# pool settings
+POOL_MAX_SIZE = 10          # max open connections per process
+POOL_TIMEOUT = 30.0         # seconds to wait for a free connection
+POOL_MAX_LIFETIME = 3600.0  # recycle connections older than this (seconds)
+
 
 def get_conn():
     """Create and return a connection to the onlineshop database."""
     try:
         conn = pymysql.connect(
-            host="localhost",
-            user="root",
-            password="1111",
-            database="onlineshop",
+            **DB_CONFIG,
             cursorclass=DictCursor,
             autocommit=False
         )
@@ -20,6 +36,224 @@ def get_conn():
         return None
 
 
+# every pool of this process, reset in a forked child
+_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+
+
+class PoolTimeoutError(pymysql.MySQLError):
+    """Raised when no connection becomes free within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of pymysql connections.
+
+    - acquire() / release(): plain checkout / checkin
+    - hold() / unhold() / lease(): per-thread checkout; nested leases in
+      the same thread reuse one connection, it goes back to the pool when
+      the outermost lease ends
+    - every borrowed connection is pinged first (pre-ping) and
+      connections older than max_lifetime are closed and replaced
+    - fork-safe: a child process starts with an empty pool and opens its
+      own connections (pre-fork WSGI servers, multiprocessing)
+    """
+
+    def __init__(
+        self,
+        factory=get_conn,
+        *,
+        max_size: int = POOL_MAX_SIZE,
+        timeout: float = POOL_TIMEOUT,
+        max_lifetime: float = POOL_MAX_LIFETIME,
+        pre_ping: bool = True,
+    ):
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+
+        self._idle: deque = deque()      # (conn, created_at), newest on the right
+        self._created: dict[int, float] = {}   # id(conn) -> created_at
+        self._size = 0                   # open connections (idle + borrowed)
+        self._cond = threading.Condition()
+        self._local = threading.local()  # per-thread lease: conn + depth
+        _pools.add(self)
+
+    # ---------- checkout / checkin ----------
+
+    def acquire(self):
+        """Borrow a healthy connection, waiting up to `timeout` seconds."""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, created = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No free database connection after {self.timeout:.0f}s "
+                        f"(pool size {self.max_size})."
+                    )
+                self._cond.wait(remaining)
+
+        if conn is None:
+            return self._open()
+
+        if time.monotonic() - created > self.max_lifetime or not self._is_alive(conn):
+            self._close(conn)
+            return self._open()
+
+        return conn
+
+    def release(self, conn) -> None:
+        """Return a connection; open transactions are rolled back first."""
+        if conn is None:
+            return
+        try:
+            # end the transaction/snapshot so the next borrower sees fresh data
+            conn.rollback()
+        except pymysql.MySQLError:
+            self.discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, self._created.get(id(conn), time.monotonic())))
+            self._cond.notify()
+
+    def hold(self):
+        """
+        Per-thread checkout. The first hold in a thread borrows a connection,
+        nested holds reuse it. Every hold() needs a matching unhold().
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._local.conn = self.acquire()
+        self._local.depth = depth + 1
+        return self._local.conn
+
+    def unhold(self) -> None:
+        """End one hold(); the outermost one gives the connection back."""
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            return
+        self._local.depth = depth - 1
+        if self._local.depth == 0:
+            conn = self._local.conn
+            self._local.conn = None
+            self.release(conn)
+
+    @contextmanager
+    def lease(self):
+        """hold() / unhold() as a `with` block."""
+        conn = self.hold()
+        try:
+            yield conn
+        finally:
+            self.unhold()
+
+    def current(self):
+        """Connection leased by the current thread, or None."""
+        return getattr(self._local, "conn", None)
+
+    def in_transaction(self) -> bool:
+        """Does the current thread have an open transaction on its lease?"""
+        return getattr(self._local, "in_tx", False)
+
+    def set_transaction(self, active: bool) -> None:
+        # kept next to the lease: every Storage of this thread shares the
+        # connection, so all of them must see the same transaction
+        self._local.in_tx = active
+
+    def close_all(self) -> None:
+        """Close all idle connections."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+    def discard(self, conn) -> None:
+        """Close a borrowed connection instead of returning it (frees its slot)."""
+        self._close(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    # ---------- internals ----------
+
+    def _forget_connections(self) -> None:
+        # after fork(): the sockets belong to the parent. Do not use them and
+        # do not close them either (COM_QUIT would end the parent's sessions).
+        self._idle = deque()
+        self._created = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def _open(self):
+        # the slot in _size is already reserved by acquire()
+        conn = None
+        try:
+            conn = self.factory()
+        finally:
+            if conn is None:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+        if conn is None:
+            raise pymysql.OperationalError("Could not open a database connection.")
+        self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _is_alive(self, conn) -> bool:
+        if not self.pre_ping:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _close(self, conn) -> None:
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _reset_pools_after_fork() -> None:
+    global _pool_lock
+    _pool_lock = threading.Lock()
+    for pool in list(_pools):
+        pool._forget_connections()
+
+
+if hasattr(os, "register_at_fork"):   # POSIX only; Windows has no fork()
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide connection pool (created on first use)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
 if __name__ == "__main__":   # test — runs only when the file is executed directly
     conn = get_conn()
     if conn:
@@ -27,4 +261,4 @@ if __name__ == "__main__":   # test — runs only when the file is executed dire
             cur.execute("SHOW TABLES;")
             for row in cur.fetchall():
                 print(row)
-        conn.close()
\ No newline at end of file
+        conn.close()
@@ -0,0 +1,165 @@
+import logging
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+# statements slower than this go to the slow query log
+SLOW_QUERY_MS = 200.0
+SLOW_QUERY_LOG = Path("logs") / "slow_queries.log"
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("warenwelt.slow_query")
+
+
+@dataclass
+class QueryEvent:
+    """One statement executed through Storage (passed to every hook)."""
+    sql: str
+    fingerprint: str
+    duration_ms: float
+    rows: int | None          # rows returned / affected (None if unknown)
+    caller: str               # e.g. "ProductMethods.get_products_filtered"
+    error: Exception | None = None
+
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")   # 'it''s' as well
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEAT_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_VALUES_RE = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """
+    Normalized SQL: literals and placeholders -> ?, lists -> (...),
+    whitespace collapsed. "WHERE id IN (%s, %s)" and "... IN (%s)" are the same.
+    """
+    fp = _STRING_RE.sub("?", sql)
+    fp = _PLACEHOLDER_RE.sub("?", fp)
+    fp = _NUMBER_RE.sub("?", fp)
+    fp = _LIST_RE.sub("(...)", fp)
+    fp = _REPEAT_RE.sub("...", fp)
+    fp = _VALUES_RE.sub(r"\1", fp)
+    return _SPACE_RE.sub(" ", fp).strip()
+
+
+def find_caller(skip_files: tuple[str, ...]) -> str:
+    """Qualified name of the first function outside `skip_files` on the stack."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.endswith(skip_files):
+            return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        frame = frame.f_back
+    return "?"
+
+
+class QueryStats:
+    """
+    Default Storage hook:
+      - aggregates count / total time / max time / rows per SQL fingerprint
+      - writes statements slower than `slow_ms` to the slow query log
+      - counts queries and DB time of the current request (per thread)
+    """
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, slow_log: Path | None = SLOW_QUERY_LOG):
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self._by_fingerprint: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._log_ready = False
+
+    def __call__(self, event: QueryEvent) -> None:
+        with self._lock:
+            entry = self._by_fingerprint.get(event.fingerprint)
+            if entry is None:
+                entry = self._by_fingerprint[event.fingerprint] = {
+                    "fingerprint": event.fingerprint,
+                    "callers": set(),
+                    "count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += event.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], event.duration_ms)
+            entry["rows"] += event.rows or 0
+            entry["callers"].add(event.caller)
+            if event.error is not None:
+                entry["errors"] += 1
+
+        if getattr(self._local, "active", False):
+            self._local.count += 1
+            self._local.total_ms += event.duration_ms
+
+        if event.duration_ms >= self.slow_ms:
+            self._log_slow(event)
+
+    # ---------- per request ----------
+
+    def start_request(self) -> None:
+        self._local.active = True
+        self._local.count = 0
+        self._local.total_ms = 0.0
+
+    def request_summary(self) -> dict:
+        """{"count": queries, "total_ms": DB time} since start_request()."""
+        summary = {
+            "count": getattr(self._local, "count", 0),
+            "total_ms": getattr(self._local, "total_ms", 0.0),
+        }
+        self._local.active = False
+        return summary
+
+    # ---------- reports ----------
+
+    def top(self, n: int = 20, by: str = "total_ms") -> list[dict]:
+        """Most expensive fingerprints (by total_ms, count, max_ms or rows)."""
+        with self._lock:
+            rows = [dict(e, callers=sorted(e["callers"])) for e in self._by_fingerprint.values()]
+        rows.sort(key=lambda e: e[by], reverse=True)
+        return rows[:n]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_fingerprint.clear()
+
+    def _log_slow(self, event: QueryEvent) -> None:
+        if not self._log_ready:
+            self._setup_slow_log()
+        slow_logger.warning(
+            "%.1f ms | rows=%s | %s | %s%s",
+            event.duration_ms,
+            event.rows,
+            event.caller,
+            event.fingerprint,
+            f" | error={event.error}" if event.error is not None else "",
+        )
+
+    def _setup_slow_log(self) -> None:
+        with self._lock:
+            if self._log_ready:
+                return
+            if self.slow_log and not slow_logger.handlers:
+                try:
+                    self.slow_log.parent.mkdir(parents=True, exist_ok=True)
+                    handler = logging.FileHandler(self.slow_log, encoding="utf-8")
+                    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                    slow_logger.addHandler(handler)
+                    slow_logger.setLevel(logging.WARNING)
+                except OSError as e:
+                    logger.warning("Could not open slow query log: %s", e)
+            self._log_ready = True
+
+
+# one instance per process, registered on Storage by default
+query_stats = QueryStats()
@@ -1,62 +1,271 @@
-from connection.db import get_conn
+import logging
+import time
+from contextlib import contextmanager
+
+from connection.db import ConnectionPool, get_pool
+from connection.instrumentation import QueryEvent, fingerprint, find_caller, query_stats
 from pymysql import MySQLError
+from pymysql.cursors import SSDictCursor
+
+logger = logging.getLogger(__name__)
+
+# files that are not reported as "caller" of a statement
+_INTERNAL_FILES = ("storage.py", "contextlib.py")
+
+
+class _Measurement:
+    rows: int | None = None
+
 
 class Storage:    # Storage class for database connection and queries.
-    def __init__(self):
+    """
+    Every query borrows a connection from the shared pool and gives it back
+    right after. Between begin() and commit()/rollback() the current thread
+    keeps its connection, so all statements of a transaction use the same one.
+    The transaction belongs to the thread's lease, not to the instance: other
+    Storage objects used in the same thread (RatingAggregates,
+    ProductReadModel, ...) join it and do not commit halfway.
+    """
+
+    # Hooks: callables receiving a QueryEvent after every statement
+    # (latency, rows, calling method). QueryStats is registered by default.
+    hooks: list = [query_stats]
+
+    @classmethod
+    def add_hook(cls, hook) -> None:
+        if hook not in cls.hooks:
+            cls.hooks.append(hook)
+
+    @classmethod
+    def remove_hook(cls, hook) -> None:
+        if hook in cls.hooks:
+            cls.hooks.remove(hook)
+
+    def __init__(self, pool: ConnectionPool | None = None):
         self.database_name = "onlineshop"
-        self.connection = None
+        self.pool = pool
 
     # Connect
     def connect(self):
-        try:
-            self.connection = get_conn()
-            if self.connection:
-                print("Storage connected to database.")
-            else:
-                print("Database connection failed.")
-        except MySQLError as e:
-            print("Connection error:", e)
+        # no socket is opened here – connections are borrowed per query
+        if self.pool is None:
+            self.pool = get_pool()
 
     # Disconnect
     def disconnect(self):
-        if self.connection:
-            self.connection.close()
-            print("Connection closed.")
+        # give back a connection this thread still holds (open transaction)
+        if self._in_transaction():
+            self.rollback()
 
-    # Methods for Queries
-    def execute(self, sql: str, params=None):
+    @property
+    def connection(self):
+        """Connection leased by the current thread (None outside a query/transaction)."""
+        return self._get_pool().current()
+
+    def _get_pool(self) -> ConnectionPool:
+        if self.pool is None:
+            self.pool = get_pool()
+        return self.pool
+
+    @contextmanager
+    def _borrow(self):
+        with self._get_pool().lease() as conn:
+            yield conn
+
+    # Transactions
+    def _in_transaction(self) -> bool:
+        return self._get_pool().in_transaction()
+
+    def begin(self):
+        """
+        Start a transaction; the thread keeps its connection until commit/rollback.
+        Not nestable: in MySQL a second BEGIN commits the open transaction,
+        so this raises instead – use transaction(), which joins it.
+        """
+        if self._in_transaction():
+            raise RuntimeError("A transaction is already open in this thread; use Storage.transaction() to join it.")
+        pool = self._get_pool()
+        conn = pool.hold()
+        pool.set_transaction(True)
+        conn.begin()
+
+    def commit(self):
+        if not self._in_transaction():
+            return
+        try:
+            self.connection.commit()
+        finally:
+            self._get_pool().set_transaction(False)
+            self._get_pool().unhold()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Transaction scope:
+            with storage.transaction():
+                storage.insert_and_get_id(...)
+                storage.execute_many(...)
+        Commits at the end of the block, rolls back (and re-raises) on error.
+        Inside an already open transaction the block simply joins it.
+        """
+        if self._in_transaction():
+            yield self
+            return
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def rollback(self):
+        if not self._in_transaction():
+            return
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                self.connection.commit()
-                if sql.lstrip().upper().startswith("INSERT"):
-                    return cursor.lastrowid
-                return cursor.rowcount
-        except Exception as e:
-            print("Error executing query:", e)
             self.connection.rollback()
-            return None
+        except MySQLError as e:
+            logger.error("Error during rollback: %s", e)
+        finally:
+            self._get_pool().set_transaction(False)
+            self._get_pool().unhold()
+
+    @contextmanager
+    def _measure(self, sql: str):
+        """Time one statement and report it to all hooks (also on error)."""
+        m = _Measurement()
+        error = None
+        start = time.perf_counter()
+        try:
+            yield m
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if self.hooks:
+                event = QueryEvent(
+                    sql=sql,
+                    fingerprint=fingerprint(sql),
+                    duration_ms=(time.perf_counter() - start) * 1000.0,
+                    rows=m.rows,
+                    caller=find_caller(_INTERNAL_FILES),
+                    error=error,
+                )
+                for hook in self.hooks:
+                    try:
+                        hook(event)
+                    except Exception as e:
+                        logger.warning("Storage hook %r failed: %s", hook, e)
+
+    # Methods for Queries
+    # Inside a transaction nothing is committed here and errors are re-raised,
+    # so the caller can roll back the whole unit of work.
+    def execute(self, sql: str, params=None):
+        with self._borrow() as conn:
+            try:
+                with self._measure(sql) as m, conn.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    m.rows = cursor.rowcount
+                    if not self._in_transaction():
+                        conn.commit()
+                    if sql.lstrip().upper().startswith("INSERT"):
+                        return cursor.lastrowid
+                    return cursor.rowcount
+            except Exception as e:
+                if self._in_transaction():
+                    raise
+                logger.error("Error executing query: %s", e)
+                conn.rollback()
+                return None
+
+    def execute_many(self, sql: str, rows) -> int | None:
+        """
+        Run one statement for many parameter rows.
+        For "INSERT ... VALUES (%s, ...)" pymysql sends multi-row VALUES
+        batches, so 200 rows are one round trip instead of 200.
+        Never commits per row: inside a transaction the caller commits,
+        otherwise there is exactly one commit at the end.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._borrow() as conn:
+            try:
+                with self._measure(sql) as m, conn.cursor() as cursor:
+                    affected = cursor.executemany(sql, rows)
+                    m.rows = affected
+                    if not self._in_transaction():
+                        conn.commit()
+                    return affected
+            except Exception as e:
+                if self._in_transaction():
+                    raise
+                logger.error("Error executing batch: %s", e)
+                conn.rollback()
+                return None
 
     def fetch_one(self, sql, params=None):
-        with self.connection.cursor() as cursor:
-            cursor.execute(sql, params)
-            return cursor.fetchone()
+        with self._borrow() as conn:
+            with self._measure(sql) as m, conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+                m.rows = 1 if row else 0
+                return row
 
     def fetch_all(self, sql, params=None):
-        with self.connection.cursor() as cursor:
-            cursor.execute(sql, params)
-            return cursor.fetchall()
+        with self._borrow() as conn:
+            with self._measure(sql) as m, conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+                m.rows = len(rows)
+                return rows
 
-    def insert_and_get_id(self, sql: str, params=None) -> int | None:
+    def iter_rows(self, sql, params=None, batch_size: int = 500):
+        """
+        Stream the result row by row (dicts) with an unbuffered server-side
+        cursor, so memory stays constant no matter how many rows there are.
+
+        Uses its own pooled connection (not the thread's lease): other
+        queries may run while the generator is being consumed.
+        Always consume it fully or close() it to give the connection back.
+        """
+        pool = self._get_pool()
+        conn = pool.acquire()
+        done = False
         try:
-            with self.connection.cursor() as cur:
-                cur.execute(sql, params)
-                self.connection.commit() #!!!
-                return cur.lastrowid or None
-        except Exception as e:
-            print("Error executing insert:", e)
-            self.connection.rollback() #!!!
-            return None
+            cursor = conn.cursor(SSDictCursor)
+            with self._measure(sql):
+                cursor.execute(sql, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+            cursor.close()
+            done = True
+        finally:
+            if done:
+                pool.release(conn)
+            else:
+                # stopped early / error: unread rows would have to be drained,
+                # dropping the connection is cheaper
+                pool.discard(conn)
+
+    def insert_and_get_id(self, sql: str, params=None) -> int | None:
+        with self._borrow() as conn:
+            try:
+                with self._measure(sql) as m, conn.cursor() as cur:
+                    cur.execute(sql, params)
+                    m.rows = cur.rowcount
+                    if not self._in_transaction():
+                        conn.commit() #!!!
+                    return cur.lastrowid or None
+            except Exception as e:
+                if self._in_transaction():
+                    raise
+                logger.error("Error executing insert: %s", e)
+                conn.rollback() #!!!
+                return None
 
 
 # test
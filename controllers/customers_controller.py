@@ -1,12 +1,13 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 
 from utils.cart_helpers import  check_password
-from models.customers.customer_methods import CustomerMethods
+from utils.services import get_customer_methods
 from models.customers.validator import Validator
 from pydantic import ValidationError
+from werkzeug.local import LocalProxy
 
 customers_bp = Blueprint("customers", __name__)
-cm = CustomerMethods()
+cm = LocalProxy(get_customer_methods)   # created per app context, see utils/services.py
 
 @customers_bp.route("/register", methods=["GET", "POST"])
 def register():
@@ -1,14 +1,24 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-from collections import Counter
+import uuid
+
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, abort
+from werkzeug.local import LocalProxy
 
 from models.orders.shopping_cart import ShoppingCart
-from models.orders.order import Order
-from models.orders.order_methods import OrderMethods
-from models.products.product_methods import ProductMethods
-from utils.cart_helpers import get_cart_ids, add_to_cart
+from models.orders.invoice_jobs import invoice_queue
+from models.orders.inventory import OutOfStockError
+from models.orders.invoice_store import InvoiceStore
+from utils.cart_helpers import (
+    get_cart_counts,
+    add_to_cart,
+    update_cart_quantity,
+    empty_cart,
+    calculate_cart_total,
+    eur,
+)
+from utils.services import get_order_methods, get_product_methods
 
 orders_bp = Blueprint("orders", __name__)
-pm = ProductMethods()
+pm = LocalProxy(get_product_methods)   # created per app context, see utils/services.py
 
 @orders_bp.route("/cart")
 def cart_view():
@@ -18,18 +28,17 @@ def cart_view():
       - line totals,
       - global total.
     """
-    cart_ids = get_cart_ids()
-    counts = Counter(cart_ids)
+    counts = get_cart_counts()
 
-    all_products = pm.get_all_products()
+    products_by_id = pm.get_products_by_ids(counts.keys())
 
     cart_products = []
     cart_total = 0.0
 
-    for p in all_products:
-        pid = p["product_id"]
-        qty = counts.get(pid, 0)
-        if qty <= 0:
+    for pid in sorted(counts):
+        p = products_by_id.get(pid)
+        qty = counts[pid]
+        if not p or qty <= 0:
             continue
 
         price_each = float(p["price"])
@@ -70,10 +79,8 @@ def add_to_cart_route(product_id: int):
 @orders_bp.route("/set_cart_quantity/<int:product_id>", methods=["POST"])
 def set_cart_quantity(product_id: int):
     """
-    Set exact quantity for given product_id in session cart.
-    Quantity is set by replacing all previous occurrences of this product_id.
+    Set exact quantity for given product_id in the session cart.
     """
-    cart = get_cart_ids()
     try:
         qty = int(request.form.get("qty", "0"))
     except ValueError:
@@ -82,48 +89,132 @@ def set_cart_quantity(product_id: int):
     if qty < 0:
         qty = 0
 
-    # remove all old occurrences of this product_id
-    cart = [pid for pid in cart if pid != product_id]
-    # add product_id qty times
-    cart.extend([product_id] * qty)
-    session["cart"] = cart
+    update_cart_quantity(product_id, qty)
 
     # redirect back to the same page (with anchor)
     return_url = request.form.get("return_url")
     if return_url:
         return redirect(return_url)
 
-    return redirect(request.referrer or url_for("product_list"))
+    return redirect(request.referrer or url_for("products.product_list"))
 
 @orders_bp.route("/clear_cart", methods=["POST"])
 def clear_cart():
     """
     Clear current cart in session.
     """
-    session["cart"] = []
+    empty_cart()
     return redirect(url_for("orders.cart_view"))
 
+# ====================== JSON CART API (static/js/cart_ajax.js) ======================
+
+def _requested_qty(default: int) -> int:
+    """`qty` from a JSON body or form field; invalid / negative -> 0."""
+    data = request.get_json(silent=True) or request.form
+    try:
+        qty = int(data.get("qty", default))
+    except (TypeError, ValueError):
+        qty = 0
+    return max(qty, 0)
+
+
+def _cart_summary(product_id: int | None = None) -> dict:
+    """
+    Item count and total of the session cart (+ the line of product_id).
+    Loads only the products in the cart, not the catalog.
+    """
+    counts = get_cart_counts()
+    products_by_id = pm.get_products_by_ids(counts.keys())
+    total = calculate_cart_total(products_by_id.values(), counts)
+
+    data = {
+        "item_count": sum(counts.values()),
+        "cart_total": round(total, 2),
+        "cart_total_eur": eur(total),
+    }
+    if product_id is not None:
+        p = products_by_id.get(product_id)
+        qty = counts.get(product_id, 0)
+        line_total = qty * float(p["price"]) if p else 0.0
+        data.update(
+            product_id=product_id,
+            quantity=qty,
+            line_total=round(line_total, 2),
+            line_total_eur=eur(line_total),
+        )
+    return data
+
+
+def _unknown_product(product_id: int):
+    return jsonify({"error": f"Product {product_id} not found."}), 404
+
+
+@orders_bp.route("/api/cart", methods=["GET"])
+def api_cart():
+    return jsonify(_cart_summary())
+
+
+@orders_bp.route("/api/cart/add/<int:product_id>", methods=["POST"])
+def api_cart_add(product_id: int):
+    """Add `qty` (default 1) of a product."""
+    if not pm.get_product_basic(product_id):
+        return _unknown_product(product_id)
+    add_to_cart(product_id, _requested_qty(1))
+    return jsonify(_cart_summary(product_id))
+
+
+@orders_bp.route("/api/cart/set/<int:product_id>", methods=["POST"])
+def api_cart_set(product_id: int):
+    """Set the exact quantity of a product (0 removes it)."""
+    qty = _requested_qty(0)
+    if qty > 0 and not pm.get_product_basic(product_id):
+        return _unknown_product(product_id)
+    update_cart_quantity(product_id, qty)
+    return jsonify(_cart_summary(product_id))
+
+
+@orders_bp.route("/api/cart/remove/<int:product_id>", methods=["POST"])
+def api_cart_remove(product_id: int):
+    update_cart_quantity(product_id, 0)
+    return jsonify(_cart_summary(product_id))
+
+
+@orders_bp.route("/api/cart/clear", methods=["POST"])
+def api_cart_clear():
+    empty_cart()
+    return jsonify(_cart_summary())
+
+
 @orders_bp.route("/checkout", methods=["GET", "POST"])
 def checkout():
     """
     Checkout page:
       - GET: show order summary and shipping method.
-      - POST: save order to DB, create invoice, clear cart and redirect to success page.
+      - POST: save order to DB, queue the invoice, clear cart and redirect to success page.
+    The form carries a one-time checkout_token; a repeated POST with the same
+    token redirects to the first order instead of creating another one.
     """
-    cart_ids = get_cart_ids()
-    if not cart_ids:
-        return redirect(url_for("cart_view"))
-
     customer_id = session.get("customer_id")
+    token = request.form.get("checkout_token") or None
+    om = get_order_methods()
+
+    if token and customer_id:
+        # retry after the first submission already went through (cart is empty by now)
+        existing = om.find_order_by_idempotency_key(token, customer_id)
+        if existing:
+            return redirect(url_for("orders.order_success", order_id=existing))
+
+    counts = get_cart_counts()
+    if not counts:
+        return redirect(url_for("orders.cart_view"))
+
     if not customer_id:
         flash("Please log in before checkout.", "error")
         return redirect(url_for("customers.login"))
 
     is_company = session.get("is_company", False)
 
-    all_products = pm.get_all_products()
-    counts = Counter(cart_ids)
-    products_by_id = {p["product_id"]: p for p in all_products}
+    products_by_id = pm.get_products_by_ids(counts.keys())
 
     items = []
     total = 0.00
@@ -148,14 +239,13 @@ def checkout():
     discount_factor = 0.95 if is_company else 1.0
     total_with_discount = total * discount_factor
 
-    om = OrderMethods()
-
     if request.method == "GET":
         return render_template(
             "checkout.html",
             items=items,
             total=total_with_discount,
             is_company=is_company,
+            checkout_token=uuid.uuid4().hex,
         )
 
     # POST: save order and create invoice
@@ -168,18 +258,27 @@ def checkout():
 
     cart.calculate_total_price(pm)
 
-    order_id = om.save_order(cart, is_company=is_company)
+    try:
+        order_id = om.save_order(cart, is_company=is_company, idempotency_key=token)
+    except OutOfStockError as e:
+        names = {item["product_id"]: item["product"] for item in items}
+        for line in e.lines:
+            name = names.get(line["product_id"], f"Product {line['product_id']}")
+            if line["available"]:
+                flash(f"{name}: only {line['available']} left (you ordered {line['requested']}).", "error")
+            else:
+                flash(f"{name} is out of stock.", "error")
+        return redirect(url_for("orders.cart_view"))
     if not order_id:
         flash("An error occurred while saving the order.", "error")
-        return redirect(url_for("cart_view"))
+        return redirect(url_for("orders.cart_view"))
 
-    # create invoice (only here, NOT in order_success)
-    order = Order(cart, is_company=is_company)
-    order.set_order_id(order_id)
-    order.create_invoice()
+    # invoice is rendered by the background worker (models/orders/invoice_jobs.py);
+    # one job per order, so a retried checkout does not queue a second one
+    invoice_queue.enqueue(order_id, is_company=is_company)
 
     # clear session cart
-    session["cart"] = []
+    empty_cart()
     return redirect(url_for("orders.order_success", order_id=order_id))
 
 @orders_bp.route("/order_success/<int:order_id>")
@@ -188,10 +287,11 @@ def order_success(order_id: int):
     Order success page:
       - loads order header and items from DB,
       - calculates subtotal / discount / total (based on company flag),
-      - shows summary and shipping method.
-    Invoice is already created during checkout, not here.
+      - shows summary, shipping method and invoice status (pending / ready / failed
+        with a "try again" button, see retry_invoice).
+    The invoice is queued during checkout, not created here.
     """
-    om = OrderMethods()
+    om = get_order_methods()
     try:
         # 1) Order header + basic customer data
         order_row = om.storage.fetch_one(
@@ -212,7 +312,7 @@ def order_success(order_id: int):
         )
 
         if not order_row:
-            return redirect(url_for("cart_view"))
+            return redirect(url_for("orders.cart_view"))
 
         # 2) Order items
         items = om.storage.fetch_all(
@@ -249,6 +349,9 @@ def order_success(order_id: int):
         # 4) Shipping method stored in session during checkout
         shipping_method = session.get("shipping_method", "standard")
 
+        # 5) Invoice job (None = not queued, e.g. orders from before the queue)
+        invoice = invoice_queue.status(order_id)
+
         return render_template(
             "order_success.html",
             order=order_row,
@@ -259,45 +362,81 @@ def order_success(order_id: int):
             total=total,
             is_company=is_company,
             shipping_method=shipping_method,
+            invoice=invoice,
         )
     finally:
         om.close()
 
+@orders_bp.route("/my_orders/<int:order_id>/invoice")
+def invoice(order_id: int):
+    """Invoice text of one of the customer's orders (from the invoice store)."""
+    customer_id = session.get("customer_id")
+    if not customer_id:
+        return redirect(url_for("customers.login"))
+
+    om = get_order_methods()
+    try:
+        owner = om.storage.fetch_one("SELECT customer_id FROM orders WHERE order_id = %s", (order_id,))
+        if not owner or owner["customer_id"] != customer_id:
+            abort(404)
+        try:
+            text = InvoiceStore(om.storage).read(order_id)
+        except ValueError:
+            # damaged file (checksum mismatch) – same answer as no invoice
+            text = None
+    finally:
+        om.close()
+
+    if text is None:
+        return "Invoice is not ready yet.", 404, {"Content-Type": "text/plain; charset=utf-8"}
+    return text, 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+@orders_bp.route("/my_orders/<int:order_id>/invoice/retry", methods=["POST"])
+def retry_invoice(order_id: int):
+    """Queue a failed invoice again (button on the order success page)."""
+    customer_id = session.get("customer_id")
+    if not customer_id:
+        return redirect(url_for("customers.login"))
+
+    om = get_order_methods()
+    try:
+        owner = om.storage.fetch_one("SELECT customer_id FROM orders WHERE order_id = %s", (order_id,))
+    finally:
+        om.close()
+    if not owner or owner["customer_id"] != customer_id:
+        abort(404)
+
+    if invoice_queue.requeue(order_id):
+        flash("The invoice is being created again.", "success")
+    return redirect(url_for("orders.order_success", order_id=order_id))
+
 @orders_bp.route("/my_orders")
 def my_orders():
     """
     "My orders" page:
-      - loads all orders for current customer,
-      - calculates subtotal/discount/total for each order and global sums.
+      - one page of the customer's orders (newest first, ?cursor= for older ones),
+      - subtotal/discount/total per order and lifetime sums come from SQL.
     """
     customer_id = session.get("customer_id")
     if not customer_id:
-        return redirect(url_for("login"))
-
-    om = OrderMethods()
-    orders = om.get_orders_with_items_for_customer(customer_id)
-
-    total_subtotal = 0.0
-    total_discount = 0.0
-    total_final = 0.0
-
-    for order in orders:
-        subtotal = sum(item["price"] * item["quantity"] for item in order["items"])
-        total = order["total"]
-        discount = subtotal - total
+        return redirect(url_for("customers.login"))
 
-        order["subtotal"] = subtotal
-        order["discount"] = discount
-        order["discount_percent"] = 5 if session.get("is_company") else 0
+    cursor = request.args.get("cursor") or None
 
-        total_subtotal += subtotal
-        total_discount += discount
-        total_final += total
+    om = get_order_methods()
+    try:
+        page = om.get_order_history_page(customer_id, cursor=cursor)
+        totals = om.get_order_totals(customer_id)
+    finally:
+        om.close()
 
     return render_template(
         "orders_history.html",
-        orders=orders,
-        total_subtotal=total_subtotal,
-        total_discount=total_discount,
-        total_final=total_final,
-    )
\ No newline at end of file
+        orders=page["orders"],
+        next_cursor=page["next_cursor"],
+        is_first_page=cursor is None,
+        order_count=totals["orders"],
+        total_subtotal=totals["subtotal"],
+        total_discount=totals["discount"],
+        total_final=totals["total"],
+    )
@@ -1,10 +1,13 @@
 from flask import Blueprint, render_template, request
-from models.products.product_methods import ProductMethods
-from utils.cart_helpers import get_cart_ids, calculate_cart_total
-from collections import Counter
+from werkzeug.local import LocalProxy
+
+from utils.services import get_product_methods
+from utils.cart_helpers import get_cart_counts, calculate_cart_total
 
 products_bp = Blueprint("products", __name__)
-pm = ProductMethods()
+pm = LocalProxy(get_product_methods)   # created per app context, see utils/services.py
+
+PAGE_SIZE = 50   # products per page on /products
 
 @products_bp.route("/products")
 def product_list():
@@ -17,8 +20,10 @@ def product_list():
     brand = request.args.get("brand", "").strip()
     author = request.args.get("author", "").strip()
     size = request.args.get("size", "").strip()
-    sort = request.args.get("sort", "id")
+    # searching without an explicit sort -> best matches first
+    sort = request.args.get("sort") or ("relevance" if search else "id")
     direction = request.args.get("dir", "asc")
+    cursor = request.args.get("cursor") or None
 
     if category == "electronics":
         author = ""
@@ -30,18 +35,11 @@ def product_list():
         brand = ""
         author = ""
 
-    all_products = pm.get_all_products()
-
-    cart_ids = get_cart_ids()
-    counts = Counter(cart_ids)
-    cart_total = calculate_cart_total(all_products, counts)
+    counts = get_cart_counts()
+    cart_total = calculate_cart_total(pm.get_products_by_ids(counts.keys()).values(), counts)
 
-    categories = sorted({p["category"] for p in all_products})
-    brands = sorted({p["brand"] for p in all_products if p.get("brand")})
-    authors = sorted({p["author"] for p in all_products if p.get("author")})
-    sizes = sorted({p["size"] for p in all_products if p.get("size")})
-
-    products = pm.get_products_filtered(
+    # sidebar values with counts for the current filters (one grouped query)
+    facets = pm.get_facets(
         search=search,
         category=category,
         brand=brand,
@@ -49,20 +47,27 @@ def product_list():
         size=size,
     )
 
-    def total_for(p):
-        return counts.get(p["product_id"], 0) * float(p["price"])
+    # sorting + paging happen in SQL (keyset on sort value, product_id)
+    page = pm.get_products_page(
+        search=search,
+        category=category,
+        brand=brand,
+        author=author,
+        size=size,
+        sort=sort,
+        direction=direction,
+        cursor=cursor,
+        limit=PAGE_SIZE,
+    )
+    products = page["products"]
 
-    key_map = {
-        "id":       lambda p: p["product_id"],
-        "name":     lambda p: p["product"],
-        "category": lambda p: p["category"],
-        "price":    lambda p: float(p["price"]),
-        "total":    total_for,
-        "rating":   lambda p: float(p["avg_rating"] or 0.0),
-    }
-    key_func = key_map.get(sort, key_map["id"])
-    reverse = (direction == "desc")
-    products = sorted(products, key=key_func, reverse=reverse)
+    # "total" depends on the session cart, so it can only sort the current page
+    if sort == "total":
+        products = sorted(
+            products,
+            key=lambda p: counts.get(p["product_id"], 0) * float(p["price"]),
+            reverse=(direction == "desc"),
+        )
 
     return render_template(
         "products.html",
@@ -77,8 +82,10 @@ def product_list():
         direction=direction,
         cart_total=cart_total,
         counts=counts,
-        categories=categories,
-        brands=brands,
-        authors=authors,
-        sizes=sizes,
+        categories=facets["category"],
+        brands=facets["brand"],
+        authors=facets["author"],
+        sizes=facets["size"],
+        next_cursor=page["next_cursor"],
+        prev_cursor=page["prev_cursor"],
     )
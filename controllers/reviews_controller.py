@@ -1,11 +1,18 @@
+import logging
+
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 
-from models.reviews.review_methods import ReviewMethods
+from werkzeug.local import LocalProxy
+
+from utils.services import get_review_methods
 from connection.storage import Storage
+from pymysql import MySQLError
+
+logger = logging.getLogger(__name__)
 
 reviews_bp = Blueprint("reviews", __name__)
 
-rm = ReviewMethods()
+rm = LocalProxy(get_review_methods)   # created per app context, see utils/services.py
 
 
 @reviews_bp.route("/reviews", methods=["GET", "POST"])
@@ -47,7 +54,7 @@ def reviews_view():
         if not customer_id:
             flash("Please log in to write a review.", "error")
             storage.disconnect()
-            return redirect(url_for("login"))
+            return redirect(url_for("customers.login"))
 
         try:
             product_id = int(request.form.get("product_id", "0"))
@@ -79,27 +86,26 @@ def reviews_view():
         elif rating < 1 or rating > 5:
             error = "Rating must be between 1 and 5."
         else:
-            storage.execute(
-                """
-                INSERT INTO review (customer_id, product_id, rating, comment)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (customer_id, product_id, rating, comment),
-            )
-            storage.connection.commit()
-            flash("Thank you for your review!", "success")
-            storage.disconnect()
-            # after successful insert, redirect back to GET with same filters
-            return redirect(
-                url_for(
-                    "reviews.reviews_view",
-                    search=search,
-                    category=category_filter,
-                    rating=rating_filter,
-                    sort=sort,
-                    dir=direction,
+            # review + rating aggregates + product read model in one transaction
+            try:
+                rm.insert_review(customer_id, product_id, rating, comment)
+            except MySQLError as e:
+                logger.error("Error saving review in /reviews: %s", e)
+                error = "Could not save your review. Please try again later."
+            else:
+                flash("Thank you for your review!", "success")
+                storage.disconnect()
+                # after successful insert, redirect back to GET with same filters
+                return redirect(
+                    url_for(
+                        "reviews.reviews_view",
+                        search=search,
+                        category=category_filter,
+                        rating=rating_filter,
+                        sort=sort,
+                        dir=direction,
+                    )
                 )
-            )
 
     # ----- 1) load all reviews with filters and sorting (FROM v_rating) -----
     where_clauses = []
@@ -1,9 +1,15 @@
+import logging
+
 from connection.storage import Storage
 from pymysql import MySQLError
-from tabulate import tabulate
 from models.customers.validator import Validator
+from models.products.catalog_cache import catalog_cache
+from models.products.read_model import ProductReadModel
+from models.reviews.rating_aggregates import RatingAggregates
 import pymysql
 
+logger = logging.getLogger(__name__)
+
 
 class CustomerMethods:
     # Methods for saving and loading customers.
@@ -53,39 +59,36 @@ class CustomerMethods:
                 if exists:
                     raise ValueError("Company number: this company number already exists. Please use another.")
 
-            # 3. Транзакція + вставка
-            self.storage.connection.begin()
-
-            sql_cus = """
-                INSERT INTO customers (name, email, address, phone, kind, password)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            new_id = self.storage.insert_and_get_id(
-                sql_cus, (name, email, address, phone, kind, password)
-            )
-            if not new_id:
-                # якщо insert не повернув id – це вже технічна помилка
-                raise RuntimeError("Insert failed: no new ID returned.")
-
-            # 4. Підтаблиці
-            if kind == "private":
-                self.storage.execute(
-                    "INSERT INTO private_customer (customer_id, birthdate) VALUES (%s, %s)",
-                    (new_id, birthdate)
-                )
-            else:
-                self.storage.execute(
-                    "INSERT INTO company_customer (customer_id, company_number) VALUES (%s, %s)",
-                    (new_id, company_number)
+            # 3. Транзакція + вставка (rollback при будь-якій помилці в блоці)
+            with self.storage.transaction():
+                sql_cus = """
+                    INSERT INTO customers (name, email, address, phone, kind, password)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """
+                new_id = self.storage.insert_and_get_id(
+                    sql_cus, (name, email, address, phone, kind, password)
                 )
+                if not new_id:
+                    # якщо insert не повернув id – це вже технічна помилка
+                    raise RuntimeError("Insert failed: no new ID returned.")
 
-            self.storage.connection.commit()
-            print(f"Customer saved successfully with ID {new_id}.")
+                # 4. Підтаблиці
+                if kind == "private":
+                    self.storage.execute(
+                        "INSERT INTO private_customer (customer_id, birthdate) VALUES (%s, %s)",
+                        (new_id, birthdate)
+                    )
+                else:
+                    self.storage.execute(
+                        "INSERT INTO company_customer (customer_id, company_number) VALUES (%s, %s)",
+                        (new_id, company_number)
+                    )
+
+            logger.info("Customer saved successfully with ID %s.", new_id)
             return new_id
 
         except pymysql.err.IntegrityError as e:
             #  дублікати email/номер компанії → теж як помилка введення
-            self.storage.connection.rollback()
             code = getattr(e, "args", [None])[0]
             msg = str(e).lower()
             if code == 1062 and "email" in msg:
@@ -99,8 +102,7 @@ class CustomerMethods:
 
         except pymysql.MySQLError as e:
             # «серйозні» помилки БД
-            self.storage.connection.rollback()
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             return None
 
         # НІЯКОГО `except Exception` тут – інакше ми знову з’їмо ValueError!
@@ -109,14 +111,9 @@ class CustomerMethods:
         """Load one customers by id from the cli v_cust."""
         try:
             sql = "SELECT * FROM v_customers WHERE customer_id = %s"
-            row = self.storage.fetch_one(sql, (customer_id,))
-            if row:
-                print(tabulate([row], headers="keys", tablefmt="rounded_grid"))
-            else:
-                print("No customers found with this ID.")
-            return row
+            return self.storage.fetch_one(sql, (customer_id,))
         except MySQLError as e:
-            print("Error loading customers:", e)
+            logger.error("Error loading customers: %s", e)
             return None
 
     def get_customer_name(self, customer_id: int) -> str | None:
@@ -132,13 +129,11 @@ class CustomerMethods:
         try:
             sql = "SELECT * FROM v_cust WHERE email = %s"
             row = self.storage.fetch_one(sql, (email,)) #tuple
-            if row:
-                print(tabulate([row], headers="keys", tablefmt="rounded_grid"))
-            else:
-                print("No customers found with this email.")
+            if not row:
+                logger.info("No customers found with this email.")
             return row
         except MySQLError as e:
-            print("Error loading customers:", e)
+            logger.error("Error loading customers: %s", e)
             return None
 
     def get_customer_by_id(self, customer_id: int) -> dict | None:
@@ -150,16 +145,16 @@ class CustomerMethods:
         """Load all customers from the cli v_customers."""
         try:
             sql = "SELECT * FROM v_customers ORDER BY customer_id DESC"
-            rows = self.storage.fetch_all(sql)
-            if rows:
-                print(tabulate(rows, headers="keys", tablefmt="rounded_grid"))
-            else:
-                print("No customers found.")
-            return rows
+            return self.storage.fetch_all(sql)
         except MySQLError as e:
-            print("Error loading all customers:", e)
+            logger.error("Error loading all customers: %s", e)
             return []
 
+    def iter_all_customers(self, batch_size: int = 500):
+        """Stream all customers from v_customers (constant memory, for CLI/exports)."""
+        sql = "SELECT * FROM v_customers ORDER BY customer_id DESC"
+        return self.storage.iter_rows(sql, batch_size=batch_size)
+
     def update_customer(
             self,
             customer_id: int,
@@ -217,30 +212,48 @@ class CustomerMethods:
                 vals.append(Validator.validate_password(password))
 
             if not sets:
-                print("Nothing to update.")
+                logger.info("Nothing to update.")
                 return False
 
             sql = f"UPDATE customers SET {', '.join(sets)} WHERE customer_id=%s"
             vals.append(customer_id)
             ok = self.storage.execute(sql, tuple(vals))
-            self.storage.connection.commit()
-            print(f"Customer {customer_id} updated.") if ok else print("No changes.")
+            self.storage.commit()
+            if ok:
+                logger.info("Customer %s updated.", customer_id)
+            else:
+                logger.info("No changes.")
             return bool(ok)
         except MySQLError as e:
-            self.storage.connection.rollback()
-            print("Update error:", e)
+            self.storage.rollback()
+            logger.error("Update error: %s", e)
             return False
         # ValueError від Validator нехай летить нагору → побачиш нормальне повідомлення в UI/меню
 
     def delete_customer(self, customer_id: int) -> bool:
+        """
+        Delete a customer. Their reviews go with them (ON DELETE CASCADE), so the
+        rating aggregates and product_read rows of the reviewed products are
+        re-computed in the same transaction, like when a single review is deleted.
+        """
+        aggregates = RatingAggregates(self.storage)
+        read_model = ProductReadModel(self.storage)
         try:
-            ok = self.storage.execute("DELETE FROM customers WHERE customer_id=%s", (customer_id,))
-            self.storage.connection.commit()
-            return bool(ok)
+            with self.storage.transaction():
+                reviewed = self.storage.fetch_all(
+                    "SELECT DISTINCT product_id FROM review WHERE customer_id=%s",
+                    (customer_id,)
+                ) or []
+                ok = self.storage.execute("DELETE FROM customers WHERE customer_id=%s", (customer_id,))
+                for row in reviewed:
+                    aggregates.refresh_product(row["product_id"])
+                    read_model.refresh_rating(row["product_id"])
         except MySQLError as e:
-            self.storage.connection.rollback()
-            print("Delete error:", e)
+            logger.error("Delete error: %s", e)
             return False
+        for row in reviewed:
+            catalog_cache.invalidate(row["product_id"])
+        return bool(ok)
 
     def find_customers_by_kind(self, kind: str) -> list[dict]:
         # якщо передадуть "privat" → тут одразу ValueError, і це добре
@@ -250,13 +263,9 @@ class CustomerMethods:
                 "SELECT * FROM v_customers WHERE kind=%s ORDER BY customer_id",
                 (kind,)
             )
-            if rows:
-                print(tabulate(rows, headers="keys", tablefmt="rounded_grid"))
-            else:
-                print("No customers for this kind.")
             return rows or []
         except MySQLError as e:
-            print("Find error:", e)
+            logger.error("Find error: %s", e)
             return []
 
     def close(self):
@@ -0,0 +1,190 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# which backend get_cart_store() creates: "sqlite" (file, survives restarts,
+# shared by all worker processes on this host) or "memory" (tests / one process)
+CART_STORE_BACKEND = "sqlite"
+CART_STORE_PATH = Path("instance") / "carts.sqlite3"
+CART_MAX_AGE = 30 * 24 * 3600.0   # carts untouched for longer are removed (seconds)
+CART_PURGE_INTERVAL = 3600.0      # each process removes expired carts at most this often
+
+
+class MemoryCartStore:
+    """
+    Web shop carts in a dict: cart_id -> {product_id: quantity}.
+    Lost on restart and not shared between processes – for tests and
+    single-process development.
+    """
+
+    def __init__(self):
+        self._carts: dict[str, dict[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cart_id: str) -> dict[int, int]:
+        with self._lock:
+            return dict(self._carts.get(cart_id, {}))
+
+    def add(self, cart_id: str, product_id: int, quantity: int = 1) -> int:
+        """Increase the quantity of one product, returns the new quantity."""
+        with self._lock:
+            cart = self._carts.setdefault(cart_id, {})
+            qty = max(cart.get(product_id, 0) + quantity, 0)
+            self._store(cart, product_id, qty)
+            return qty
+
+    def set_quantity(self, cart_id: str, product_id: int, quantity: int) -> int:
+        """Set the exact quantity (0 removes the product), returns it."""
+        with self._lock:
+            qty = max(quantity, 0)
+            self._store(self._carts.setdefault(cart_id, {}), product_id, qty)
+            return qty
+
+    def clear(self, cart_id: str) -> None:
+        with self._lock:
+            self._carts.pop(cart_id, None)
+
+    @staticmethod
+    def _store(cart: dict[int, int], product_id: int, qty: int) -> None:
+        if qty > 0:
+            cart[product_id] = qty
+        else:
+            cart.pop(product_id, None)
+
+
+class SQLiteCartStore:
+    """
+    Web shop carts in a local SQLite file: one row per (cart_id, product_id).
+    The session cookie only carries the cart id (see utils/cart_helpers.py).
+
+    Every write stamps all rows of the cart, so a cart expires as a whole
+    `max_age` seconds after its last change. Expired carts are removed on
+    start and then by the first write after every `purge_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = CART_STORE_PATH,
+        max_age: float = CART_MAX_AGE,
+        purge_interval: float = CART_PURGE_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # one connection per process, used by all threads behind a lock
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cart_item (
+                    cart_id    TEXT    NOT NULL,
+                    product_id INTEGER NOT NULL,
+                    quantity   INTEGER NOT NULL,
+                    updated_at REAL    NOT NULL,
+                    PRIMARY KEY (cart_id, product_id)
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cart_item_updated ON cart_item (updated_at)")
+        self.purge_expired()
+
+    def get(self, cart_id: str) -> dict[int, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT product_id, quantity FROM cart_item WHERE cart_id = ?", (cart_id,)
+            ).fetchall()
+        return {product_id: quantity for product_id, quantity in rows}
+
+    def add(self, cart_id: str, product_id: int, quantity: int = 1) -> int:
+        """Increase the quantity of one product, returns the new quantity."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT quantity FROM cart_item WHERE cart_id = ? AND product_id = ?",
+                    (cart_id, product_id),
+                ).fetchone()
+                qty = max((row[0] if row else 0) + quantity, 0)
+                self._store(cart_id, product_id, qty)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._purge_if_due()
+        return qty
+
+    def set_quantity(self, cart_id: str, product_id: int, quantity: int) -> int:
+        """Set the exact quantity (0 removes the product), returns it."""
+        qty = max(quantity, 0)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._store(cart_id, product_id, qty)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._purge_if_due()
+        return qty
+
+    def clear(self, cart_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cart_item WHERE cart_id = ?", (cart_id,))
+
+    def purge_expired(self) -> int:
+        """Remove carts not touched for max_age seconds (one DELETE). Returns removed rows."""
+        with self._lock:
+            self._next_purge = time.monotonic() + self.purge_interval
+            cur = self._conn.execute(
+                "DELETE FROM cart_item WHERE updated_at < ?", (time.time() - self.max_age,)
+            )
+        return cur.rowcount
+
+    def _purge_if_due(self) -> None:
+        if time.monotonic() >= self._next_purge:
+            self.purge_expired()
+
+    def _store(self, cart_id: str, product_id: int, qty: int) -> None:
+        """Write one row and stamp the whole cart (caller holds the lock and a transaction)."""
+        now = time.time()
+        self._conn.execute("UPDATE cart_item SET updated_at = ? WHERE cart_id = ?", (now, cart_id))
+        if qty > 0:
+            self._conn.execute(
+                """
+                INSERT INTO cart_item (cart_id, product_id, quantity, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (cart_id, product_id)
+                DO UPDATE SET quantity = excluded.quantity, updated_at = excluded.updated_at
+                """,
+                (cart_id, product_id, qty, now),
+            )
+        else:
+            self._conn.execute(
+                "DELETE FROM cart_item WHERE cart_id = ? AND product_id = ?", (cart_id, product_id)
+            )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_cart_store():
+    """The cart store of this process (backend from CART_STORE_BACKEND)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MemoryCartStore() if CART_STORE_BACKEND == "memory" else SQLiteCartStore()
+    return _store
+
+
+def set_cart_store(store) -> None:
+    """Replace the process-wide store (e.g. MemoryCartStore() in tests)."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,99 @@
+from connection.storage import Storage
+
+
+class OutOfStockError(ValueError):
+    """
+    Raised by Inventory.reserve() when at least one line cannot be served.
+    `lines`: [{"product_id", "requested", "available"}, ...] – every short line.
+    """
+
+    def __init__(self, lines: list[dict]):
+        self.lines = lines
+        super().__init__(
+            "Not enough stock: "
+            + ", ".join(f"product {l['product_id']} ({l['available']} of {l['requested']})" for l in lines)
+        )
+
+
+class Inventory:
+    """
+    Stock per product in the `inventory` table (SQL/inventory.sql).
+    Products without an inventory row are not tracked (unlimited).
+    """
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+
+    def reserve(self, lines: dict[int, int]) -> None:
+        """
+        Take {product_id: quantity} out of stock. Must run inside the order
+        transaction (Storage.transaction()): the rows stay locked until the
+        order commits, a rollback puts the stock back.
+
+        Rows are locked in product_id order, so two checkouts with the same
+        products cannot deadlock. All lines are checked before anything is
+        changed; OutOfStockError lists every short line.
+        Call it as late as possible in the transaction – hot products are
+        locked from here until commit.
+        """
+        ids = sorted(pid for pid, qty in lines.items() if qty > 0)
+        if not ids:
+            return
+
+        rows = self.storage.fetch_all(
+            f"""
+            SELECT product_id, quantity
+            FROM inventory
+            WHERE product_id IN ({', '.join(['%s'] * len(ids))})
+            ORDER BY product_id
+            FOR UPDATE
+            """,
+            ids,
+        ) or []
+        stock = {row["product_id"]: row["quantity"] for row in rows}
+
+        short = [
+            {"product_id": pid, "requested": lines[pid], "available": stock[pid]}
+            for pid in ids
+            if pid in stock and stock[pid] < lines[pid]
+        ]
+        if short:
+            raise OutOfStockError(short)
+
+        tracked = [(lines[pid], pid) for pid in ids if pid in stock]
+        if tracked:
+            self.storage.execute_many(
+                "UPDATE inventory SET quantity = quantity - %s WHERE product_id = %s",
+                tracked,
+            )
+
+    def get_stock(self, product_ids) -> dict[int, int]:
+        """{product_id: quantity} for tracked products among product_ids."""
+        ids = list(dict.fromkeys(int(pid) for pid in product_ids))
+        if not ids:
+            return {}
+        rows = self.storage.fetch_all(
+            f"SELECT product_id, quantity FROM inventory WHERE product_id IN ({', '.join(['%s'] * len(ids))})",
+            ids,
+        ) or []
+        return {row["product_id"]: row["quantity"] for row in rows}
+
+    def set_stock(self, product_id: int, quantity: int) -> None:
+        """Set the stock of a product (starts tracking it)."""
+        self.storage.execute(
+            """
+            INSERT INTO inventory (product_id, quantity) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE quantity = VALUES(quantity)
+            """,
+            (product_id, max(int(quantity), 0)),
+        )
+
+    def restock(self, product_id: int, quantity: int) -> None:
+        """Add stock (delivery, cancelled order)."""
+        self.storage.execute(
+            """
+            INSERT INTO inventory (product_id, quantity) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+            """,
+            (product_id, int(quantity)),
+        )
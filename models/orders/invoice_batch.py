@@ -0,0 +1,171 @@
+"""
+Re-issue invoices for many orders at once (e.g. after a template change).
+
+    python -m models.orders.invoice_batch --from-id 1 --to-id 5000
+    python -m models.orders.invoice_batch --from-date 2025-11-01 --to-date 2025-11-30 --workers 8
+
+Orders, customers and order items are read with a few set-based queries
+per chunk, invoices are rendered, compressed and written (atomically) in a
+process pool, and the invoice_file index is updated in one batch per chunk.
+"""
+import argparse
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from connection.storage import Storage
+from models.orders.order import render_invoice
+from models.orders.invoice_store import InvoiceStore, write_invoice_file
+
+CHUNK_SIZE = 500   # orders per set of queries / index batch
+
+
+def _render_and_write(job: tuple) -> dict:
+    """Worker process: invoice text -> compressed file. Returns the index row."""
+    order, items, root, compression = job
+    text = render_invoice(
+        order["order_id"],
+        order,            # row contains the customer columns
+        items,
+        order["kind"] == "company",
+        order["customer_id"],
+        order["order_date"],   # a regenerated invoice keeps the date of its order
+    )
+    return write_invoice_file(order["order_id"], text, root, compression)
+
+
+class InvoiceBatch:
+    """Bulk invoice regeneration for a range of order ids or order dates."""
+
+    def __init__(self, store: InvoiceStore | None = None, workers: int | None = None, chunk_size: int = CHUNK_SIZE):
+        self.storage = Storage()
+        self.storage.connect()
+        self.store = store or InvoiceStore(self.storage)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def order_ids(
+        self,
+        from_id: int | None = None,
+        to_id: int | None = None,
+        from_date: date | None = None,
+        to_date: date | None = None,
+    ) -> list[int]:
+        """Ids of the orders in the range (all bounds inclusive, None = open)."""
+        sql = "SELECT order_id FROM orders WHERE 1 = 1"
+        params: list = []
+        if from_id is not None:
+            sql += " AND order_id >= %s"
+            params.append(from_id)
+        if to_id is not None:
+            sql += " AND order_id <= %s"
+            params.append(to_id)
+        if from_date is not None:
+            sql += " AND order_date >= %s"
+            params.append(from_date)
+        if to_date is not None:
+            sql += " AND order_date < %s"
+            params.append(to_date + timedelta(days=1))
+        sql += " ORDER BY order_id"
+        return [row["order_id"] for row in self.storage.fetch_all(sql, params) or []]
+
+    def _load_chunk(self, ids: list[int]) -> list[tuple[dict, list[dict]]]:
+        """Headers + customers (1 query) and all items (1 query) of these orders."""
+        placeholders = ", ".join(["%s"] * len(ids))
+        orders = self.storage.fetch_all(
+            f"""
+            SELECT o.order_id, o.customer_id, o.order_date, c.name, c.email, c.address, c.phone, c.kind
+            FROM orders o
+            JOIN customers c ON c.customer_id = o.customer_id
+            WHERE o.order_id IN ({placeholders})
+            ORDER BY o.order_id
+            """,
+            ids,
+        ) or []
+        items_by_order: dict[int, list[dict]] = defaultdict(list)
+        for row in self.storage.iter_rows(
+            f"""
+            SELECT d.order_id, d.product_id, p.product, d.quantity, d.price
+            FROM order_items d
+            JOIN product p ON p.product_id = d.product_id
+            WHERE d.order_id IN ({placeholders})
+            ORDER BY d.order_id, d.product_id
+            """,
+            ids,
+        ):
+            items_by_order[row.pop("order_id")].append(row)
+
+        return [(order, items_by_order.get(order["order_id"], [])) for order in orders]
+
+    def run(self, ids: list[int], progress=print) -> dict:
+        """
+        Regenerate the invoices of `ids`. Returns {"done", "failed", "seconds"}.
+        "failed" counts invoices that could not be written or indexed.
+        progress(message) is called after every chunk.
+        """
+        started = time.monotonic()
+        done = failed = 0
+        total = len(ids)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for start in range(0, total, self.chunk_size):
+                chunk = self._load_chunk(ids[start:start + self.chunk_size])
+                jobs = [
+                    (order, items, str(self.store.root), self.store.compression)
+                    for order, items in chunk
+                ]
+                entries = []
+                futures = [pool.submit(_render_and_write, job) for job in jobs]
+                for job, future in zip(jobs, futures):
+                    try:
+                        entries.append(future.result())
+                    except Exception as e:
+                        failed += 1
+                        progress(f"  order {job[0]['order_id']}: {e}")
+                try:
+                    self.store.index_many(entries)
+                    done += len(entries)
+                except RuntimeError as e:
+                    # files are written but not findable – a re-run fixes them
+                    failed += len(entries)
+                    progress(f"  index update failed for {len(entries)} orders: {e}")
+
+                elapsed = time.monotonic() - started
+                handled = min(start + self.chunk_size, total)
+                progress(
+                    f"{handled}/{total} orders ({handled * 100 // max(total, 1)}%), "
+                    f"{done} written, {failed} failed, {done / elapsed if elapsed else 0:.1f}/s"
+                )
+
+        return {"done": done, "failed": failed, "seconds": round(time.monotonic() - started, 2)}
+
+    def close(self):
+        self.storage.disconnect()
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate invoices for a range of orders.")
+    parser.add_argument("--from-id", type=int)
+    parser.add_argument("--to-id", type=int)
+    parser.add_argument("--from-date", type=date.fromisoformat, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--to-date", type=date.fromisoformat, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    if args.from_id is None and args.to_id is None and args.from_date is None and args.to_date is None:
+        parser.error("give an id range (--from-id/--to-id) and/or a date range (--from-date/--to-date)")
+    return args
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    batch = InvoiceBatch(workers=args.workers, chunk_size=args.chunk_size)
+    try:
+        ids = batch.order_ids(args.from_id, args.to_id, args.from_date, args.to_date)
+        print(f"{len(ids)} orders, {batch.workers} worker processes.")
+        result = batch.run(ids)
+        print(f"Done: {result['done']} invoices written, {result['failed']} failed in {result['seconds']} s.")
+    finally:
+        batch.close()
@@ -0,0 +1,260 @@
+import argparse
+import logging
+import os
+import threading
+import time
+
+from connection.storage import Storage
+from models.orders.order import Order
+from models.orders.shopping_cart import ShoppingCart
+
+logger = logging.getLogger(__name__)
+
+INVOICE_WORKER_THREADS = 2
+INVOICE_MAX_ATTEMPTS = 5
+INVOICE_RETRY_DELAY = 30       # seconds before the 1st retry, doubled for every next one
+INVOICE_POLL_INTERVAL = 5.0    # seconds between looks at the job table when idle
+INVOICE_STALE_AFTER = 600      # a 'running' job older than this was lost (crash) -> pending again
+
+
+class InvoiceQueue:
+    """
+    Durable invoice queue on the invoice_job table (SQL/invoice_job.sql).
+
+    - enqueue(order_id) is one INSERT IGNORE – one job per order, so a
+      repeated checkout cannot produce a second invoice
+    - worker threads claim pending jobs, render the invoice with
+      Order.create_invoice() and store status / path
+    - failures are retried with exponential backoff, after
+      max_attempts the job is 'failed'; requeue() / requeue_failed()
+      (customer's "try again" button, `--requeue-failed`) start it over
+    - jobs of a crashed worker ('running' for too long) are put back
+      to 'pending' regularly, not only when a worker starts
+    - jobs survive restarts: create_app() starts the workers of every web
+      process, so whatever is pending (or was left 'running') is picked up
+      right after a restart, as by `python -m models.orders.invoice_jobs`
+    """
+
+    def __init__(
+        self,
+        workers: int = INVOICE_WORKER_THREADS,
+        max_attempts: int = INVOICE_MAX_ATTEMPTS,
+        retry_delay: int = INVOICE_RETRY_DELAY,
+        poll_interval: float = INVOICE_POLL_INTERVAL,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.storage = Storage()
+        self.storage.connect()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._pid = None
+        self._next_stale_check = 0.0
+
+    # ---------- producer side ----------
+
+    def enqueue(self, order_id: int, is_company: bool = False) -> None:
+        """Queue the invoice of an order (no-op if it is already queued)."""
+        self.storage.execute(
+            "INSERT IGNORE INTO invoice_job (order_id, is_company) VALUES (%s, %s)",
+            (order_id, int(is_company)),
+        )
+        self._wake()
+
+    def status(self, order_id: int) -> dict | None:
+        """{"status", "path", "attempts", "last_error"} of the job, or None."""
+        return self.storage.fetch_one(
+            "SELECT status, path, attempts, last_error FROM invoice_job WHERE order_id = %s",
+            (order_id,),
+        )
+
+    def requeue(self, order_id: int) -> bool:
+        """Give a 'failed' job a fresh set of attempts. False if it was not failed."""
+        changed = self.storage.execute(
+            """
+            UPDATE invoice_job
+            SET status = 'pending', attempts = 0, next_attempt_at = NOW(), last_error = NULL
+            WHERE order_id = %s AND status = 'failed'
+            """,
+            (order_id,),
+        )
+        if changed:
+            self._wake()
+        return bool(changed)
+
+    def requeue_failed(self) -> int:
+        """requeue() for every failed job. Returns the number of jobs."""
+        changed = self.storage.execute(
+            """
+            UPDATE invoice_job
+            SET status = 'pending', attempts = 0, next_attempt_at = NOW(), last_error = NULL
+            WHERE status = 'failed'
+            """
+        )
+        if changed:
+            self._wake()
+        return changed or 0
+
+    def _wake(self) -> None:
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+
+    # ---------- workers ----------
+
+    def start(self) -> None:
+        """
+        Start the worker threads of this process (idempotent, also after fork).
+        Does not touch the database itself; the first worker loop requeues
+        stale jobs and picks up what is pending.
+        """
+        if self._pid == os.getpid() and self._threads:
+            return
+        with self._wakeup:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._next_stale_check = 0.0   # -> _requeue_stale() first thing in _run()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"invoice-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_pending(self) -> int:
+        """Process all due jobs in the calling thread. Returns the number processed."""
+        done = 0
+        while (order_id := self._claim_next()) is not None:
+            self._process(order_id)
+            done += 1
+        return done
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= self._next_stale_check:
+                    self._next_stale_check = time.monotonic() + INVOICE_STALE_AFTER / 2
+                    self._requeue_stale()
+                if self.run_pending():
+                    continue
+            except Exception as e:   # DB down etc. – keep the worker alive
+                logger.error("Invoice worker error: %s", e)
+            with self._wakeup:
+                self._wakeup.wait(self.poll_interval)
+
+    def _requeue_stale(self) -> None:
+        self.storage.execute(
+            """
+            UPDATE invoice_job
+            SET status = 'pending', next_attempt_at = NOW()
+            WHERE status = 'running' AND started_at < NOW() - INTERVAL %s SECOND
+            """,
+            (INVOICE_STALE_AFTER,),
+        )
+
+    def _claim_next(self) -> int | None:
+        """Mark the oldest due job as running; None if there is none."""
+        while True:
+            row = self.storage.fetch_one(
+                """
+                SELECT order_id FROM invoice_job
+                WHERE status = 'pending' AND next_attempt_at <= NOW()
+                ORDER BY next_attempt_at
+                LIMIT 1
+                """
+            )
+            if not row:
+                return None
+            # only one worker (thread or process) wins the UPDATE
+            claimed = self.storage.execute(
+                """
+                UPDATE invoice_job
+                SET status = 'running', attempts = attempts + 1, started_at = NOW()
+                WHERE order_id = %s AND status = 'pending'
+                """,
+                (row["order_id"],),
+            )
+            if claimed is None:   # DB error (already logged by Storage)
+                return None
+            if claimed:
+                return row["order_id"]
+
+    def _process(self, order_id: int) -> None:
+        job = self.storage.fetch_one(
+            """
+            SELECT j.is_company, j.attempts, o.customer_id
+            FROM invoice_job j
+            JOIN orders o ON o.order_id = j.order_id
+            WHERE j.order_id = %s
+            """,
+            (order_id,),
+        )
+        if not job:
+            return
+        try:
+            order = Order(ShoppingCart(customer_id=job["customer_id"]), is_company=bool(job["is_company"]))
+            order.set_order_id(order_id)
+            path = order.create_invoice()
+        except Exception as e:
+            self._failed(order_id, job["attempts"], e)
+            return
+        self.storage.execute(
+            """
+            UPDATE invoice_job
+            SET status = 'ready', path = %s, finished_at = NOW(), last_error = NULL
+            WHERE order_id = %s
+            """,
+            (path, order_id),
+        )
+        logger.info("Invoice for order %s written: %s", order_id, path)
+
+    def _failed(self, order_id: int, attempts: int, error: Exception) -> None:
+        if attempts >= self.max_attempts:
+            logger.error("Invoice for order %s failed after %s attempts: %s", order_id, attempts, error)
+            status, delay = "failed", 0
+        else:
+            logger.warning("Invoice for order %s failed (attempt %s), retrying: %s", order_id, attempts, error)
+            status, delay = "pending", self.retry_delay * 2 ** (attempts - 1)
+        self.storage.execute(
+            """
+            UPDATE invoice_job
+            SET status = %s, last_error = %s, finished_at = NOW(),
+                next_attempt_at = NOW() + INTERVAL %s SECOND
+            WHERE order_id = %s
+            """,
+            (status, str(error)[:500], delay, order_id),
+        )
+
+
+# one queue per process; worker threads start on the first enqueue()
+invoice_queue = InvoiceQueue()
+
+
+# Standalone worker: python -m models.orders.invoice_jobs [--requeue-failed]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Invoice worker.")
+    parser.add_argument("--requeue-failed", action="store_true", help="retry all failed jobs, then run the worker")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if args.requeue_failed:
+        print(f"{invoice_queue.requeue_failed()} failed invoice jobs queued again.")
+    invoice_queue.start()
+    print("Invoice worker running, Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        invoice_queue.stop(timeout=10)
@@ -0,0 +1,211 @@
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from connection.storage import Storage
+
+try:   # Python 3.14+
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+INVOICE_ROOT = Path("invoices")
+INVOICE_COMPRESSION = "gzip"    # "gzip", "zstd" (Python 3.14+) or None
+INVOICES_PER_SHARD = 1000       # invoices/0000/ holds orders 0..999, 0001/ 1000..1999, ...
+
+_SUFFIX = {None: ".txt", "gzip": ".txt.gz", "zstd": ".txt.zst"}
+
+# old flat files: invoice_order_<id>_<YYYY-MM-DD_HH-MM-SS>.txt
+_LEGACY_RE = re.compile(r"^invoice_order_(\d+)_(.+)\.txt$")
+
+
+def _compress(data: bytes, compression: str | None) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, mtime=0)   # mtime=0: same text -> same bytes / checksum
+    if compression == "zstd":
+        return zstd.compress(data)
+    return data
+
+
+def _decompress(data: bytes, compression: str | None) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        if zstd is None:
+            raise RuntimeError("zstd invoices need Python 3.14+ (compression.zstd).")
+        return zstd.decompress(data)
+    return data
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write to a temp file in the same directory, then rename over `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def invoice_path(order_id: int, root: Path | str = INVOICE_ROOT, compression: str | None = INVOICE_COMPRESSION) -> Path:
+    shard = f"{order_id // INVOICES_PER_SHARD:04d}"
+    return Path(root) / shard / f"invoice_order_{order_id}{_SUFFIX[compression]}"
+
+
+def write_invoice_file(
+    order_id: int,
+    text: str,
+    root: Path | str = INVOICE_ROOT,
+    compression: str | None = INVOICE_COMPRESSION,
+) -> dict:
+    """
+    Compress and atomically write one invoice file (no DB access, safe in a
+    worker process). Returns the index row for InvoiceStore.index_many().
+    """
+    if not order_id:
+        raise ValueError("Invoice needs a saved order (order_id is missing).")
+    data = _compress(text.encode("utf-8"), compression)
+    path = invoice_path(order_id, root, compression)
+    write_atomic(path, data)
+    return {
+        "order_id": order_id,
+        "path": str(path),
+        "size_bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "compression": compression,
+    }
+
+
+class InvoiceStore:
+    """
+    Invoice files in id-sharded directories with an index table
+    (invoice_file, SQL/invoice_file.sql): order_id -> path, size, sha256.
+
+    - one file per order: regenerating overwrites it (atomic rename)
+    - lookup by order id is one primary key read, no directory scan
+    - files are gzip (or zstd) compressed; read() returns the text
+    """
+
+    def __init__(
+        self,
+        storage: Storage | None = None,
+        root: Path | str = INVOICE_ROOT,
+        compression: str | None = INVOICE_COMPRESSION,
+    ):
+        if compression not in _SUFFIX:
+            raise ValueError(f"Unknown invoice compression: {compression!r}")
+        if compression == "zstd" and zstd is None:
+            raise ValueError("zstd invoices need Python 3.14+ (compression.zstd).")
+        if storage is None:
+            storage = Storage()
+            storage.connect()
+        self.storage = storage
+        self.root = Path(root)
+        self.compression = compression
+
+    def path_for(self, order_id: int) -> Path:
+        return invoice_path(order_id, self.root, self.compression)
+
+    def save(self, order_id: int, text: str) -> dict:
+        """Write (or overwrite) the invoice of an order and index it. Returns the index row."""
+        entry = write_invoice_file(order_id, text, self.root, self.compression)
+        self.index_many([entry])
+        return entry
+
+    def index_many(self, entries: list[dict]) -> None:
+        """
+        Upsert index rows of written files (one batch); removes replaced files.
+        Raises RuntimeError if the index could not be written.
+        """
+        if not entries:
+            return
+        ids = [e["order_id"] for e in entries]
+        old_rows = self.storage.fetch_all(
+            f"SELECT order_id, path FROM invoice_file WHERE order_id IN ({', '.join(['%s'] * len(ids))})",
+            ids,
+        ) or []
+        written = self.storage.execute_many(
+            """
+            REPLACE INTO invoice_file (order_id, path, size_bytes, sha256, compression)
+            VALUES (%(order_id)s, %(path)s, %(size_bytes)s, %(sha256)s, %(compression)s)
+            """,
+            entries,
+        )
+        if written is None:   # DB error, already logged by Storage
+            raise RuntimeError(f"Could not index {len(entries)} invoice file(s).")
+        new_paths = {e["order_id"]: e["path"] for e in entries}
+        for row in old_rows:
+            if row["path"] != new_paths[row["order_id"]]:
+                # compression / layout changed – drop the previous file
+                Path(row["path"]).unlink(missing_ok=True)
+
+    def lookup(self, order_id: int) -> dict | None:
+        """Index row {"order_id", "path", "size_bytes", "sha256", "compression", "created_at"} or None."""
+        return self.storage.fetch_one(
+            """
+            SELECT order_id, path, size_bytes, sha256, compression, created_at
+            FROM invoice_file
+            WHERE order_id = %s
+            """,
+            (order_id,),
+        )
+
+    def read(self, order_id: int, verify: bool = True) -> str | None:
+        """
+        Invoice text of an order, None if there is none (or the file is gone).
+        Raises ValueError if the file does not match its checksum.
+        """
+        entry = self.lookup(order_id)
+        if not entry:
+            return None
+        try:
+            data = Path(entry["path"]).read_bytes()
+        except FileNotFoundError:
+            return None
+        if verify and hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"Invoice file of order {order_id} does not match its checksum.")
+        return _decompress(data, entry["compression"]).decode("utf-8")
+
+    def import_legacy(self) -> int:
+        """
+        Move old flat invoices/invoice_order_<id>_<ts>.txt files into the
+        store: the newest file per order is indexed, the others are removed.
+        Old files of an order are only removed after its index row was
+        written; if that fails they stay for the next run.
+        Returns the number of imported orders.
+        """
+        newest: dict[int, Path] = {}
+        found: dict[int, list[Path]] = {}
+        for path in self.root.glob("invoice_order_*.txt"):
+            m = _LEGACY_RE.match(path.name)
+            if not m:
+                continue   # e.g. invoice_order_None_... (order was never saved)
+            order_id = int(m.group(1))
+            found.setdefault(order_id, []).append(path)
+            # timestamp format sorts like the time itself
+            if order_id not in newest or path.name > newest[order_id].name:
+                newest[order_id] = path
+
+        imported = 0
+        for order_id, path in newest.items():
+            try:
+                self.save(order_id, path.read_text(encoding="utf-8"))
+            except (OSError, RuntimeError) as e:
+                print(f"Order {order_id}: not imported, files kept ({e})")
+                continue
+            for old in found[order_id]:
+                old.unlink()
+            imported += 1
+        return imported
+
+
+# Move old flat invoice files into the store: python -m models.orders.invoice_store
+if __name__ == "__main__":
+    count = InvoiceStore().import_legacy()
+    print(f"{count} invoices imported into {INVOICE_ROOT}/.")
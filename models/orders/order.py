@@ -4,8 +4,90 @@ from models.orders.shopping_cart import ShoppingCart
 import os
 from connection.storage import Storage
 from datetime import datetime
-from pathlib import Path
+from models.orders.invoice_store import InvoiceStore
+
+
+def render_invoice(
+    order_id: int,
+    customer: dict | None,
+    items: list[dict],
+    is_company: bool,
+    customer_id: int | None = None,
+    issued_at: datetime | None = None,
+) -> str:
+    """
+    Text of a TXT invoice (no DB / file access, so it can run in a worker
+    process): customer block, item table, subtotal, company discount, total.
+    items: rows with product_id, product, quantity, price.
+    """
+    # 1) Рахуємо subtotal і суму по кожному рядку
+    subtotal = 0.0
+    for row in items:
+        line_total = float(row["price"]) * row["quantity"]
+        row["line_total"] = line_total
+        subtotal += line_total
+
+    # 2) Знижка для компанії
+    if is_company:
+        discount = round(subtotal * 0.05, 2)
+    else:
+        discount = 0.0
+
+    total = round(subtotal - discount, 2)
+
+    # 3) Формуємо текст інвойсу
+    now_str = (issued_at or datetime.now()).strftime("%d.%m.%Y %H:%M")
+    kind_str = "COMPANY" if is_company else "PRIVATE"
+
+    lines: list[str] = []
+    lines.append(f"INVOICE #{order_id}")
+    lines.append("")
+
+    # ---- Блок КЛІЄНТ ----
+    lines.append("Customer")
+    lines.append("--------")
+    if customer:
+        lines.append(f"  Name   : {customer['name']}")
+        lines.append(f"  ID     : {customer['customer_id']}")
+        lines.append(f"  Type   : {kind_str}")
+        lines.append(f"  Address: {customer.get('address') or '-'}")
+        lines.append(f"  Email  : {customer.get('email') or '-'}")
+        lines.append(f"  Phone  : {customer.get('phone') or '-'}")
+    else:
+        # запасний варіант, якщо раптом не знайдеться
+        lines.append(f"  ID   : {customer_id}")
+        lines.append(f"  Type : {kind_str}")
+    lines.append("")
+    lines.append(f"Order date : {now_str}")
+    lines.append("")
+
+    # ---- Таблиця ТОВАРІВ ----
+    header = f"{'ID':<4} {'Name':<30} {'Qty':>5} {'Price':>10} {'Total':>10}"
+    lines.append("Items")
+    lines.append("-----")
+    lines.append(header)
+    lines.append("-" * len(header))
+
+    for row in items:
+        pid = row["product_id"]
+        name = row["product"]
+        qty = row["quantity"]
+        price = float(row["price"])
+        line_total = row["line_total"]
+
+        # .30 обрізає дуже довгі назви, щоб таблиця не “роз’їжджалась”
+        lines.append(
+            f"{pid:<4} {name:<30.30} {qty:>5} {price:>10.2f} {line_total:>10.2f}"
+        )
+
+    lines.append("")
+    lines.append(f"{'Subtotal:':>53} {subtotal:>10.2f}")
+    if discount > 0:
+        lines.append(f"{'Company discount (5 %):':>53} -{discount:>9.2f}")
+    lines.append(f"{'Total:':>53} {total:>10.2f}")
+    lines.append("")
 
+    return "\n".join(lines)
 
 
 class Order:
@@ -99,83 +181,17 @@ class Order:
             (self.order_id,),
         )
 
-        # 2.1) Рахуємо subtotal і суму по кожному рядку
-        subtotal = 0.0
-        for row in items:
-            line_total = float(row["price"]) * row["quantity"]
-            row["line_total"] = line_total
-            subtotal += line_total
+        # дата замовлення, не час генерації (інвойс можна перегенерувати пізніше)
+        order = self.storage.fetch_one("SELECT order_date FROM orders WHERE order_id = %s", (self.order_id,))
 
-        # 3) Знижка для компанії
-        if self.is_company:
-            discount = round(subtotal * 0.05, 2)
-        else:
-            discount = 0.0
-
-        total = round(subtotal - discount, 2)
-
-        # 4) Формуємо текст інвойсу
-        now_str = datetime.now().strftime("%d.%m.%Y %H:%M")
-        kind_str = "COMPANY" if self.is_company else "PRIVATE"
-
-        lines: list[str] = []
-        lines.append(f"INVOICE #{self.order_id}")
-        lines.append("")
-
-        # ---- Блок КЛІЄНТ ----
-        lines.append("Customer")
-        lines.append("--------")
-        if customer:
-            lines.append(f"  Name   : {customer['name']}")
-            lines.append(f"  ID     : {customer['customer_id']}")
-            lines.append(f"  Type   : {kind_str}")
-            lines.append(f"  Address: {customer.get('address') or '-'}")
-            lines.append(f"  Email  : {customer.get('email') or '-'}")
-            lines.append(f"  Phone  : {customer.get('phone') or '-'}")
-        else:
-            # запасний варіант, якщо раптом не знайдеться
-            lines.append(f"  ID   : {self.cart.customer_id}")
-            lines.append(f"  Type : {kind_str}")
-        lines.append("")
-        lines.append(f"Order date : {now_str}")
-        lines.append("")
-
-        # ---- Таблиця ТОВАРІВ ----
-        header = f"{'ID':<4} {'Name':<30} {'Qty':>5} {'Price':>10} {'Total':>10}"
-        lines.append("Items")
-        lines.append("-----")
-        lines.append(header)
-        lines.append("-" * len(header))
-
-        for row in items:
-            pid = row["product_id"]
-            name = row["product"]
-            qty = row["quantity"]
-            price = float(row["price"])
-            line_total = row["line_total"]
-
-            # .30 обрізає дуже довгі назви, щоб таблиця не “роз’їжджалась”
-            lines.append(
-                f"{pid:<4} {name:<30.30} {qty:>5} {price:>10.2f} {line_total:>10.2f}"
-            )
-
-        lines.append("")
-        lines.append(f"{'Subtotal:':>53} {subtotal:>10.2f}")
-        if discount > 0:
-            lines.append(f"{'Company discount (5 %):':>53} -{discount:>9.2f}")
-        lines.append(f"{'Total:':>53} {total:>10.2f}")
-        lines.append("")
-
-        # 5) Запис у файл
-        invoices_dir = Path("invoices")
-        invoices_dir.mkdir(exist_ok=True)
-        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"invoice_order_{self.order_id}_{ts}.txt"
-        full_path = invoices_dir / filename
-
-        full_path.write_text("\n".join(lines), encoding="utf-8")
+        # 3) Текст інвойсу + запис у сховище (шардовані папки + індекс order_id -> файл)
+        text = render_invoice(
+            self.order_id, customer, items, self.is_company, self.cart.customer_id,
+            order["order_date"] if order else None,
+        )
+        entry = InvoiceStore(self.storage).save(self.order_id, text)
 
         # Можна закрити з'єднання (якщо цей об'єкт більше не потрібен)
         self.storage.disconnect()
 
-        return str(full_path)
+        return entry["path"]
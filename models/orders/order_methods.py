@@ -1,32 +1,96 @@
+import base64
+import json
+import logging
+from datetime import datetime
+
 from connection.storage import Storage
 from models.orders.shopping_cart import ShoppingCart
+from models.orders.order import Order
+from models.orders.inventory import Inventory, OutOfStockError
 import pymysql
 from typing import List, Dict, Any
 
+logger = logging.getLogger(__name__)
+
+DUPLICATE_ENTRY = 1062   # MySQL error code of a UNIQUE violation
+HISTORY_PAGE_SIZE = 20   # orders per page on /my_orders
+
+
+def _encode_history_cursor(order: dict) -> str:
+    """Opaque /my_orders cursor: (order_date, order_id) of the last order on the page."""
+    data = {"date": order["order_date"].isoformat(sep=" "), "id": order["order_id"]}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def _decode_history_cursor(cursor: str | None) -> dict | None:
+    """Inverse of _encode_history_cursor; broken or empty cursors -> None (first page)."""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(data, dict) or not isinstance(data.get("id"), int):
+            return None
+        datetime.fromisoformat(data["date"])   # ValueError / TypeError / KeyError if not a date
+        return data
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+
 
 class OrderMethods:
     def __init__(self):
         self.storage = Storage()
         self.storage.connect()
+        self.inventory = Inventory(self.storage)
 
-    def save_order(self, cart: ShoppingCart, is_company: bool = False) -> int | None:
+    def save_order(self, cart: ShoppingCart, is_company: bool = False, idempotency_key: str | None = None) -> int | None:
         """
         Saves an order into two tables:
         - orders
         - order_items
+        Returns the order id (see place_order for idempotency_key).
+        Raises OutOfStockError if a line exceeds the stock (nothing is saved).
+        """
+        order_id, _created = self.place_order(cart, is_company, idempotency_key)
+        return order_id
+
+    def place_order(
+        self,
+        cart: ShoppingCart,
+        is_company: bool = False,
+        idempotency_key: str | None = None,
+    ) -> tuple[int | None, bool]:
+        """
+        Save the order (see save_order) and return (order_id, created).
+
+        idempotency_key (e.g. the checkout form token) is stored in
+        orders.idempotency_key (UNIQUE). Repeating the call with the same key
+        – double click, proxy retry – writes nothing and returns
+        (id of the first order, False), also when both calls race.
+
+        Stock of tracked products (inventory table) is taken in the same
+        transaction; if any line exceeds it, nothing is saved and
+        OutOfStockError (with every short line in .lines) is raised.
         """
         try:
+            # 0) retry of an already saved submission?
+            if idempotency_key:
+                existing = self.find_order_by_idempotency_key(idempotency_key, cart.customer_id)
+                if existing:
+                    logger.info("SAVE_ORDER: key already used, returning order %s.", existing)
+                    return existing, False
+
             # 1) basic checks
             if not cart.products:
-                print("SAVE_ORDER: Cart is empty.")
-                return None
+                logger.warning("SAVE_ORDER: Cart is empty.")
+                return None, False
 
             if not cart.customer_id:
-                print("SAVE_ORDER: customer_id is missing or invalid.")
-                return None
+                logger.warning("SAVE_ORDER: customer_id is missing or invalid.")
+                return None, False
 
             total = 0.0
             items: list[tuple[int, int, float]] = []  # (product_id, quantity, price)
+            lines: list[tuple[int, int]] = []         # (product_id, quantity) before pricing
 
             # 2) normalize cart.products (support dict, tuples AND dicts)
             raw = cart.products
@@ -42,6 +106,7 @@ class OrderMethods:
                 # already some kind of list/tuple
                 iterable = raw
 
+            invalid: list = []
             for entry in iterable:
                 product_id = None
                 quantity = 0
@@ -55,151 +120,243 @@ class OrderMethods:
                     quantity = entry[1]
 
                 else:
-                    print(f"SAVE_ORDER: invalid cart item format {entry}, skipped.")
+                    invalid.append(entry)
                     continue
 
                 if not product_id or quantity <= 0:
-                    print(f"SAVE_ORDER: invalid cart item {entry}, skipped.")
+                    invalid.append(entry)
                     continue
 
-                # 2.1) read current price from DB
-                row = self.storage.fetch_one(
-                    "SELECT price FROM product WHERE product_id = %s",
-                    (product_id,),
-                )
+                lines.append((product_id, quantity))
 
-                if not row:
-                    print(f"SAVE_ORDER: product {product_id} not found in DB, skipped.")
-                    continue
+            if invalid:
+                logger.warning("SAVE_ORDER: invalid cart items %s, skipped.", invalid)
+
+            # 2.1) read current prices for the whole cart in one query
+            prices = self.get_prices(pid for pid, _ in lines)
+
+            missing = sorted({pid for pid, _ in lines if pid not in prices})
+            if missing:
+                logger.warning("SAVE_ORDER: products %s not found in DB, skipped.", missing)
 
-                price = float(row["price"])
+            for product_id, quantity in lines:
+                if product_id not in prices:
+                    continue
+                price = prices[product_id]
                 items.append((product_id, quantity, price))
                 total += price * quantity
 
             if not items:
-                print("SAVE_ORDER: no valid products to save.")
-                return None
+                logger.warning("SAVE_ORDER: no valid products to save.")
+                return None, False
 
             # 3) apply company discount if needed
+            subtotal = round(total, 2)
             if is_company:
                 total *= 0.95  # 5% discount
 
             total = round(total, 2)
 
-            print(
-                f"SAVE_ORDER: customer_id={cart.customer_id}, "
-                f"is_company={is_company}, total={total}"
+            logger.info(
+                "SAVE_ORDER: customer_id=%s, is_company=%s, total=%s",
+                cart.customer_id, is_company, total,
             )
 
-            # 4) start transaction
-            self.storage.connection.begin()
-
-            # 4.1 insert into orders (order header)
-            order_id = self.storage.insert_and_get_id(
-                "INSERT INTO orders (customer_id, total) VALUES (%s, %s)",
-                (cart.customer_id, total),
-            )
-
-            if not order_id:
-                raise RuntimeError("SAVE_ORDER: insert into 'orders' returned no ID.")
-
-            # 4.2 insert all items into order_items
+            # 4) one transaction: order header + all items, one commit
             sql_detail = """
                 INSERT INTO order_items (order_id, product_id, quantity, price)
                 VALUES (%s, %s, %s, %s)
             """
-            for product_id, quantity, price in items:
-                self.storage.execute(sql_detail, (order_id, product_id, quantity, price))
+            with self.storage.transaction():
+                # 4.1 insert into orders (order header)
+                order_id = self.storage.insert_and_get_id(
+                    "INSERT INTO orders (customer_id, total, subtotal, idempotency_key) VALUES (%s, %s, %s, %s)",
+                    (cart.customer_id, total, subtotal, idempotency_key),
+                )
+
+                if not order_id:
+                    raise RuntimeError("SAVE_ORDER: insert into 'orders' returned no ID.")
+
+                # 4.2 insert all items into order_items (multi-row INSERT)
+                self.storage.execute_many(
+                    sql_detail,
+                    [(order_id, product_id, quantity, price) for product_id, quantity, price in items],
+                )
+
+                # 4.3 take the stock last: hot rows stay locked only until the commit
+                quantities: dict[int, int] = {}
+                for product_id, quantity, _price in items:
+                    quantities[product_id] = quantities.get(product_id, 0) + quantity
+                self.inventory.reserve(quantities)
 
-            # 5) commit
-            self.storage.connection.commit()
-            print(f"SAVE_ORDER: order saved successfully (ID {order_id}).")
+            logger.info("SAVE_ORDER: order saved successfully (ID %s).", order_id)
 
             # 6) optional: clear cart
             if hasattr(cart, "clear_cart"):
                 cart.clear_cart()
 
-            return order_id
+            return order_id, True
+
+        except OutOfStockError as e:
+            # transaction() already rolled back the order
+            logger.info("SAVE_ORDER: %s", e)
+            raise
 
         except pymysql.err.IntegrityError as e:
-            self.storage.connection.rollback()
-            print("SAVE_ORDER IntegrityError:", e)
-            return None
+            self.storage.rollback()
+            if idempotency_key and e.args and e.args[0] == DUPLICATE_ENTRY:
+                # a concurrent request with the same key committed first
+                existing = self.find_order_by_idempotency_key(idempotency_key, cart.customer_id)
+                if existing:
+                    logger.info("SAVE_ORDER: key already used, returning order %s.", existing)
+                    return existing, False
+            logger.error("SAVE_ORDER IntegrityError: %s", e)
+            return None, False
 
         except pymysql.MySQLError as e:
-            self.storage.connection.rollback()
-            print("SAVE_ORDER MySQLError:", e)
-            return None
+            self.storage.rollback()
+            logger.error("SAVE_ORDER MySQLError: %s", e)
+            return None, False
 
         except Exception as e:
-            self.storage.connection.rollback()
-            print("SAVE_ORDER unexpected error:", e)
+            self.storage.rollback()
+            logger.error("SAVE_ORDER unexpected error: %s", e)
+            return None, False
+
+    def find_order_by_idempotency_key(self, idempotency_key: str, customer_id: int) -> int | None:
+        """Id of the order saved with this key by this customer, or None."""
+        row = self.storage.fetch_one(
+            "SELECT order_id FROM orders WHERE idempotency_key = %s AND customer_id = %s",
+            (idempotency_key, customer_id),
+        )
+        return row["order_id"] if row else None
+
+    def create_invoice(self, order_id: int) -> str | None:
+        """
+        (Re-)create the invoice of a saved order synchronously (CLI).
+        Returns the file path or None if the order does not exist or the
+        invoice could not be stored.
+        """
+        row = self.storage.fetch_one(
+            """
+            SELECT o.customer_id, c.kind
+            FROM orders o
+            JOIN customers c ON c.customer_id = o.customer_id
+            WHERE o.order_id = %s
+            """,
+            (order_id,),
+        )
+        if not row:
+            logger.warning("Order %s not found.", order_id)
+            return None
+        order = Order(ShoppingCart(customer_id=row["customer_id"]), is_company=(row["kind"] == "company"))
+        order.set_order_id(order_id)
+        try:
+            return order.create_invoice()
+        except (OSError, RuntimeError) as e:
+            logger.error("Invoice for order %s could not be stored: %s", order_id, e)
             return None
 
-    def get_orders_with_items_for_customer(self, customer_id: int) -> List[Dict[str, Any]]:
+    def get_prices(self, product_ids) -> Dict[int, float]:
+        """
+        Current prices for many products in one round trip:
+        {product_id: price}. Unknown ids are simply not in the result.
+        """
+        ids = sorted(set(product_ids))
+        if not ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(ids))
+        rows = self.storage.fetch_all(
+            f"SELECT product_id, price FROM product WHERE product_id IN ({placeholders})",
+            tuple(ids),
+        )
+        return {r["product_id"]: float(r["price"]) for r in rows}
+
+    def get_order_history_page(self, customer_id: int, cursor: str | None = None, limit: int = HISTORY_PAGE_SIZE) -> dict:
         """
-        Returns list of orders for given customer.
-        Each element:
-        {
-            "order_id": int,
-            "order_date": date/datetime,
-            "total": float,
-            "items": [
-                {
-                    "product_id": int,
-                    "product": str,
-                    "category": str,
-                    "quantity": int,
-                    "price": float,
-                    "line_total": float,
-                }, ...
-            ]
-        }
+        One page of a customer's orders, newest first:
+        {"orders": [...], "next_cursor": str | None}
+
+        Each order: order_id, order_date, subtotal, discount, discount_percent,
+        total and items (product_id, product, category, quantity, price, line_total).
+        Keyset paging on (order_date, order_id) – served by
+        idx_orders_customer_date (SQL/orders_history.sql), so page N costs
+        the same as page 1. Items are loaded for this page only.
         """
         sql = """
             SELECT
-                o.order_id,
-                o.order_date,
-                o.total,
-                oi.product_id,
-                oi.quantity,
-                oi.price,
-                p.product,
-                p.category
-            FROM orders o
-            JOIN order_items oi ON oi.order_id = o.order_id
-            JOIN product p      ON p.product_id = oi.product_id
-            WHERE o.customer_id = %s
-            ORDER BY o.order_date DESC, o.order_id DESC, oi.product_id
+                order_id,
+                order_date,
+                total,
+                COALESCE(subtotal, total)         AS subtotal,
+                COALESCE(subtotal, total) - total AS discount
+            FROM orders
+            WHERE customer_id = %s
         """
-        rows = self.storage.fetch_all(sql, (customer_id,))
-
-        orders: Dict[int, Dict[str, Any]] = {}
-
-        for r in rows:
-            oid = r["order_id"]
-            if oid not in orders:
-                orders[oid] = {
-                    "order_id": oid,
-                    "order_date": r["order_date"],
-                    "total": float(r["total"]),
-                    "items": [],
-                }
-
-            line_total = float(r["price"]) * r["quantity"]
-
-            orders[oid]["items"].append(
-                {
-                    "product_id": r["product_id"],
-                    "product": r["product"],
-                    "category": r["category"],
-                    "quantity": r["quantity"],
-                    "price": float(r["price"]),
-                    "line_total": line_total,
-                }
-            )
-
-        return list(orders.values())
+        params: list = [customer_id]
+
+        position = _decode_history_cursor(cursor)
+        if position:
+            sql += " AND (order_date < %s OR (order_date = %s AND order_id < %s))"
+            params.extend([position["date"], position["date"], position["id"]])
+
+        sql += " ORDER BY order_date DESC, order_id DESC LIMIT %s"
+        params.append(int(limit) + 1)   # one extra row tells if there is a next page
+
+        orders = self.storage.fetch_all(sql, params) or []
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = _encode_history_cursor(orders[-1])
+
+        items_by_order: Dict[int, List[Dict[str, Any]]] = {o["order_id"]: [] for o in orders}
+        if orders:
+            rows = self.storage.fetch_all(
+                f"""
+                SELECT
+                    oi.order_id,
+                    oi.product_id,
+                    oi.quantity,
+                    oi.price,
+                    oi.price * oi.quantity AS line_total,
+                    p.product,
+                    p.category
+                FROM order_items oi
+                JOIN product p ON p.product_id = oi.product_id
+                WHERE oi.order_id IN ({', '.join(['%s'] * len(items_by_order))})
+                ORDER BY oi.order_id, oi.product_id
+                """,
+                list(items_by_order),
+            ) or []
+            for r in rows:
+                items_by_order[r.pop("order_id")].append(r)
+
+        for o in orders:
+            subtotal = float(o["subtotal"])
+            o["total"] = float(o["total"])
+            o["subtotal"] = subtotal
+            o["discount"] = float(o["discount"])
+            o["discount_percent"] = round(o["discount"] * 100 / subtotal) if subtotal else 0
+            o["items"] = items_by_order[o["order_id"]]
+
+        return {"orders": orders, "next_cursor": next_cursor}
+
+    def get_order_totals(self, customer_id: int) -> Dict[str, float]:
+        """Lifetime sums of a customer: {"orders", "subtotal", "discount", "total"} (one aggregate query)."""
+        row = self.storage.fetch_one(
+            """
+            SELECT
+                COUNT(*)                                     AS orders,
+                COALESCE(SUM(COALESCE(subtotal, total)), 0)  AS subtotal,
+                COALESCE(SUM(total), 0)                      AS total
+            FROM orders
+            WHERE customer_id = %s
+            """,
+            (customer_id,),
+        ) or {"orders": 0, "subtotal": 0, "total": 0}
+        subtotal = float(row["subtotal"])
+        total = float(row["total"])
+        return {"orders": row["orders"], "subtotal": subtotal, "discount": subtotal - total, "total": total}
 
     def close(self):
         self.storage.disconnect()
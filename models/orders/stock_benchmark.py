@@ -0,0 +1,158 @@
+"""
+Concurrent checkouts of a few hot products – throughput and correctness of
+the stock reservation (Inventory.reserve) under lock contention.
+
+    python -m models.orders.stock_benchmark --customer-id 1 --products 1 2 --stock 500
+    python -m models.orders.stock_benchmark --customer-id 1 --products 1 2 3 --threads 16 --orders 100
+
+Every thread places --orders orders of 1..--max-qty pieces of random hot
+products. At the end the stock that was taken must equal the quantities
+of the saved orders (no oversell, no lost update). The stock of the
+products is restored and the benchmark orders are deleted afterwards
+(--keep to leave them).
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from models.orders.inventory import Inventory, OutOfStockError
+from models.orders.order_methods import OrderMethods
+from models.orders.shopping_cart import ShoppingCart
+
+
+class StockBenchmark:
+    def __init__(self, customer_id: int, product_ids: list[int], stock: int, max_qty: int = 2, lines: int = 2):
+        self.customer_id = customer_id
+        self.product_ids = product_ids
+        self.stock = stock
+        self.max_qty = max_qty
+        self.lines = min(lines, len(product_ids))
+        self.om = OrderMethods()
+        self.inventory = Inventory(self.om.storage)
+        self._lock = threading.Lock()
+        self.latencies: list[float] = []
+        self.order_ids: list[int] = []
+        self.out_of_stock = 0
+        self.errors = 0
+
+    def _worker(self, orders: int, seed: int) -> None:
+        rnd = random.Random(seed)
+        om = OrderMethods()    # own Storage per thread, like one web request
+        for _ in range(orders):
+            cart = ShoppingCart(customer_id=self.customer_id)
+            for pid in rnd.sample(self.product_ids, self.lines):
+                cart.add_product(pid, rnd.randint(1, self.max_qty))
+            started = time.perf_counter()
+            try:
+                order_id = om.save_order(cart)
+            except OutOfStockError:
+                order_id = False
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.latencies.append(elapsed)
+                if order_id:
+                    self.order_ids.append(order_id)
+                elif order_id is False:
+                    self.out_of_stock += 1
+                else:
+                    self.errors += 1
+
+    def run(self, threads: int, orders: int, seed: int = 0) -> dict:
+        before = self.inventory.get_stock(self.product_ids)
+        for pid in self.product_ids:
+            self.inventory.set_stock(pid, self.stock)
+        try:
+            workers = [
+                threading.Thread(target=self._worker, args=(orders, seed + i), name=f"checkout-{i}")
+                for i in range(threads)
+            ]
+            started = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            seconds = time.perf_counter() - started
+
+            taken = self.stock * len(self.product_ids) - sum(self.inventory.get_stock(self.product_ids).values())
+            sold = self._sold_quantity()
+        finally:
+            for pid in self.product_ids:
+                if pid in before:
+                    self.inventory.set_stock(pid, before[pid])
+                else:
+                    self.om.storage.execute("DELETE FROM inventory WHERE product_id = %s", (pid,))
+
+        latencies = sorted(self.latencies) or [0.0]
+        return {
+            "attempts": len(self.latencies),
+            "orders": len(self.order_ids),
+            "out_of_stock": self.out_of_stock,
+            "errors": self.errors,
+            "seconds": round(seconds, 2),
+            "orders_per_s": round(len(self.order_ids) / seconds, 1) if seconds else 0.0,
+            "attempts_per_s": round(len(self.latencies) / seconds, 1) if seconds else 0.0,
+            "p50_ms": round(statistics.median(latencies) * 1000, 1),
+            "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1),
+            "stock_taken": taken,
+            "quantity_sold": sold,
+            "consistent": taken == sold,
+        }
+
+    def _sold_quantity(self) -> int:
+        if not self.order_ids:
+            return 0
+        row = self.om.storage.fetch_one(
+            f"""
+            SELECT COALESCE(SUM(quantity), 0) AS qty
+            FROM order_items
+            WHERE order_id IN ({', '.join(['%s'] * len(self.order_ids))})
+              AND product_id IN ({', '.join(['%s'] * len(self.product_ids))})
+            """,
+            self.order_ids + self.product_ids,
+        )
+        return int(row["qty"]) if row else 0
+
+    def cleanup(self) -> None:
+        """Delete the orders placed by the benchmark."""
+        for start in range(0, len(self.order_ids), 500):
+            ids = self.order_ids[start:start + 500]
+            placeholders = ", ".join(["%s"] * len(ids))
+            with self.om.storage.transaction():
+                self.om.storage.execute(f"DELETE FROM order_items WHERE order_id IN ({placeholders})", ids)
+                self.om.storage.execute(f"DELETE FROM orders WHERE order_id IN ({placeholders})", ids)
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent checkout benchmark on hot products.")
+    parser.add_argument("--customer-id", type=int, required=True, help="customer placing the orders")
+    parser.add_argument("--products", type=int, nargs="+", required=True, help="hot product ids")
+    parser.add_argument("--stock", type=int, default=1000, help="stock per product at the start")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=50, help="orders per thread")
+    parser.add_argument("--max-qty", type=int, default=2, help="pieces per line: 1..max-qty")
+    parser.add_argument("--lines", type=int, default=2, help="hot products per order")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="do not delete the benchmark orders")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    bench = StockBenchmark(args.customer_id, args.products, args.stock, args.max_qty, args.lines)
+    result = bench.run(args.threads, args.orders, args.seed)
+    if not args.keep:
+        bench.cleanup()
+
+    print(f"{args.threads} threads x {args.orders} checkouts on products {args.products} (stock {args.stock} each)")
+    print(
+        f"  {result['orders']} orders, {result['out_of_stock']} out of stock, {result['errors']} errors "
+        f"in {result['seconds']} s"
+    )
+    print(f"  {result['orders_per_s']} orders/s, {result['attempts_per_s']} checkouts/s")
+    print(f"  latency p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms")
+    print(
+        f"  stock taken {result['stock_taken']}, sold {result['quantity_sold']}: "
+        + ("OK" if result["consistent"] else "MISMATCH")
+    )
@@ -0,0 +1,112 @@
+import pytest
+
+from models.orders import cart_store
+from models.orders.cart_store import MemoryCartStore, SQLiteCartStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCartStore()
+    return SQLiteCartStore(tmp_path / "carts.sqlite3")
+
+
+def test_new_cart_is_empty(store):
+    assert store.get("c1") == {}
+
+
+def test_add_sums_quantities(store):
+    assert store.add("c1", 10) == 1
+    assert store.add("c1", 10, 2) == 3
+    assert store.add("c1", 11) == 1
+    assert store.get("c1") == {10: 3, 11: 1}
+
+
+def test_add_negative_removes_at_zero(store):
+    store.add("c1", 10, 2)
+    assert store.add("c1", 10, -5) == 0
+    assert store.get("c1") == {}
+
+
+def test_set_quantity(store):
+    store.add("c1", 10, 2)
+    assert store.set_quantity("c1", 10, 7) == 7
+    assert store.set_quantity("c1", 11, -3) == 0
+    assert store.get("c1") == {10: 7}
+    store.set_quantity("c1", 10, 0)
+    assert store.get("c1") == {}
+
+
+def test_carts_are_separate(store):
+    store.add("c1", 10)
+    store.add("c2", 20)
+    store.clear("c1")
+    assert store.get("c1") == {}
+    assert store.get("c2") == {20: 1}
+
+
+def test_get_returns_a_copy():
+    store = MemoryCartStore()
+    store.add("c1", 10)
+    store.get("c1")[10] = 99
+    assert store.get("c1") == {10: 1}
+
+
+def test_sqlite_store_is_shared_through_the_file(tmp_path):
+    SQLiteCartStore(tmp_path / "carts.sqlite3").add("c1", 10, 4)
+    assert SQLiteCartStore(tmp_path / "carts.sqlite3").get("c1") == {10: 4}
+
+
+def test_purge_expired(tmp_path, monkeypatch):
+    store = SQLiteCartStore(tmp_path / "carts.sqlite3", max_age=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(cart_store.time, "time", lambda: now)
+    store.add("old", 10, 2)
+    store.add("old", 11)
+
+    now += 30
+    store.add("fresh", 10)
+    assert store.purge_expired() == 0
+
+    now += 40   # "old" untouched for 70 s, "fresh" for 40 s
+    assert store.purge_expired() == 2
+    assert store.get("old") == {}
+    assert store.get("fresh") == {10: 1}
+
+
+def test_update_keeps_cart_alive(tmp_path, monkeypatch):
+    store = SQLiteCartStore(tmp_path / "carts.sqlite3", max_age=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(cart_store.time, "time", lambda: now)
+    store.add("c1", 10)
+
+    now += 50
+    store.set_quantity("c1", 10, 3)
+    now += 50
+    assert store.purge_expired() == 0
+    assert store.get("c1") == {10: 3}
+
+
+def test_cart_expires_as_a_whole(tmp_path, monkeypatch):
+    store = SQLiteCartStore(tmp_path / "carts.sqlite3", max_age=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(cart_store.time, "time", lambda: now)
+    store.add("c1", 10)
+
+    now += 50
+    store.add("c1", 11)   # touches the whole cart, 10 included
+    now += 50
+    assert store.purge_expired() == 0
+    assert store.get("c1") == {10: 1, 11: 1}
+
+
+def test_writes_purge_periodically(tmp_path, monkeypatch):
+    store = SQLiteCartStore(tmp_path / "carts.sqlite3", max_age=60, purge_interval=0.0)
+    now = 1_000_000.0
+    monkeypatch.setattr(cart_store.time, "time", lambda: now)
+    store.add("old", 10)
+
+    now += 100
+    store.add("new", 20)   # no explicit purge_expired()
+    assert store.get("old") == {}
+    assert store.get("new") == {20: 1}
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pymysql")
+
+from models.orders.order_methods import _decode_history_cursor, _encode_history_cursor
+
+
+def _raw(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def test_round_trip():
+    order = {"order_date": datetime(2025, 3, 1, 14, 30, 5), "order_id": 981}
+    assert _decode_history_cursor(_encode_history_cursor(order)) == {"date": "2025-03-01 14:30:05", "id": 981}
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_empty_cursor_is_first_page(cursor):
+    assert _decode_history_cursor(cursor) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "%%%",
+        _raw("date id"),
+        _raw(["date", "id"]),
+        _raw({"id": 5}),
+        _raw({"date": "2025-03-01 14:30:05"}),
+        _raw({"date": "yesterday", "id": 5}),
+        _raw({"date": 20250301, "id": 5}),
+        _raw({"date": "2025-03-01 14:30:05", "id": "5; DROP TABLE orders"}),
+    ],
+)
+def test_tampered_cursor_is_first_page(cursor):
+    assert _decode_history_cursor(cursor) is None
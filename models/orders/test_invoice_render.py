@@ -0,0 +1,55 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("pymysql")
+
+from models.orders.order import render_invoice
+
+CUSTOMER = {"customer_id": 3, "name": "Anna Schmidt", "address": "Hauptstr. 1", "email": None, "phone": None}
+
+
+def _items():
+    return [
+        {"product_id": 1, "product": "Kugelschreiber", "quantity": 3, "price": Decimal("2.50")},
+        {"product_id": 2, "product": "Notizbuch", "quantity": 1, "price": Decimal("12.00")},
+    ]
+
+
+def test_issued_at_is_the_printed_date():
+    text = render_invoice(7, CUSTOMER, _items(), False, 3, issued_at=datetime(2024, 2, 29, 9, 5))
+    assert "Order date : 29.02.2024 09:05" in text
+
+
+def test_same_input_same_text():
+    issued_at = datetime(2025, 1, 2, 3, 4)
+    first = render_invoice(7, CUSTOMER, _items(), False, 3, issued_at)
+    assert render_invoice(7, CUSTOMER, _items(), False, 3, issued_at) == first
+
+
+def test_without_issued_at_uses_now():
+    before = datetime.now().replace(second=0, microsecond=0)
+    text = render_invoice(7, CUSTOMER, _items(), False, 3)
+    printed = next(line for line in text.splitlines() if line.startswith("Order date"))
+    assert datetime.strptime(printed.split(": ", 1)[1], "%d.%m.%Y %H:%M") >= before
+
+
+def test_private_totals():
+    text = render_invoice(7, CUSTOMER, _items(), False, 3, datetime(2025, 1, 1))
+    assert "INVOICE #7" in text
+    assert "Type   : PRIVATE" in text
+    assert "Email  : -" in text
+    assert text.splitlines()[-1].split() == ["Total:", "19.50"]
+    assert "discount" not in text
+
+
+def test_company_discount():
+    text = render_invoice(7, CUSTOMER, _items(), True, 3, datetime(2025, 1, 1))
+    assert "Company discount (5 %)" in text
+    assert text.splitlines()[-1].split() == ["Total:", "18.52"]
+
+
+def test_unknown_customer_prints_the_id():
+    text = render_invoice(7, None, _items(), False, 42, datetime(2025, 1, 1))
+    assert "ID   : 42" in text
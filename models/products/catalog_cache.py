@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CatalogCache:
+    """
+    Small in-process cache for catalog reads (product_read).
+
+    - entries expire after `ttl` seconds
+    - at most `max_size` entries, least recently used are dropped first
+    - thread-safe (one instance is shared by all Flask worker threads)
+
+    Keys are tuples; the first element is the kind of entry:
+      ("all",)                      -> get_all_products()
+      ("filtered", search, ...)     -> get_products_filtered(...)
+      ("basic", product_id)         -> get_product_basic(product_id)
+      ("facets", search, ...)       -> get_facets(...)
+
+    Writes (product or review changes) must call invalidate(), otherwise
+    readers see old data until the TTL runs out.
+    Cached rows are shared between callers – treat them as read-only.
+    """
+
+    # entry kinds that contain rows of many products
+    LIST_KINDS = ("all", "filtered", "facets")
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._generation = 0   # bumped by every invalidate()
+
+    def get(self, key):
+        """Return cached value or None (missing or expired)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation: int | None = None) -> None:
+        """
+        Cache `value`. With `generation` (see get_or_load) nothing is stored
+        if invalidate() ran since: the value may predate that write.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        Return cached value, or call loader(), cache and return its result.
+        If loader() raises, nothing is cached. loader() runs without the
+        lock; if a write invalidates the cache meanwhile, the result is
+        returned but not cached (it may be from before the write).
+        """
+        value = self.get(key)
+        if value is None:
+            with self._lock:
+                generation = self._generation
+            value = loader()
+            if value is not None:
+                self.set(key, value, generation)
+        return value
+
+    def invalidate(self, product_id: int | None = None) -> None:
+        """
+        Drop entries affected by a write.
+        - product_id given: all list entries + entries of this product
+        - product_id None: everything
+        """
+        with self._lock:
+            self._generation += 1
+            if product_id is None:
+                self._data.clear()
+                return
+            for key in list(self._data):
+                if key[0] in self.LIST_KINDS or product_id in key[1:]:
+                    del self._data[key]
+
+
+# one cache per process, shared by all ProductMethods instances
+catalog_cache = CatalogCache()
@@ -1,29 +1,82 @@
+import base64
+import json
+import logging
+from decimal import Decimal
+
 from connection.storage import Storage
 from pymysql import MySQLError
-from tabulate import tabulate
+from models.products.catalog_cache import catalog_cache
+from models.products.search_index import search_index
+from models.products.read_model import ProductReadModel
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_cursor(row: dict, direction: str, sort: str, order: str) -> str:
+    """
+    Opaque page cursor: sort value + product_id of the boundary row, and
+    the sort key / order ("asc" | "desc") the page was listed with.
+    """
+    value = row["sort_value"]
+    if isinstance(value, Decimal):
+        value = str(value)
+    data = {"v": value, "id": row["product_id"], "d": direction, "s": sort, "o": order}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def _decode_cursor(cursor: str | None, sort: str, order: str) -> dict | None:
+    """
+    Inverse of _encode_cursor. Broken or empty cursors and cursors made
+    for another sort or order -> None (first page).
+    """
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(data, dict) or data.get("d") not in ("next", "prev"):
+            return None
+        if data.get("s") != sort or data.get("o") != order:
+            return None
+        if not isinstance(data.get("id"), int) or isinstance(data["id"], bool):
+            return None
+        # sort values are bound as parameters: only scalars (sort columns are NOT NULL)
+        value = data.get("v")
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            return None
+        return data
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+# sidebar filters of /products (columns of product_read)
+FACETS = ("category", "brand", "author", "size")
+
+SEARCH_MAX_HITS = 1000   # a search shows at most the best this many products (after the filters)
+
+# search hits as a derived table: one JSON parameter instead of IN (%s, ...)
+# per hit; hit_rank = position in the ranked list of the index
+_HIT_CTE = (
+    "hit AS (SELECT h.product_id, h.hit_rank FROM JSON_TABLE(%s, '$[*]' COLUMNS ("
+    "hit_rank FOR ORDINALITY, product_id INT PATH '$')) AS h)"
+)
+
 
 class ProductMethods:
     def __init__(self):
         self.storage = Storage()
+        self.cache = catalog_cache   # shared per process, see catalog_cache.py
+        self.search_index = search_index
+        self.read_model = ProductReadModel(self.storage)   # product_read table
         self.storage.connect()
-
-        # IMPORTANT: always see latest committed data
-        try:
-            self.storage.connection.autocommit(True)
-        except Exception as e:
-            print("Could not enable autocommit for ProductMethods:", e)
+        # latest committed data is always visible: the pool rolls back
+        # (ends the read snapshot) every connection it gets back
 
     def get_product(self, product_id: int):
         try:
-            sql = "SELECT * FROM v_prod WHERE product_id = %s"
-            row = self.storage.fetch_one(sql, params=(product_id,))
-            if row:
-                print(tabulate([row], headers="keys", tablefmt="rounded_grid"))
-            else:
-                print (f"No product found with ID {product_id}.")
-            return row
+            sql = "SELECT * FROM product_read WHERE product_id = %s"
+            return self.storage.fetch_one(sql, params=(product_id,))
         except MySQLError as e:
-            print("Error loading product:", e)
+            logger.error("Error loading product: %s", e)
 
     def get_product_basic(self, product_id: int) -> dict | None:
         sql = """
@@ -33,15 +86,51 @@ class ProductMethods:
                 price,
                 category,
                 brand
-            FROM v_prod
+            FROM product_read
             WHERE product_id = %s
         """
         try:
-            return self.storage.fetch_one(sql, (product_id,))
+            return self.cache.get_or_load(
+                ("basic", product_id),
+                lambda: self.storage.fetch_one(sql, (product_id,)),
+            )
         except Exception as e:
-            print("Error loading basic product info:", e)
+            logger.error("Error loading basic product info: %s", e)
             return None
 
+    def get_products_by_ids(self, product_ids) -> dict[int, dict]:
+        """
+        Load many products with one query.
+        Returns {product_id: row}; ids that do not exist are missing in the dict.
+        """
+        ids = sorted({int(pid) for pid in product_ids})
+        if not ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(ids))
+        sql = f"""
+            SELECT
+                product_id,
+                product,
+                price,
+                weight,
+                category,
+                brand,
+                warranty_years,
+                size,
+                author,
+                page_count,
+                avg_rating,
+                review_count
+            FROM product_read
+            WHERE product_id IN ({placeholders})
+        """
+        try:
+            rows = self.storage.fetch_all(sql, tuple(ids))
+        except MySQLError as e:
+            logger.error("Error loading products by ids: %s", e)
+            return {}
+        return {row["product_id"]: row for row in rows}
+
     def get_all_products(self) -> list[dict]:
         sql = """
             SELECT
@@ -57,46 +146,62 @@ class ProductMethods:
                 page_count,
                 avg_rating,
                 review_count
-            FROM v_prod
+            FROM product_read
             ORDER BY product_id
         """
         try:
-            rows = self.storage.fetch_all(sql)
-            if rows:
-                print(tabulate(rows, headers="keys", tablefmt="rounded_grid"))
-            else:
-                print("No products found.")
-            return rows
+            return list(self.cache.get_or_load(("all",), lambda: self.storage.fetch_all(sql)))
         except Exception as e:
-            print("Error loading all products:", e)
+            logger.error("Error loading all products: %s", e)
             return []
 
+    def iter_all_products(self, batch_size: int = 500):
+        """Stream all products (same columns as get_all_products) in constant memory."""
+        sql = """
+            SELECT
+                product_id,
+                product,
+                price,
+                weight,
+                category,
+                brand,
+                warranty_years,
+                size,
+                author,
+                page_count,
+                avg_rating,
+                review_count
+            FROM product_read
+            ORDER BY product_id
+        """
+        return self.storage.iter_rows(sql, batch_size=batch_size)
+
     def save_product(self, *, product_new: str, price: float, weight: float, category: str,  author: str | None = None, page_count: int | None = None, brand: str | None = None, warranty_years: int | None = None, size: str | None = None) -> int | None:
         try:
             # 1️ Мінімальна перевірка
             product_new = (product_new or "").strip().title()
             if not product_new:
-                print("Product name required.");
+                logger.warning("Product name required.")
                 return None
             if price is None or float(price) <= 0:
-                print("Price must be > 0.");
+                logger.warning("Price must be > 0.")
                 return None
             if weight is None or float(weight) < 0:
-                print("Weight must be >= 0.");
+                logger.warning("Weight must be >= 0.")
                 return None
             if category not in ("electronics", "clothing", "books"):
-                print("Category must be 'electronics', 'clothing' or 'books'.");
+                logger.warning("Category must be 'electronics', 'clothing' or 'books'.")
                 return None
 
             # 2 Обов’язкові поля підкатегорій
             if category == "books" and (not author or page_count is None):
-                print("Books need 'author' and 'page_count'.");
+                logger.warning("Books need 'author' and 'page_count'.")
                 return None
             if category == "electronics" and (not brand or warranty_years is None):
-                print("Electronics need 'brand' and 'warranty_years'.");
+                logger.warning("Electronics need 'brand' and 'warranty_years'.")
                 return None
             if category == "clothing" and not size:
-                print("Clothing needs 'size'.");
+                logger.warning("Clothing needs 'size'.")
                 return None
 
             # 3️ Перевірка на дубль (product + category)
@@ -105,44 +210,46 @@ class ProductMethods:
                 (product_new, category)
             )
             if dup:
-                print(f"Product already exists (ID {dup['product_id']}). No insert.")
+                logger.warning("Product already exists (ID %s). No insert.", dup['product_id'])
                 return dup["product_id"]
 
-            # 4️ Транзакція
-            self.storage.connection.begin()
-
-            sql_p = """
-                INSERT INTO product (product, price, weight, category)
-                VALUES (%s, %s, %s, %s)
-            """
-            new_id = self.storage.insert_and_get_id(sql_p, (product_new, price, weight, category))
-            if not new_id:
-                raise RuntimeError("Insert failed: no new ID returned.")
-
-            # 5 Вставка у підтаблицю
-            if category == "books":
-                self.storage.execute(
-                    "INSERT INTO books (product_id, author, page_count) VALUES (%s, %s, %s)",
-                    (new_id, author, page_count)
-                )
-            elif category == "electronics":
-                self.storage.execute(
-                    "INSERT INTO electronics (product_id, brand, warranty_years) VALUES (%s, %s, %s)",
-                    (new_id, brand, warranty_years)
-                )
-            else:  # clothing
-                self.storage.execute(
-                    "INSERT INTO clothing (product_id, size) VALUES (%s, %s)",
-                    (new_id, size)
-                )
-
-            self.storage.connection.commit()
-            print(f"Product saved with ID {new_id}.")
+            # 4️ Транзакція (product + підтаблиця, один commit)
+            with self.storage.transaction():
+                sql_p = """
+                    INSERT INTO product (product, price, weight, category)
+                    VALUES (%s, %s, %s, %s)
+                """
+                new_id = self.storage.insert_and_get_id(sql_p, (product_new, price, weight, category))
+                if not new_id:
+                    raise RuntimeError("Insert failed: no new ID returned.")
+
+                # 5 Вставка у підтаблицю
+                if category == "books":
+                    self.storage.execute(
+                        "INSERT INTO books (product_id, author, page_count) VALUES (%s, %s, %s)",
+                        (new_id, author, page_count)
+                    )
+                elif category == "electronics":
+                    self.storage.execute(
+                        "INSERT INTO electronics (product_id, brand, warranty_years) VALUES (%s, %s, %s)",
+                        (new_id, brand, warranty_years)
+                    )
+                else:  # clothing
+                    self.storage.execute(
+                        "INSERT INTO clothing (product_id, size) VALUES (%s, %s)",
+                        (new_id, size)
+                    )
+
+                self.read_model.refresh_product(new_id)
+
+            self.cache.invalidate(new_id)
+            self.search_index.upsert(new_id, {"product": product_new, "brand": brand, "author": author})
+            logger.info("Product saved with ID %s.", new_id)
             return new_id
 
         except Exception as e:
-            self.storage.connection.rollback()
-            print("Error saving product:", e)
+            self.storage.rollback()
+            logger.error("Error saving product: %s", e)
             return None
 
     def update_product(self, product_id: int, *, name: str | None = None, price: float | None = None, weight: float | None = None) -> bool:
@@ -162,104 +269,97 @@ class ProductMethods:
                 values.append(weight)
 
             if not updates:
-                print("Nothing to update.")
+                logger.info("Nothing to update.")
                 return False
 
             sql = f"UPDATE product SET {', '.join(updates)} WHERE product_id = %s"
             values.append(product_id)
 
-            affected = self.storage.execute(sql, tuple(values))
+            with self.storage.transaction():
+                affected = self.storage.execute(sql, tuple(values))
+                if affected:
+                    self.read_model.refresh_product(product_id)
             if affected:
-                self.storage.connection.commit()
-                print(f"Product ID {product_id} updated successfully.")
+                self.cache.invalidate(product_id)
+                if name:
+                    self._reindex_product(product_id)
+                logger.info("Product ID %s updated successfully.", product_id)
                 return True
             else:
-                print("No product updated.")
+                logger.info("No product updated.")
                 return False
 
         except MySQLError as e:
-            self.storage.connection.rollback()
-            print("Database error during update:", e)
+            self.storage.rollback()
+            logger.error("Database error during update: %s", e)
             return False
         except Exception as e:
-            print("Unexpected error:", e)
+            logger.error("Unexpected error: %s", e)
             return False
 
     def delete_product(self, product_id: int) -> bool:
         """Видаляє продукт за ID (разом із підтаблицею завдяки CASCADE)."""
         try:
             sql = "DELETE FROM product WHERE product_id = %s"
-            affected = self.storage.execute(sql, (product_id,))
+            with self.storage.transaction():
+                affected = self.storage.execute(sql, (product_id,))
+                if affected:
+                    self.read_model.remove_product(product_id)
             if affected:
-                self.storage.connection.commit()
-                print(f"Product ID {product_id} deleted successfully.")
+                self.cache.invalidate(product_id)
+                self.search_index.remove(product_id)
+                logger.info("Product ID %s deleted successfully.", product_id)
                 return True
             else:
-                print(f"No product found with ID {product_id}.")
+                logger.info("No product found with ID %s.", product_id)
                 return False
         except MySQLError as e:
-            self.storage.connection.rollback()
-            print("Database error during delete:", e)
+            self.storage.rollback()
+            logger.error("Database error during delete: %s", e)
             return False
         except Exception as e:
-            print("Unexpected error:", e)
+            logger.error("Unexpected error: %s", e)
             return False
 
-    def find_products_by_category(self, category: str):
+    def find_products_by_category(self, category: str) -> list[dict]:
+        """Rows of v_prod_clean (display column names), see cli.presenters."""
         rows = self.storage.fetch_all(
             "SELECT * FROM v_prod_clean WHERE Category=%s ORDER BY ID",
             (category,)
         )
-
-        if not rows:
-            print("No products for this category.")
-            return []
-
-        # --- Вибираємо колонки залежно від категорії ---
-        if category == "books":
-            headers = ["ID", "Product", "Price", "Weight", "Author", "Pages", "AvgRating", "Reviews"]
-
-        elif category == "electronics":
-            headers = ["ID", "Product", "Price", "Weight", "Brand", "Warranty", "AvgRating", "Reviews"]
-
-        elif category == "clothing":
-            headers = ["ID", "Product", "Price", "Weight", "Size", "AvgRating", "Reviews"]
-
-        else:
-            print("Unknown category.")
-            return []
-
-        # --- Преобразуємо dict → list ---
-        table = [[row.get(h, "") for h in headers] for row in rows]
-
-        # --- Виводимо таблицю ---
-        print(tabulate(table, headers=headers, tablefmt="rounded_grid"))
-
-        return rows
+        return rows or []
 
     def find_products_by_category1(self, category: str) -> list[dict]:
         if category not in ("electronics", "clothing", "books"):
-            print("Category must be 'electronics' | 'clothing' | 'books'.");
+            logger.warning("Category must be 'electronics' | 'clothing' | 'books'.")
             return []
         rows = self.storage.fetch_all(
-            "SELECT * FROM v_prod WHERE category=%s ORDER BY product_id", (category,)
+            "SELECT * FROM product_read WHERE category=%s ORDER BY product_id", (category,)
         )
-        if rows:
-            print(tabulate(rows, headers="keys", tablefmt="rounded_grid"))
-        else:
-            print("No products for this category.")
         return rows or []
 
     def find_products_under_price(self, max_price: float) -> list[dict]:
         rows = self.storage.fetch_all(
-            "SELECT * FROM v_prod WHERE price <= %s ORDER BY price, product_id", (max_price,)
+            "SELECT * FROM product_read WHERE price <= %s ORDER BY price, product_id", (max_price,)
         )
-        if rows:
-            print(tabulate(rows, headers="keys", tablefmt="rounded_grid"))
-        else:
-            print("No products under this price.")
         return rows or []
 
+    # sort key from the URL -> SQL expression (product_id is the tiebreaker)
+    SORT_COLUMNS = {
+        "id": "product_id",
+        "name": "product",
+        "category": "CAST(category AS CHAR)",   # ENUM would sort by position
+        "price": "price",
+        "rating": "COALESCE(avg_rating, 0)",
+    }
+
+    @classmethod
+    def _sort_key(cls, sort: str, search: str) -> str:
+        """The sort that is actually used: unknown -> "id", relevance only with a search."""
+        if sort == "relevance":
+            return sort if search else "id"
+        return sort if sort in cls.SORT_COLUMNS else "id"
+
     def get_products_filtered(
             self,
             *,
@@ -270,12 +370,42 @@ class ProductMethods:
             size: str = "",
             sort: str = "id",
             direction: str = "asc",
+            cursor: str | None = None,
+            limit: int | None = None,
     ) -> list[dict]:
         """
-        Load products from v_prod with optional filters.
+        Load products from product_read (materialized v_prod) with optional filters.
         All rows already contain avg_rating and review_count.
+
+        `search` matches words/prefixes of name, brand and author
+        (see search_index.py); sort="relevance" orders by best match.
+        A search lists at most the SEARCH_MAX_HITS best hits that pass the
+        filters; the hit ids go to MySQL as one JSON_TABLE parameter.
+        Rows are ordered in SQL by `sort` (see SORT_COLUMNS, unknown -> id)
+        and product_id as a stable tiebreaker.
+        Keyset paging: `cursor` comes from get_products_page(), `limit`
+        caps the number of rows. Without both, all matching rows are returned.
         """
-        sql = """
+        search_ids = self.search_products(search, limit=None) if search else []
+        if search and not search_ids:
+            return []
+        sort = self._sort_key(sort, search)
+        # position in the ranked hit list for relevance
+        sort_expr = "hit_rank" if sort == "relevance" else self.SORT_COLUMNS[sort]
+        descending = direction == "desc"
+
+        filters = {"category": category, "brand": brand, "author": author, "size": size}
+        if search_ids:
+            # the filtered hits, capped to the best SEARCH_MAX_HITS (same set as get_facets)
+            found_sql, params = self._found_sql(filters)
+            sql = f"WITH {_HIT_CTE}, found AS ({found_sql})"
+            params = [json.dumps(search_ids)] + params
+            source, where = "product_read JOIN found USING (product_id)", ""
+        else:
+            where, params = self._filter_sql(filters)
+            sql, source = "", "product_read"
+
+        sql += """
             SELECT
                 product_id,
                 product,
@@ -288,36 +418,167 @@ class ProductMethods:
                 author,
                 page_count,
                 avg_rating,
-                review_count
-            FROM v_prod
+                review_count,
+                {sort_expr} AS sort_value
+            FROM {source}
             WHERE 1 = 1
-        """
+        """.format(sort_expr=sort_expr, source=source)
+        sql += where
+
+        # keyset: continue after (or, for "prev", before) the cursor row
+        position = _decode_cursor(cursor, sort, "desc" if descending else "asc")
+        backwards = bool(position) and position["d"] == "prev"
+        if position:
+            # going back = reading the same order in reverse
+            op = "<" if descending != backwards else ">"
+            if sort_expr == "product_id":
+                sql += f" AND product_id {op} %s"
+                params.append(position["id"])
+            else:
+                sql += f" AND ({sort_expr} {op} %s OR ({sort_expr} = %s AND product_id {op} %s))"
+                params.extend([position["v"], position["v"], position["id"]])
+
+        order = "DESC" if descending != backwards else "ASC"
+        sql += f" ORDER BY {sort_expr} {order}"
+        if sort_expr != "product_id":
+            sql += f", product_id {order}"
+        if limit:
+            sql += " LIMIT %s"
+            params.append(int(limit))
+
+        key = ("filtered", search.lower(), category, brand, author, size,
+               sort_expr, order, cursor, limit)
+        rows = list(self.cache.get_or_load(key, lambda: self.storage.fetch_all(sql, params)))
+        if backwards:
+            rows.reverse()
+        return rows
 
+    @staticmethod
+    def _filter_sql(filters: dict, skip: str | None = None) -> tuple[str, list]:
+        """
+        " AND ..." conditions for the sidebar filters (facet name -> value,
+        empty = no filter). `skip` leaves one facet out.
+        """
+        sql = ""
         params: list = []
+        for column in FACETS:
+            if column != skip and filters.get(column):
+                sql += f" AND {column} = %s"
+                params.append(filters[column])
+        return sql, params
+
+    @classmethod
+    def _found_sql(cls, filters: dict, skip: str | None = None, columns: str = "product_id, hit_rank") -> tuple[str, list]:
+        """
+        Query over the `hit` CTE: the search hits that pass the filters,
+        best first, at most SEARCH_MAX_HITS – filtered first, capped second,
+        so a filter never hides a match that exists.
+        """
+        where, params = cls._filter_sql(filters, skip)
+        sql = (
+            f"SELECT {columns} FROM hit JOIN product_read USING (product_id)"
+            f" WHERE 1 = 1{where} ORDER BY hit_rank LIMIT {SEARCH_MAX_HITS}"
+        )
+        return sql, params
 
-        if category:
-            sql += " AND category = %s"
-            params.append(category)
-
-        if search:
-            sql += " AND LOWER(product) LIKE %s"
-            params.append("%" + search.lower() + "%")
-
-        if brand:
-            sql += " AND brand = %s"
-            params.append(brand)
+    def get_facets(
+            self,
+            *,
+            search: str = "",
+            category: str = "",
+            brand: str = "",
+            author: str = "",
+            size: str = "",
+    ) -> dict[str, list[dict]]:
+        """
+        Values with product counts for the filter sidebar, for the current
+        filter state: {"category": [{"value": "books", "count": 12}, ...], ...}.
+
+        Each facet is counted with all other filters applied but not its own,
+        so the alternatives to the selected value stay visible.
+        With a search, the counts are over the same hits as the listing
+        (filtered, then capped to SEARCH_MAX_HITS; see _found_sql).
+        All facets come from one UNION ALL of grouped queries (indexed columns).
+        """
+        facets = {name: [] for name in FACETS}
+        search_ids = self.search_products(search, limit=None) if search else []
+        if search and not search_ids:
+            return facets
+
+        filters = {"category": category, "brand": brand, "author": author, "size": size}
+        parts = []
+        params: list = [json.dumps(search_ids)] if search_ids else []
+        for name in FACETS:
+            if search_ids:
+                found_sql, where_params = self._found_sql(filters, skip=name, columns=name)
+                source, where = f"({found_sql}) AS found", ""
+            else:
+                where, where_params = self._filter_sql(filters, skip=name)
+                source = "product_read"
+            parts.append(
+                f"SELECT '{name}' AS facet, CAST({name} AS CHAR) AS value, COUNT(*) AS count"
+                f" FROM {source} WHERE {name} IS NOT NULL AND {name} <> ''{where}"
+                f" GROUP BY {name}"
+            )
+            params.extend(where_params)
+        sql = " UNION ALL ".join(parts) + " ORDER BY facet, value"
+        if search_ids:
+            sql = f"WITH {_HIT_CTE} {sql}"
 
-        if author:
-            sql += " AND author = %s"
-            params.append(author)
+        key = ("facets", search.lower(), category, brand, author, size)
+        try:
+            rows = self.cache.get_or_load(key, lambda: self.storage.fetch_all(sql, params))
+        except MySQLError as e:
+            logger.error("Error loading facets: %s", e)
+            return facets
+        for row in rows:
+            facets[row["facet"]].append({"value": row["value"], "count": row["count"]})
+        return facets
+
+    def search_products(self, query: str, limit: int | None = SEARCH_MAX_HITS) -> list[int]:
+        """Product ids matching `query`, best match first (at most `limit`, None = all)."""
+        try:
+            self.search_index.refresh_if_stale(
+                lambda: self.storage.fetch_all("SELECT product_id, product, brand, author FROM product_read")
+            )
+        except MySQLError as e:
+            logger.error("Error building product search index: %s", e)
+        return self.search_index.search(query, limit=limit)
 
-        if size:
-            sql += " AND size = %s"
-            params.append(size)
+    def _reindex_product(self, product_id: int) -> None:
+        row = self.storage.fetch_one(
+            "SELECT product_id, product, brand, author FROM product_read WHERE product_id = %s",
+            (product_id,),
+        )
+        if row:
+            self.search_index.upsert(product_id, row)
 
-        # сортування залишаємо в Python (product_list), тут ORDER BY не потрібен
-        rows = self.storage.fetch_all(sql, params)
-        return rows
+    def get_products_page(self, *, limit: int = 50, cursor: str | None = None, **filters) -> dict:
+        """
+        One page of get_products_filtered() plus cursors for the pager:
+        {"products": [...], "next_cursor": str | None, "prev_cursor": str | None}
+        `filters` are the same keyword arguments (search, category, sort, ...).
+        """
+        rows = self.get_products_filtered(cursor=cursor, limit=limit + 1, **filters)
+        has_more = len(rows) > limit
+        sort = self._sort_key(filters.get("sort", "id"), filters.get("search", ""))
+        order = "desc" if filters.get("direction") == "desc" else "asc"
+        position = _decode_cursor(cursor, sort, order)
+
+        if position and position["d"] == "prev":
+            # the extra row is the one before the page
+            if has_more:
+                rows = rows[1:]
+            has_prev, has_next = has_more, True
+        else:
+            rows = rows[:limit]
+            has_prev, has_next = bool(position), has_more
+
+        return {
+            "products": rows,
+            "next_cursor": _encode_cursor(rows[-1], "next", sort, order) if rows and has_next else None,
+            "prev_cursor": _encode_cursor(rows[0], "prev", sort, order) if rows and has_prev else None,
+        }
 
     def close(self):
         self.storage.disconnect()
@@ -0,0 +1,87 @@
+from connection.storage import Storage
+
+# columns of product_read (same as v_prod)
+READ_COLUMNS = """
+    product_id, product, price, weight, category,
+    brand, warranty_years, size, author, page_count,
+    avg_rating, review_count
+"""
+
+# one product, computed from the base tables (same logic as v_prod)
+_SELECT_ONE = """
+    SELECT
+        p.product_id,
+        p.product,
+        p.price,
+        p.weight,
+        p.category,
+        e.brand,
+        e.warranty_years,
+        c.size,
+        b.author,
+        b.page_count,
+        (SELECT ROUND(AVG(r.rating), 1) FROM review r WHERE r.product_id = p.product_id),
+        (SELECT NULLIF(COUNT(*), 0)     FROM review r WHERE r.product_id = p.product_id)
+    FROM product p
+    LEFT JOIN electronics e ON e.product_id = p.product_id
+    LEFT JOIN clothing   c  ON c.product_id = p.product_id
+    LEFT JOIN books      b  ON b.product_id = p.product_id
+    WHERE p.product_id = %s
+"""
+
+
+class ProductReadModel:
+    """
+    Maintains the denormalized `product_read` table (SQL/product_read.sql).
+    All catalog reads go to product_read; every write to product, its
+    subtype tables or review must call one of the methods below, ideally
+    inside the same transaction as the write itself.
+    """
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+
+    def refresh_product(self, product_id: int) -> None:
+        """Re-compute the whole row of one product (after insert/update)."""
+        self.storage.execute(
+            f"REPLACE INTO product_read ({READ_COLUMNS}) {_SELECT_ONE}",
+            (product_id,),
+        )
+
+    def remove_product(self, product_id: int) -> None:
+        self.storage.execute("DELETE FROM product_read WHERE product_id = %s", (product_id,))
+
+    def refresh_rating(self, product_id: int) -> None:
+        """
+        Copy avg_rating / review_count from product_rating (after a review
+        insert/delete – the aggregates must be updated first).
+        """
+        self.storage.execute(
+            """
+            UPDATE product_read pr
+            LEFT JOIN product_rating agg ON agg.product_id = pr.product_id
+            SET pr.avg_rating   = ROUND(agg.rating_sum / agg.review_count, 1),
+                pr.review_count = agg.review_count
+            WHERE pr.product_id = %s
+            """,
+            (product_id,),
+        )
+
+    def rebuild(self) -> int:
+        """Full rebuild from the base tables (recovery). Returns number of rows."""
+        with self.storage.transaction():
+            self.storage.execute("DELETE FROM product_read")
+            self.storage.execute(
+                f"INSERT INTO product_read ({READ_COLUMNS}) SELECT {READ_COLUMNS} FROM v_prod"
+            )
+        row = self.storage.fetch_one("SELECT COUNT(*) AS n FROM product_read")
+        return row["n"] if row else 0
+
+
+# Full rebuild from the command line
+if __name__ == "__main__":
+    storage = Storage()
+    storage.connect()
+    count = ProductReadModel(storage).rebuild()
+    print(f"product_read rebuilt: {count} products.")
+    storage.disconnect()
@@ -0,0 +1,145 @@
+import bisect
+import re
+import threading
+import time
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# how much a match in each field counts for relevance
+FIELD_WEIGHTS = {"product": 3.0, "brand": 1.5, "author": 1.5}
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lower-case word tokens of a text ("Dell XPS-13" -> ["dell", "xps", "13"])."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+class ProductSearchIndex:
+    """
+    In-process inverted index over product names, brands and authors.
+
+    - search("lapt del") finds products where every query word is a prefix
+      of some indexed word (search-as-you-type)
+    - results are ranked: exact word > prefix, name > brand/author
+    - upsert()/remove() keep it current on product writes in this process;
+      after `max_age` seconds it is rebuilt from the DB, so changes made
+      by other processes show up as well
+    """
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self._postings: dict[str, dict[int, float]] = {}   # token -> {product_id: weight}
+        self._docs: dict[int, dict[str, float]] = {}       # product_id -> {token: weight}
+        self._tokens: list[str] = []                       # sorted, for prefix lookup
+        self._built_at: float | None = None
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # one loader at a time
+
+    # ---------- building ----------
+
+    def is_stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at > self.max_age
+
+    def refresh_if_stale(self, loader) -> None:
+        """
+        Rebuild from loader() (rows as for rebuild()) if the index is stale.
+        Concurrent callers do not load in parallel: one thread loads, the
+        others wait for it and then find the index fresh.
+        If loader() raises, the index stays as it is (and stays stale).
+        """
+        if not self.is_stale():
+            return
+        with self._build_lock:
+            if self.is_stale():
+                self.rebuild(loader())
+
+    def rebuild(self, rows) -> None:
+        """Replace the whole index; rows need product_id, product, brand, author."""
+        with self._lock:
+            self._postings.clear()
+            self._docs.clear()
+            for row in rows:
+                self._add(row["product_id"], row)
+            self._tokens = sorted(self._postings)
+            self._built_at = time.monotonic()
+
+    def upsert(self, product_id: int, row: dict) -> None:
+        """Add or re-index one product (row: product, brand, author)."""
+        with self._lock:
+            if self._built_at is None:
+                return   # not built yet – the first search loads everything anyway
+            self._remove(product_id)
+            self._add(product_id, row)
+            self._tokens = sorted(self._postings)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            self._remove(product_id)
+            self._tokens = sorted(self._postings)
+
+    def _add(self, product_id: int, row: dict) -> None:
+        doc: dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(row.get(field)):
+                doc[token] = max(doc.get(token, 0.0), weight)
+        self._docs[product_id] = doc
+        for token, weight in doc.items():
+            self._postings.setdefault(token, {})[product_id] = weight
+
+    def _remove(self, product_id: int) -> None:
+        doc = self._docs.pop(product_id, None)
+        if not doc:
+            return
+        for token in doc:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+
+    # ---------- searching ----------
+
+    def search(self, query: str, limit: int | None = None) -> list[int]:
+        """
+        Product ids matching all words of `query`, best match first
+        (ties: lower product_id first).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            scores: dict[int, float] | None = None
+            for term in terms:
+                term_scores = self._match_term(term)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {pid: scores[pid] + s for pid, s in term_scores.items() if pid in scores}
+                if not scores:
+                    return []
+
+        ranked = sorted(scores, key=lambda pid: (-scores[pid], pid))
+        return ranked[:limit] if limit else ranked
+
+    def _match_term(self, term: str) -> dict[int, float]:
+        """{product_id: score} for one query word (exact or prefix match)."""
+        result: dict[int, float] = {}
+        start = bisect.bisect_left(self._tokens, term)
+        for token in self._tokens[start:]:
+            if not token.startswith(term):
+                break
+            # an exact word counts double, a prefix a bit less the longer the rest
+            factor = 2.0 if token == term else len(term) / len(token)
+            for pid, weight in self._postings[token].items():
+                score = weight * factor
+                if score > result.get(pid, 0.0):
+                    result[pid] = score
+        return result
+
+
+# one index per process, shared by all ProductMethods instances
+search_index = ProductSearchIndex()
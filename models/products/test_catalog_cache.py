@@ -0,0 +1,60 @@
+from models.products.catalog_cache import CatalogCache
+
+
+def test_get_or_load_caches():
+    cache = CatalogCache()
+    calls = []
+    assert cache.get_or_load(("basic", 1), lambda: calls.append(1) or "row") == "row"
+    assert cache.get_or_load(("basic", 1), lambda: calls.append(1) or "other") == "row"
+    assert len(calls) == 1
+
+
+def test_none_and_errors_are_not_cached():
+    cache = CatalogCache()
+    assert cache.get_or_load(("basic", 1), lambda: None) is None
+
+    def broken():
+        raise RuntimeError("db down")
+
+    try:
+        cache.get_or_load(("basic", 1), broken)
+    except RuntimeError:
+        pass
+    assert cache.get(("basic", 1)) is None
+
+
+def test_invalidate_during_load_is_not_overwritten():
+    cache = CatalogCache()
+
+    def load_then_write():
+        value = "before the write"
+        cache.invalidate(1)   # a writer commits while the reader is loading
+        return value
+
+    assert cache.get_or_load(("basic", 1), load_then_write) == "before the write"
+    assert cache.get(("basic", 1)) is None
+    assert cache.get_or_load(("basic", 1), lambda: "after the write") == "after the write"
+    assert cache.get(("basic", 1)) == "after the write"
+
+
+def test_invalidate_product_drops_lists_and_its_entries():
+    cache = CatalogCache()
+    cache.set(("all",), ["a"])
+    cache.set(("basic", 1), "one")
+    cache.set(("basic", 2), "two")
+    cache.invalidate(1)
+    assert cache.get(("all",)) is None
+    assert cache.get(("basic", 1)) is None
+    assert cache.get(("basic", 2)) == "two"
+
+
+def test_expiry_and_size_limit():
+    cache = CatalogCache(ttl=-1.0)
+    cache.set(("basic", 1), "one")
+    assert cache.get(("basic", 1)) is None
+
+    cache = CatalogCache(max_size=2)
+    for pid in (1, 2, 3):
+        cache.set(("basic", pid), pid)
+    assert cache.get(("basic", 1)) is None
+    assert cache.get(("basic", 3)) == 3
@@ -0,0 +1,74 @@
+import base64
+import json
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("pymysql")
+
+from models.products.product_methods import ProductMethods, _decode_cursor, _encode_cursor
+
+
+def _raw(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def test_round_trip():
+    cursor = _encode_cursor({"sort_value": "Laptop HP", "product_id": 42}, "next", "name", "asc")
+    assert _decode_cursor(cursor, "name", "asc") == {"v": "Laptop HP", "id": 42, "d": "next", "s": "name", "o": "asc"}
+
+
+def test_decimal_sort_value_is_kept_exact():
+    cursor = _encode_cursor({"sort_value": Decimal("1899.99"), "product_id": 7}, "prev", "price", "desc")
+    data = _decode_cursor(cursor, "price", "desc")
+    assert data["v"] == "1899.99"
+    assert data["d"] == "prev"
+
+
+def test_cursor_is_url_safe():
+    cursor = _encode_cursor({"sort_value": "???>>>", "product_id": 1}, "next", "name", "asc")
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_empty_cursor_is_first_page(cursor):
+    assert _decode_cursor(cursor, "id", "asc") is None
+
+
+@pytest.mark.parametrize("sort, order", [("price", "asc"), ("name", "desc"), ("id", "asc")])
+def test_cursor_of_another_sort_is_first_page(sort, order):
+    cursor = _encode_cursor({"sort_value": "Laptop HP", "product_id": 42}, "next", "name", "asc")
+    assert _decode_cursor(cursor, sort, order) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64 at all!",
+        base64.urlsafe_b64encode(b"{broken json").decode(),
+        _raw([1, 2, 3]),
+        _raw("v id d"),
+        _raw(5),
+        _raw({"v": 1, "id": 2, "s": "price", "o": "asc"}),                 # no direction
+        _raw({"v": 1, "id": 2, "d": "sideways", "s": "price", "o": "asc"}),
+        _raw({"id": 2, "d": "next", "s": "price", "o": "asc"}),            # no sort value
+        _raw({"v": 1, "d": "next", "s": "price", "o": "asc"}),             # no id
+        _raw({"v": 1, "id": 2, "d": "next"}),                              # no sort / order
+        _raw({"v": 1, "id": "2 OR 1=1", "d": "next", "s": "price", "o": "asc"}),
+        _raw({"v": 1, "id": None, "d": "next", "s": "price", "o": "asc"}),
+        _raw({"v": [1, 2], "id": 1, "d": "next", "s": "price", "o": "asc"}),
+        _raw({"v": {"a": 1}, "id": 1, "d": "next", "s": "price", "o": "asc"}),
+        _raw({"v": None, "id": 1, "d": "next", "s": "price", "o": "asc"}),
+        _raw({"v": True, "id": 1, "d": "next", "s": "price", "o": "asc"}),
+    ],
+)
+def test_tampered_cursor_is_first_page(cursor):
+    assert _decode_cursor(cursor, "price", "asc") is None
+
+
+@pytest.mark.parametrize(
+    "sort, search, key",
+    [("price", "", "price"), ("relevance", "laptop", "relevance"), ("relevance", "", "id"), ("bogus", "x", "id")],
+)
+def test_sort_key(sort, search, key):
+    assert ProductMethods._sort_key(sort, search) == key
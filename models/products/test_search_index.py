@@ -0,0 +1,87 @@
+import pytest
+
+from models.products.search_index import ProductSearchIndex, tokenize
+
+ROWS = [
+    {"product_id": 1, "product": "Laptop Dell XPS-13", "brand": "Dell", "author": None},
+    {"product_id": 2, "product": "Laptop HP EliteBook", "brand": "HP", "author": None},
+    {"product_id": 3, "product": "Der kleine Prinz", "brand": None, "author": "Antoine de Saint-Exupéry"},
+    {"product_id": 4, "product": "Laptoptasche", "brand": "Dell", "author": None},
+    {"product_id": 5, "product": "Dellwood Mug", "brand": None, "author": None},
+]
+
+
+@pytest.fixture
+def index():
+    idx = ProductSearchIndex()
+    idx.rebuild(ROWS)
+    return idx
+
+
+@pytest.mark.parametrize(
+    "text, tokens",
+    [
+        ("Dell XPS-13", ["dell", "xps", "13"]),
+        ("  T-Shirt   Gelb ", ["t", "shirt", "gelb"]),
+        ("Saint-Exupéry", ["saint", "exupéry"]),
+        ("", []),
+        (None, []),
+    ],
+)
+def test_tokenize(text, tokens):
+    assert tokenize(text) == tokens
+
+
+def test_every_query_word_must_match(index):
+    assert index.search("laptop hp") == [2]
+    assert index.search("laptop canon") == []
+
+
+def test_prefix_search(index):
+    assert set(index.search("lapt")) == {1, 2, 4}
+    assert index.search("exup") == [3]
+
+
+def test_exact_word_ranks_before_prefix(index):
+    # "laptop" is a whole word of 1 and 2, only a prefix of "laptoptasche"
+    assert index.search("laptop")[-1] == 4
+
+
+def test_name_ranks_before_brand(index):
+    # exact "dell": name + brand (1) > brand (4); "dellwood" is only a prefix (5)
+    assert index.search("dell") == [1, 4, 5]
+
+
+def test_ties_by_product_id(index):
+    assert index.search("laptop")[:2] == [1, 2]
+
+
+def test_limit(index):
+    assert index.search("lapt", limit=2) == index.search("lapt")[:2]
+
+
+def test_upsert_and_remove(index):
+    index.upsert(2, {"product": "Notebook HP EliteBook", "brand": "HP", "author": None})
+    assert 2 not in index.search("laptop")
+    assert index.search("notebook") == [2]
+
+    index.remove(1)
+    assert index.search("xps") == []
+
+
+def test_upsert_before_first_build_is_ignored():
+    idx = ProductSearchIndex()
+    idx.upsert(1, ROWS[0])
+    assert idx.is_stale()
+    assert idx.search("laptop") == []
+
+
+def test_refresh_if_stale_keeps_index_when_loader_fails(index):
+    index.max_age = -1.0   # always stale
+
+    def broken_loader():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        index.refresh_if_stale(broken_loader)
+    assert index.search("prinz") == [3]
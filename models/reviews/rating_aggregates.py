@@ -0,0 +1,83 @@
+from connection.storage import Storage
+
+_TABLES = {
+    "product": ("product_rating", "product_id"),
+    "customer": ("customer_rating", "customer_id"),
+}
+
+
+class RatingAggregates:
+    """
+    Keeps product_rating / customer_rating (SQL/rating_aggregates.sql) in sync
+    with the review table: count, sum, min and max per product and customer.
+    Call inside the transaction that inserts/deletes the review.
+    """
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+
+    def add_review(self, product_id: int, customer_id: int, rating: float) -> None:
+        """A new review was inserted: O(1) update of both aggregate rows."""
+        for kind, key in (("product", product_id), ("customer", customer_id)):
+            table, column = _TABLES[kind]
+            self.storage.execute(
+                f"""
+                INSERT INTO {table} ({column}, review_count, rating_sum, min_rating, max_rating)
+                VALUES (%s, 1, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    review_count = review_count + 1,
+                    rating_sum   = rating_sum + VALUES(rating_sum),
+                    min_rating   = LEAST(COALESCE(min_rating, VALUES(min_rating)), VALUES(min_rating)),
+                    max_rating   = GREATEST(COALESCE(max_rating, VALUES(max_rating)), VALUES(max_rating))
+                """,
+                (key, rating, rating, rating),
+            )
+
+    def remove_review(self, product_id: int, customer_id: int) -> None:
+        """
+        A review was deleted. Min/max cannot be decremented, so both rows are
+        re-computed – only from the reviews of this product / customer (indexed).
+        """
+        self._recompute("product", product_id)
+        self._recompute("customer", customer_id)
+
+    def refresh_product(self, product_id: int) -> None:
+        """Re-compute one product row (e.g. its reviews were removed by a cascade)."""
+        self._recompute("product", product_id)
+
+    def _recompute(self, kind: str, key: int) -> None:
+        table, column = _TABLES[kind]
+        self.storage.execute(f"DELETE FROM {table} WHERE {column} = %s", (key,))
+        self.storage.execute(
+            f"""
+            INSERT INTO {table} ({column}, review_count, rating_sum, min_rating, max_rating)
+            SELECT {column}, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+            FROM review
+            WHERE {column} = %s
+            GROUP BY {column}
+            """,
+            (key,),
+        )
+
+    def rebuild(self) -> None:
+        """Full rebuild from the review table (recovery)."""
+        with self.storage.transaction():
+            for table, column in _TABLES.values():
+                self.storage.execute(f"DELETE FROM {table}")
+                self.storage.execute(
+                    f"""
+                    INSERT INTO {table} ({column}, review_count, rating_sum, min_rating, max_rating)
+                    SELECT {column}, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+                    FROM review
+                    GROUP BY {column}
+                    """
+                )
+
+
+# Full rebuild from the command line
+if __name__ == "__main__":
+    storage = Storage()
+    storage.connect()
+    RatingAggregates(storage).rebuild()
+    print("product_rating / customer_rating rebuilt.")
+    storage.disconnect()
@@ -1,17 +1,26 @@
+import logging
+
 from connection.storage import Storage
 import pymysql
-from tabulate import tabulate
+from models.products.catalog_cache import catalog_cache
+from models.products.read_model import ProductReadModel
+from models.reviews.rating_aggregates import RatingAggregates
+
+logger = logging.getLogger(__name__)
+
 
 class ReviewMethods:
     """
     Methods for working with reviews from console and web.
-    Uses Storage for DB access and prints human-readable output
-    for console usage.
+    Uses Storage for DB access and only returns rows; console output
+    lives in cli.presenters.
     """
 
     def __init__(self):
         self.storage = Storage()
         self.storage.connect()
+        self.read_model = ProductReadModel(self.storage)
+        self.aggregates = RatingAggregates(self.storage)
 
     def get_all_reviews(self) -> list[dict]:
         sql = """
@@ -28,9 +37,24 @@ class ReviewMethods:
         try:
             return self.storage.fetch_all(sql)
         except pymysql.MySQLError as e:
-            print("Error loading reviews:", e)
+            logger.error("Error loading reviews: %s", e)
             return []
 
+    def iter_all_reviews(self, batch_size: int = 500):
+        """Stream all reviews (same columns as get_all_reviews) in constant memory."""
+        sql = """
+            SELECT
+                review_id,
+                review_rating,
+                review_comment,
+                review_date,
+                customer_name,
+                product_name
+            FROM v_rating
+            ORDER BY review_date DESC, review_id DESC
+        """
+        return self.storage.iter_rows(sql, batch_size=batch_size)
+
     def get_purchased_products(self, customer_id: int) -> list[dict]:
         """
         Return DISTINCT products that this customer has bought.
@@ -50,7 +74,7 @@ class ReviewMethods:
         try:
             return self.storage.fetch_all(sql, (customer_id,))
         except pymysql.MySQLError as e:
-            print("Error loading purchased products:", e)
+            logger.error("Error loading purchased products: %s", e)
             return []
 
     def create_review(
@@ -66,7 +90,7 @@ class ReviewMethods:
         """
         # simple validation of rating
         if rating < 1 or rating > 5:
-            print("create_review: rating must be between 1 and 5.")
+            logger.warning("create_review: rating must be between 1 and 5.")
             return False
 
         try:
@@ -81,7 +105,7 @@ class ReviewMethods:
             """
             row = self.storage.fetch_one(sql_check, (customer_id, product_id))
             if not row:
-                print("create_review: customer has not purchased this product.")
+                logger.warning("create_review: customer has not purchased this product.")
                 return False
 
             # (optional) forbid a second review for the same product
@@ -93,24 +117,41 @@ class ReviewMethods:
             """
             already = self.storage.fetch_one(sql_exists, (customer_id, product_id))
             if already:
-                print("create_review: review for this product already exists.")
+                logger.warning("create_review: review for this product already exists.")
                 return False
 
             # 2) Insert review
-            sql_insert = """
-                INSERT INTO review (customer_id, product_id, rating, comment)
-                VALUES (%s, %s, %s, %s)
-            """
-            self.storage.execute(sql_insert, (customer_id, product_id, rating, comment))
-            self.storage.connection.commit()
-            print("Review created successfully.")
+            self.insert_review(customer_id, product_id, rating, comment)
+            logger.info("Review created successfully.")
             return True
 
         except pymysql.MySQLError as e:
-            print("Error creating review:", e)
-            self.storage.connection.rollback()
+            logger.error("Error creating review: %s", e)
+            self.storage.rollback()
             return False
 
+    def insert_review(
+        self,
+        customer_id: int,
+        product_id: int,
+        rating: float,
+        comment: str | None = None,
+    ) -> None:
+        """
+        Insert a review (no business checks) and, in the same transaction,
+        update the rating aggregates and the product read model.
+        Raises pymysql.MySQLError on failure (nothing is written then).
+        """
+        sql_insert = """
+            INSERT INTO review (customer_id, product_id, rating, comment)
+            VALUES (%s, %s, %s, %s)
+        """
+        with self.storage.transaction():
+            self.storage.execute(sql_insert, (customer_id, product_id, rating, comment))
+            self.aggregates.add_review(product_id, customer_id, rating)
+            self.read_model.refresh_rating(product_id)
+        catalog_cache.invalidate(product_id)   # avg_rating / review_count changed
+
     def get_reviews_for_product(self, product_id: int) -> list[dict]:
         sql = """SELECT 
                     product_total_reviews,
@@ -119,66 +160,34 @@ class ReviewMethods:
                     review_date,
                     review_rating,
                     review_comment
-                FROM v_rating WHERE product_id = %s"""
+                FROM v_rating WHERE product_id = %s
+                ORDER BY review_date DESC, review_id DESC"""
         try:
             rows = self.storage.fetch_all(sql, (product_id,))
         except pymysql.MySQLError as e:
-            print("Error loading reviews for product:", e)
+            logger.error("Error loading reviews for product: %s", e)
             return []
-        if not rows:
-            print(f"No reviews found for product ID {product_id}.")
-            return []
-
-        total_reviews = rows[0]["product_total_reviews"]
-        product_name = rows[0]["product_name"]
-        avg_rating = rows[0]["product_average_rating"]
-        print(f"Total {total_reviews} reviews for product ID {product_id} {product_name}, average rating: {avg_rating}/5")
-
-        table_rows = [
-            {
-                "date": r["review_date"],
-                "rating": r["review_rating"],
-                "comment": r["review_comment"],
-            }
-            for r in rows
-        ]
-        print(tabulate(table_rows, headers="keys", tablefmt="rounded_grid"))
-
-        return rows
+        return rows or []
 
     def get_rating_summary_for_product(self, product_id: int) -> dict | None:
         sql = """
             SELECT
                 p.product_id,
-                p.product       AS product_name,
-                COUNT(r.review_id) AS review_count,
-                AVG(r.rating)      AS avg_rating,
-                MIN(r.rating)      AS min_rating,
-                MAX(r.rating)      AS max_rating
+                p.product                         AS product_name,
+                COALESCE(pr.review_count, 0)      AS review_count,
+                pr.rating_sum / pr.review_count   AS avg_rating,
+                pr.min_rating,
+                pr.max_rating
             FROM product p
-            LEFT JOIN review r ON r.product_id = p.product_id
+            LEFT JOIN product_rating pr ON pr.product_id = p.product_id
             WHERE p.product_id = %s
-            GROUP BY p.product_id, p.product
         """
         try:
             row = self.storage.fetch_one(sql, (product_id,))
         except pymysql.MySQLError as e:
-            print("Error loading rating summary for product:", e)
+            logger.error("Error loading rating summary for product: %s", e)
             return None
 
-        if not row:
-            print(f"Product with ID {product_id} not found.")
-            return None
-
-        print(f"Rating summary for product [{row['product_id']}] {row['product_name']}:")
-        if row["review_count"] == 0:
-            print("No reviews yet.")
-        else:
-            print(f"Reviews: {row['review_count']}")
-            print(f"Average rating: {float(row['avg_rating']):.2f}/5")
-            print(f"Min rating: {float(row['min_rating']):.1f}")
-            print(f"Max rating: {float(row['max_rating']):.1f}")
-
         return row
 
     def get_reviews_for_customer(self, customer_id: int) -> list[dict]:
@@ -195,61 +204,28 @@ class ReviewMethods:
         try:
             rows = self.storage.fetch_all(sql, (customer_id,))
         except pymysql.MySQLError as e:
-            print("Error loading reviews for customer:", e)
-            return []
-        if not rows:
-            print(f"No reviews found for customer ID {customer_id}.")
+            logger.error("Error loading reviews for customer: %s", e)
             return []
-
-        total_reviews = rows[0]["customer_total_reviews"]
-        customer_name = rows[0]["customer_name"]
-        avg_rating = rows[0]["customer_average_rating"]
-        print(f"Total {total_reviews} reviews written by customer "
-              f"ID {customer_id} {customer_name}, average rating: {avg_rating}/5")
-
-        table_rows = [
-            {
-                "date": r["review_date"],
-                "rating": r["review_rating"],
-                "comment": r["review_comment"],
-            }
-            for r in rows
-        ]
-        print(tabulate(table_rows, headers="keys", tablefmt="rounded_grid"))
-
-        return rows
+        return rows or []
 
     def get_rating_summary_for_customer(self, customer_id: int) -> dict | None:
         sql = """SELECT 
-                      customer_total_reviews,
-                      customer_name,
-                      customer_average_rating,
-                      customer_min_rating,
-                      customer_max_rating
-                  FROM v_rating WHERE customer_id = %s"""
+                      cr.review_count                               AS customer_total_reviews,
+                      c.name                                        AS customer_name,
+                      ROUND(cr.rating_sum / cr.review_count, 1)     AS customer_average_rating,
+                      cr.min_rating                                 AS customer_min_rating,
+                      cr.max_rating                                 AS customer_max_rating
+                  FROM customer_rating cr
+                  JOIN customers c ON c.customer_id = cr.customer_id
+                  WHERE cr.customer_id = %s"""
         try:
             row = self.storage.fetch_one(sql, (customer_id,))
         except pymysql.MySQLError as e:
-            print("Error loading rating summary for customer:", e)
-            return None
-
-        if not row:
-            print(f"No reviews found for customer ID {customer_id}.")
+            logger.error("Error loading rating summary for customer: %s", e)
             return None
 
-        customer_name = row["customer_name"]
-
-        print(f"Rating summary for customer {customer_id} {customer_name}:")
-        if row["customer_total_reviews"] == 0:
-            print("No reviews written yet.")
+        if not row or not row["customer_total_reviews"]:
             return None
-        else:
-            print(f"Reviews: {row['customer_total_reviews']}")
-            print(f"Average rating: {float(row['customer_average_rating']):.2f}/5")
-            print(f"Min rating: {float(row['customer_min_rating']):.1f}")
-            print(f"Max rating: {float(row['customer_max_rating']):.1f}")
-            print(tabulate([row],headers="keys", tablefmt="rounded_grid"))
-
         return row
 
     def delete_review(self, review_id: int) -> bool:
@@ -258,6 +234,8 @@ class ReviewMethods:
             sql_select = """
                 SELECT
                     r.review_id,
+                    r.product_id,
+                    r.customer_id,
                     r.rating,
                     r.comment,
                     r.created_at,
@@ -270,23 +248,26 @@ class ReviewMethods:
             """
             row = self.storage.fetch_one(sql_select, (review_id,))
             if not row:
-                print(f"Review with ID {review_id} not found.")
+                logger.info("Review with ID %s not found.", review_id)
                 return False
 
             # 2) Delete review
             sql_delete = "DELETE FROM review WHERE review_id = %s"
-            self.storage.execute(sql_delete, (review_id,))
-            self.storage.connection.commit()
-
-            print(
-                f"Review [{review_id}] for product '{row['product_name']}' "
-                f"by {row['customer_name']} deleted."
+            with self.storage.transaction():
+                self.storage.execute(sql_delete, (review_id,))
+                self.aggregates.remove_review(row["product_id"], row["customer_id"])
+                self.read_model.refresh_rating(row["product_id"])
+            catalog_cache.invalidate(row["product_id"])
+
+            logger.info(
+                "Review [%s] for product '%s' by %s deleted.",
+                review_id, row["product_name"], row["customer_name"],
             )
             return True
 
         except pymysql.MySQLError as e:
-            print("Error deleting review:", e)
-            self.storage.connection.rollback()
+            logger.error("Error deleting review: %s", e)
+            self.storage.rollback()
             return False
 
     def get_review(self, review_id: int) -> list[dict]:
@@ -303,13 +284,9 @@ class ReviewMethods:
         try:
             row = self.storage.fetch_one(sql, (review_id,))
         except pymysql.MySQLError as e:
-            print("Error loading reviews for product:", e)
-            return []
-        if not row:
-            print(f"No reviews found with ID {review_id}.")
+            logger.error("Error loading reviews for product: %s", e)
             return []
-        print(tabulate([row], headers="keys", tablefmt="rounded_grid"))
-        return row
+        return row or []
 
 
     def close(self):
@@ -22,7 +22,14 @@ function changeQty(button, delta) {
   // 7. Повертаємо нове значення у поле
   input.value = value;
 
-  // 8. Автоматично відправляємо форму POST
-  form.submit();
+  // 8. Відправляємо нову кількість через JSON API (cart_ajax.js),
+  //    без нього / при помилці – звичайний POST форми
+  if (typeof setCartQty === 'function' && form.dataset.productId) {
+    setCartQty(form.dataset.productId, value).then(ok => {
+      if (!ok) form.submit();
+    });
+  } else {
+    form.submit();
+  }
 }
 
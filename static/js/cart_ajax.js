@@ -1,22 +1,77 @@
-async function addToCart(productId) {
+// JSON cart API (orders_controller.py, /api/cart/...) – changes the cart
+// without reloading the page. Forms still work without JavaScript.
+
+async function postCart(url, body) {
     try {
-        let response = await fetch(`/add-to-cart/${productId}`, {
+        const response = await fetch(url, {
             method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(body || {}),
         });
 
         if (!response.ok) {
-            console.log("Error adding to cart");
-            return;
-        }
-
-        // optionally update cart total on page
-        const data = await response.json();
-        if (data.cart_total !== undefined) {
-            const el = document.getElementById("cart-total");
-            if (el) el.textContent = data.cart_total.toFixed(2) + " €";
+            console.log("Cart error:", response.status);
+            return null;
         }
+        return await response.json();
 
     } catch (err) {
         console.log("AJAX error:", err);
+        return null;
+    }
+}
+
+// put the new quantity / line total / cart total into the page
+function updateCartUi(data) {
+    document.querySelectorAll("[data-cart-total]").forEach(el => {
+        el.textContent = data.cart_total_eur + " €";
+    });
+
+    if (data.product_id === undefined) return;
+
+    document.querySelectorAll(`.qty-form[data-product-id="${data.product_id}"] input[name="qty"]`)
+        .forEach(input => { input.value = data.quantity; });
+
+    document.querySelectorAll(`[data-line-total="${data.product_id}"]`).forEach(el => {
+        el.textContent = data.line_total_eur + " €";
+    });
+
+    // cart page: a line with quantity 0 is gone
+    if (data.quantity === 0) {
+        const row = document.querySelector(`[data-remove-empty] #row-${data.product_id}`);
+        if (row) row.remove();
     }
 }
+
+async function addToCart(productId, qty = 1) {
+    const data = await postCart(`/api/cart/add/${productId}`, { qty: qty });
+    if (data) updateCartUi(data);
+    return data !== null;
+}
+
+async function setCartQty(productId, qty) {
+    const data = await postCart(`/api/cart/set/${productId}`, { qty: qty });
+    if (data) updateCartUi(data);
+    return data !== null;
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    // 🛒 buttons
+    document.querySelectorAll(".add-to-cart-form").forEach(form => {
+        form.addEventListener("submit", async event => {
+            event.preventDefault();
+            const ok = await addToCart(form.dataset.productId);
+            if (!ok) form.submit();   // fallback: normal POST + redirect
+        });
+    });
+
+    // Enter in a quantity field
+    document.querySelectorAll(".qty-form[data-product-id]").forEach(form => {
+        form.addEventListener("submit", async event => {
+            event.preventDefault();
+            const input = form.querySelector('input[name="qty"]');
+            const ok = await setCartQty(form.dataset.productId, parseInt(input.value || "0", 10) || 0);
+            if (!ok) form.submit();
+        });
+    });
+});
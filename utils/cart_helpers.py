@@ -1,25 +1,63 @@
+import uuid
 from flask import session
 from collections import Counter
 from decimal import Decimal
 
+from models.orders.cart_store import get_cart_store
+
 # ====================== CART HELPERS (SESSION) ======================
+# The cart itself ({product_id: quantity}) lives in the server-side cart
+# store (models/orders/cart_store.py); the session cookie only carries
+# its id under CART_SESSION_KEY.
+
+CART_SESSION_KEY = "cart_id"
+
 
-def get_cart_ids() -> list[int]:
+def get_cart_id(create: bool = False) -> str | None:
     """
-    Read 'cart' list from session.
-    Returns empty list if no cart is present.
+    Cart id of the current session. With create=True a new id is stored
+    in the session if there is none yet (only needed for writes).
     """
-    return session.get("cart", [])
+    cart_id = session.get(CART_SESSION_KEY)
+    # old cookie cart (list of product ids); pop() only if present, it marks the session modified
+    legacy = session.pop("cart") if "cart" in session else None
+    if cart_id is None and (create or legacy):
+        cart_id = uuid.uuid4().hex
+        session[CART_SESSION_KEY] = cart_id
+    if legacy:
+        # move it into the store once
+        store = get_cart_store()
+        for pid, qty in Counter(legacy).items():
+            store.add(cart_id, pid, qty)
+    return cart_id
 
 
-def add_to_cart(product_id: int) -> None:
+def get_cart_counts() -> Counter:
     """
-    Append product_id to the cart list in session.
-    Cart is stored as a simple list of product_ids (may contain duplicates).
+    Cart of the current session as Counter(product_id -> quantity).
+    Empty Counter if no cart is present.
     """
-    cart = session.get("cart", [])
-    cart.append(product_id)
-    session["cart"] = cart
+    cart_id = get_cart_id()
+    if cart_id is None:
+        return Counter()
+    return Counter(get_cart_store().get(cart_id))
+
+
+def add_to_cart(product_id: int, quantity: int = 1) -> int:
+    """Add `quantity` of product_id to the session cart, returns the new quantity."""
+    return get_cart_store().add(get_cart_id(create=True), product_id, quantity)
+
+
+def update_cart_quantity(product_id: int, quantity: int) -> int:
+    """Set the exact quantity of product_id (0 removes it), returns it."""
+    return get_cart_store().set_quantity(get_cart_id(create=True), product_id, quantity)
+
+
+def empty_cart() -> None:
+    """Remove all products from the session cart."""
+    cart_id = get_cart_id()
+    if cart_id is not None:
+        get_cart_store().clear(cart_id)
 
 
 def calculate_cart_total(products, counts: Counter) -> float:
@@ -0,0 +1,375 @@
+"""
+Seeded synthetic data for scale tests of the onlineshop schema.
+
+    python -m utils.datagen --scale 10k --seed 1
+    python -m utils.datagen --scale 1m --seed 1 --end-date 2026-01-01
+    python -m utils.datagen --customers 50000 --products 20000 --orders 300000 --reviews 100000
+
+Same seed + same sizes + same end date -> the same rows (ids included, on
+top of the same existing data), so a measurement can always name the
+command that produced its dataset. Every table has its own random stream,
+so e.g. more reviews do not change the orders.
+
+Distributions:
+  - customers: 25% companies; activity is skewed (few customers place
+    many orders and write many reviews)
+  - products: electronics / clothing / books, log-normal prices per
+    category, Zipf popularity (a few best sellers, long tail) in random
+    id order; brands and authors are skewed too
+  - orders: 1..12 lines (mostly 1-3), mostly quantity 1, dates over
+    --days days before --end-date with more orders in recent months
+  - reviews: popular products get most reviews, ratings lean to 4-5 and
+    are shifted by a per-product quality
+
+Rows go in with multi-row INSERTs (Storage.execute_many), BATCH_SIZE rows
+per statement batch and one commit per batch. At the end the rating
+aggregates and product_read are rebuilt from the new data.
+Needs all migrations in SQL/ (orders.subtotal: orders_history.sql).
+"""
+import argparse
+import itertools
+import math
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from connection.storage import Storage
+from models.products.read_model import ProductReadModel
+from models.reviews.rating_aggregates import RatingAggregates
+
+BATCH_SIZE = 5000
+COMPANY_SHARE = 0.25
+PRODUCT_ZIPF = 1.1           # popularity exponent: weight of rank r = 1 / r**s
+CUSTOMER_SKEW = 0.8          # activity exponent for customers
+COMPANY_DISCOUNT = 0.95      # as in OrderMethods.place_order
+DEFAULT_END_DATE = date(2026, 1, 1)
+
+# --scale presets: customers, products, orders, reviews
+# (order_items are ~2.2 per order, subtype rows 1 per customer / product)
+SCALES = {
+    "10k":  (800, 400, 1_600, 2_400),
+    "100k": (8_000, 4_000, 16_000, 24_000),
+    "1m":   (80_000, 40_000, 160_000, 240_000),
+    "10m":  (800_000, 400_000, 1_600_000, 2_400_000),
+}
+
+CATEGORIES = (("electronics", 0.3), ("clothing", 0.4), ("books", 0.3))
+# category -> (median price, sigma of log price, min, max, weight range kg)
+PRICES = {
+    "electronics": (180.0, 0.9, 9.99, 4999.99, (0.1, 25.0)),
+    "clothing":    (35.0, 0.6, 4.99, 499.99, (0.1, 2.0)),
+    "books":       (16.0, 0.4, 2.99, 149.99, (0.2, 1.5)),
+}
+SIZES = (("XS", 5), ("S", 18), ("M", 30), ("L", 27), ("XL", 14), ("XXL", 6))
+
+FIRST_NAMES = (
+    "Anna", "Markus", "Peter", "Sabine", "Lisa", "Johann", "Maria", "Klaus", "Helga", "Sandra",
+    "Thomas", "Julia", "Stefan", "Katharina", "Michael", "Eva", "Andreas", "Elena", "Lukas", "Sophie",
+)
+LAST_NAMES = (
+    "Müller", "Steiner", "König", "Gruber", "Baum", "Bauer", "Huber", "Berger", "Mayr", "Leitner",
+    "Winkler", "Wagner", "Pichler", "Moser", "Hofer", "Fuchs", "Eder", "Schmid", "Weber", "Lang",
+)
+CITIES = ("Wien", "Graz", "Linz", "Salzburg", "Innsbruck", "Klagenfurt", "Villach", "St. Pölten", "Wels", "Dornbirn")
+STREETS = ("Hauptstr.", "Lindenweg", "Bahnhofstr.", "Gartenweg", "Seeweg", "Feldgasse", "Marktplatz", "Bergstr.")
+COMPANY_SUFFIX = ("GmbH", "OG", "KG", "AG")
+COMPANY_WORDS = ("Tech", "Bio", "Eco", "Smart", "Alpen", "Donau", "Nord", "Media", "Bau", "Logistik")
+
+BRANDS = ("Samsung", "Apple", "Sony", "Lenovo", "HP", "Dell", "Asus", "Philips", "Bosch", "LG",
+          "Xiaomi", "Canon", "Nikon", "JBL", "Logitech", "Acer", "Panasonic", "Garmin", "Dyson", "Huawei")
+DEVICES = ("Laptop", "Smartphone", "Tablet", "Monitor", "Headphones", "Speaker", "Camera", "Smartwatch",
+           "Keyboard", "Mouse", "Router", "TV", "Vacuum", "Printer")
+GARMENTS = ("T-Shirt", "Hoodie", "Jeans", "Jacket", "Dress", "Sweater", "Shirt", "Skirt", "Coat", "Shorts")
+COLORS = ("Black", "White", "Navy", "Grey", "Red", "Green", "Beige", "Blue", "Olive", "Brown")
+TITLE_WORDS = ("Night", "River", "Shadow", "Garden", "Winter", "Code", "Empire", "Silence", "Journey",
+               "Mountain", "Secret", "Light", "Storm", "City", "Memory", "Ocean", "Fire", "Glass")
+COMMENTS = {
+    1: ("Broke after a week.", "Very disappointed.", "Do not buy."),
+    2: ("Not as described.", "Poor quality.", "Expected more."),
+    3: ("Okay for the price.", "Average.", "Does the job."),
+    4: ("Good product.", "Happy with it.", "Works well."),
+    5: ("Excellent!", "Perfect, would buy again.", "Best purchase this year."),
+}
+
+
+def _cum_weights(n: int, exponent: float, rnd: random.Random) -> tuple[list[int], list[float]]:
+    """
+    Zipf-like weights 1/rank**exponent for the indexes 0..n-1 in random
+    order (popular items are not simply the lowest ids). Returns the
+    shuffled indexes and cumulative weights for rnd.choices().
+    """
+    order = list(range(n))
+    rnd.shuffle(order)
+    cum = list(itertools.accumulate(1.0 / (rank + 1) ** exponent for rank in range(n)))
+    return order, cum
+
+
+def _batched(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class DataGenerator:
+    """Generates and bulk-inserts one dataset (ids follow the existing rows)."""
+
+    def __init__(
+        self,
+        customers: int,
+        products: int,
+        orders: int,
+        reviews: int,
+        seed: int = 1,
+        end_date: date = DEFAULT_END_DATE,
+        days: int = 730,
+        batch_size: int = BATCH_SIZE,
+    ):
+        self.customers = customers
+        self.products = products
+        self.orders = orders
+        self.reviews = reviews
+        self.seed = seed
+        self.end = datetime.combine(end_date, datetime.min.time())
+        self.days = days
+        self.batch_size = batch_size
+        self.storage = Storage()
+        self.storage.connect()
+        self.rows: dict[str, int] = {}
+
+        # filled by the customer / product steps, used by orders and reviews
+        self.customer_ids: list[int] = []
+        self.customer_is_company = bytearray()
+        self.product_ids: list[int] = []
+        self.product_prices: list[float] = []
+
+    def _rnd(self, table: str) -> random.Random:
+        return random.Random(f"{self.seed}:{table}")
+
+    def _next_id(self, table: str, column: str) -> int:
+        row = self.storage.fetch_one(f"SELECT COALESCE(MAX({column}), 0) AS m FROM {table}")
+        return (row["m"] if row else 0) + 1
+
+    def _insert(self, table: str, columns: tuple[str, ...], rows, progress=None) -> int:
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        count = 0
+        for batch in _batched(rows, self.batch_size):
+            if self.storage.execute_many(sql, batch) is None:
+                raise RuntimeError(f"Bulk insert into {table} failed (see log).")
+            count += len(batch)
+            if progress:
+                progress(f"  {table}: {count}")
+        self.rows[table] = self.rows.get(table, 0) + count
+        return count
+
+    # ---------- customers ----------
+
+    def generate_customers(self, progress=None) -> None:
+        rnd = self._rnd("customers")
+        first_id = self._next_id("customers", "customer_id")
+        self.customer_ids = list(range(first_id, first_id + self.customers))
+        self.customer_is_company = bytearray(rnd.random() < COMPANY_SHARE for _ in self.customer_ids)
+
+        def customers():
+            for cid, is_company in zip(self.customer_ids, self.customer_is_company):
+                city = rnd.choice(CITIES)
+                address = f"{city}, {rnd.choice(STREETS)} {rnd.randint(1, 120)}"
+                phone = f"+43{rnd.randint(600, 699)}{rnd.randint(1000000, 9999999)}"
+                if is_company:
+                    name = f"{rnd.choice(COMPANY_WORDS)}{rnd.choice(COMPANY_WORDS).lower()} {rnd.choice(COMPANY_SUFFIX)}"
+                    email = f"office{cid}@company.gen.example.com"
+                    kind = "company"
+                else:
+                    first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+                    name = f"{first} {last}"
+                    email = f"{first.lower()}.{cid}@gen.example.com"
+                    kind = "private"
+                yield cid, name, email, address, phone, kind, f"pass{cid}x"
+
+        self._insert("customers", ("customer_id", "name", "email", "address", "phone", "kind", "password"),
+                     customers(), progress)
+
+        def private():
+            for cid, is_company in zip(self.customer_ids, self.customer_is_company):
+                if not is_company:
+                    born = date(1950, 1, 1) + timedelta(days=rnd.randint(0, 365 * 55))
+                    yield cid, born
+
+        def company():
+            for cid, is_company in zip(self.customer_ids, self.customer_is_company):
+                if is_company:
+                    yield cid, f"ATG{cid:010d}"
+
+        self._insert("private_customer", ("customer_id", "birthdate"), private(), progress)
+        self._insert("company_customer", ("customer_id", "company_number"), company(), progress)
+
+    # ---------- products ----------
+
+    def generate_products(self, progress=None) -> None:
+        rnd = self._rnd("products")
+        first_id = self._next_id("product", "product_id")
+        self.product_ids = list(range(first_id, first_id + self.products))
+        names, weights = zip(*CATEGORIES)
+        categories = rnd.choices(names, weights=weights, k=self.products)
+        brand_order, brand_cum = _cum_weights(len(BRANDS), 1.0, rnd)
+        author_count = max(20, self.products // 25)
+        author_order, author_cum = _cum_weights(author_count, 0.9, rnd)
+        size_names, size_weights = zip(*SIZES)
+
+        products, electronics, clothing, books = [], [], [], []
+        self.product_prices = []
+        for pid, category in zip(self.product_ids, categories):
+            median, sigma, low, high, (w_low, w_high) = PRICES[category]
+            price = min(max(math.floor(rnd.lognormvariate(math.log(median), sigma)) + 0.99, low), high)
+            weight = round(rnd.uniform(w_low, w_high), 2)
+            if category == "electronics":
+                brand = BRANDS[rnd.choices(brand_order, cum_weights=brand_cum)[0]]
+                name = f"{brand} {rnd.choice(DEVICES)} {rnd.choice('ABCDEFGHKMXZ')}{rnd.randint(1, 999)}"
+                electronics.append((pid, brand, rnd.choice((1, 1, 2, 2, 2, 3, 5))))
+            elif category == "clothing":
+                name = f"{rnd.choice(COLORS)} {rnd.choice(GARMENTS)} {rnd.randint(100, 9999)}"
+                clothing.append((pid, rnd.choices(size_names, weights=size_weights)[0]))
+            else:
+                author_no = author_order[rnd.choices(range(author_count), cum_weights=author_cum)[0]]
+                author = f"{FIRST_NAMES[author_no % len(FIRST_NAMES)]} {LAST_NAMES[author_no // len(FIRST_NAMES) % len(LAST_NAMES)]} {author_no}"
+                name = f"The {rnd.choice(TITLE_WORDS)} of {rnd.choice(TITLE_WORDS)} {rnd.randint(1, 99)}"
+                books.append((pid, author, int(rnd.lognormvariate(math.log(320), 0.35))))
+            products.append((pid, name[:160], price, weight, category))
+            self.product_prices.append(price)
+
+        self._insert("product", ("product_id", "product", "price", "weight", "category"), products, progress)
+        self._insert("electronics", ("product_id", "brand", "warranty_years"), electronics, progress)
+        self._insert("clothing", ("product_id", "size"), clothing, progress)
+        self._insert("books", ("product_id", "author", "page_count"), books, progress)
+
+    # ---------- orders ----------
+
+    def generate_orders(self, progress=None) -> None:
+        rnd = self._rnd("orders")
+        first_id = self._next_id("orders", "order_id")
+        product_order, product_cum = _cum_weights(len(self.product_ids), PRODUCT_ZIPF, rnd)
+        customer_order, customer_cum = _cum_weights(len(self.customer_ids), CUSTOMER_SKEW, rnd)
+        product_range = range(len(self.product_ids))
+        seconds = self.days * 86400
+
+        for start in range(0, self.orders, self.batch_size):
+            headers, items = [], []
+            for order_id in range(first_id + start, first_id + min(start + self.batch_size, self.orders)):
+                c = customer_order[rnd.choices(range(len(self.customer_ids)), cum_weights=customer_cum)[0]]
+                # 1 line in ~45% of the orders, rarely more than 5
+                lines = min(1 + int(math.log(1 - rnd.random()) / math.log(0.55)), 12)
+                picked = {product_order[i] for i in rnd.choices(product_range, cum_weights=product_cum, k=lines)}
+                subtotal = 0.0
+                for p in sorted(picked):
+                    quantity = rnd.choices((1, 2, 3, 4, 5), weights=(70, 18, 7, 3, 2))[0]
+                    price = self.product_prices[p]
+                    subtotal += price * quantity
+                    items.append((order_id, self.product_ids[p], quantity, price))
+                subtotal = round(subtotal, 2)
+                total = round(subtotal * COMPANY_DISCOUNT, 2) if self.customer_is_company[c] else subtotal
+                # more orders in recent months: age ~ u**1.5
+                order_date = self.end - timedelta(seconds=int(seconds * rnd.random() ** 1.5))
+                headers.append((order_id, self.customer_ids[c], order_date, total, subtotal))
+
+            with self.storage.transaction():
+                self._insert("orders", ("order_id", "customer_id", "order_date", "total", "subtotal"), headers)
+                self._insert("order_items", ("order_id", "product_id", "quantity", "price"), items)
+            if progress:
+                progress(f"  orders: {start + len(headers)}/{self.orders}")
+
+    # ---------- reviews ----------
+
+    def generate_reviews(self, progress=None) -> None:
+        rnd = self._rnd("reviews")
+        product_order, product_cum = _cum_weights(len(self.product_ids), PRODUCT_ZIPF, rnd)
+        customer_order, customer_cum = _cum_weights(len(self.customer_ids), CUSTOMER_SKEW, rnd)
+        quality = [rnd.gauss(0.0, 0.7) for _ in self.product_ids]
+        product_range, customer_range = range(len(self.product_ids)), range(len(self.customer_ids))
+        days = self.days
+
+        def reviews():
+            seen = set()   # one review per customer and product (within the run)
+            made = 0
+            while made < self.reviews:
+                p = product_order[rnd.choices(product_range, cum_weights=product_cum)[0]]
+                c = customer_order[rnd.choices(customer_range, cum_weights=customer_cum)[0]]
+                key = c * len(self.product_ids) + p
+                if key in seen:
+                    continue
+                seen.add(key)
+                rating = min(5, max(1, round(rnd.gauss(3.9 + quality[p], 1.1))))
+                created = (self.end - timedelta(days=int(days * rnd.random() ** 1.5))).date()
+                made += 1
+                yield self.customer_ids[c], self.product_ids[p], rating, rnd.choice(COMMENTS[rating]), created
+
+        self._insert("review", ("customer_id", "product_id", "rating", "comment", "created_at"), reviews(), progress)
+
+    # ---------- all ----------
+
+    def run(self, progress=print) -> dict:
+        started = time.monotonic()
+        if self.customers <= 0 or self.products <= 0:
+            raise ValueError("Need at least one customer and one product.")
+        if self.reviews > self.customers * self.products // 2:
+            raise ValueError("Too many reviews for the number of customers x products.")
+        for step in (self.generate_customers, self.generate_products, self.generate_orders, self.generate_reviews):
+            step_started = time.monotonic()
+            step(progress)
+            progress(f"{step.__name__.removeprefix('generate_')} done in {time.monotonic() - step_started:.1f} s")
+
+        # derived tables
+        RatingAggregates(self.storage).rebuild()
+        product_read = ProductReadModel(self.storage).rebuild()
+        progress(f"rating aggregates and product_read rebuilt ({product_read} products)")
+
+        return {"rows": dict(self.rows), "total_rows": sum(self.rows.values()),
+                "seconds": round(time.monotonic() - started, 1)}
+
+    def close(self):
+        self.storage.disconnect()
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seeded synthetic data for the onlineshop database.")
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="preset sizes (total rows, roughly)")
+    parser.add_argument("--customers", type=int, help="override the preset")
+    parser.add_argument("--products", type=int, help="override the preset")
+    parser.add_argument("--orders", type=int, help="override the preset")
+    parser.add_argument("--reviews", type=int, help="override the preset")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=DEFAULT_END_DATE,
+                        help="orders / reviews lie before this date (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=730, help="time span of orders and reviews")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+    customers, products, orders, reviews = SCALES[args.scale]
+    args.customers = customers if args.customers is None else args.customers
+    args.products = products if args.products is None else args.products
+    args.orders = orders if args.orders is None else args.orders
+    args.reviews = reviews if args.reviews is None else args.reviews
+    return args
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    print(
+        f"Dataset: seed={args.seed} customers={args.customers} products={args.products} "
+        f"orders={args.orders} reviews={args.reviews} end-date={args.end_date} days={args.days}"
+    )
+    generator = DataGenerator(
+        args.customers, args.products, args.orders, args.reviews,
+        seed=args.seed, end_date=args.end_date, days=args.days, batch_size=args.batch_size,
+    )
+    try:
+        result = generator.run()
+    finally:
+        generator.close()
+    for table, count in result["rows"].items():
+        print(f"  {table:<17} {count:>10}")
+    print(f"{result['total_rows']} rows in {result['seconds']} s")
+    print("Reproduce with: python -m utils.datagen " + " ".join(sys.argv[1:]))
@@ -0,0 +1,208 @@
+"""
+On-demand sampling profiler for the running web process.
+
+    curl -H "X-Profiler-Token: $WARENWELT_PROFILER_TOKEN" \\
+         "http://localhost:5000/admin/profile?seconds=20&blueprint=products&format=collapsed" > products.folded
+    flamegraph.pl products.folded > products.svg      # or speedscope.app
+
+For `seconds` the request thread looks at the stacks of all threads that
+are serving a request (optionally only requests of one blueprint) every
+`interval_ms` and counts them. Nothing is instrumented, the other requests
+run at full speed apart from the short stack walks. With `allocations=1`
+tracemalloc runs for the same window and reports the lines that allocated
+the most memory; it traces the whole process and slows every allocation
+down, so it is off by default.
+
+Only requests served by *other threads of the same process* are sampled.
+With gunicorn's default sync workers a worker serves one request at a
+time – the profile request itself – and the profile comes back empty
+(see "warning" in the result). Run the workers with threads:
+
+    gunicorn -w 4 --threads 8 "app:create_app()"       # gthread worker
+
+`seconds` is capped at PROFILE_MAX_SECONDS, below gunicorn's default
+worker timeout of 30 s, so a profile is not killed as a hung request.
+
+The endpoint is off (404) unless PROFILER_TOKEN / WARENWELT_PROFILER_TOKEN
+is set; the token must be sent in the X-Profiler-Token header.
+Only one profile runs at a time per process.
+"""
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from functools import lru_cache
+
+from flask import abort, current_app, jsonify, request, Response
+
+PROFILER_TOKEN = os.environ.get("WARENWELT_PROFILER_TOKEN")   # app.config["PROFILER_TOKEN"] wins
+PROFILER_PATH = "/admin/profile"
+PROFILE_DEFAULT_SECONDS = 10
+PROFILE_MAX_SECONDS = 25           # < gunicorn --timeout (default 30)
+PROFILE_DEFAULT_INTERVAL_MS = 5
+PROFILE_MAX_DEPTH = 128
+ALLOCATION_TOP = 25
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """Project files relative to the project, library files as package/module.py."""
+    path = os.path.abspath(filename)
+    if path.startswith(_PROJECT_ROOT + os.sep) and os.sep + "site-packages" + os.sep not in path:
+        return os.path.relpath(path, _PROJECT_ROOT).replace(os.sep, "/")
+    parts = path.replace(os.sep, "/").rsplit("/", 2)
+    return "/".join(parts[-2:])
+
+
+def _frame_name(code) -> str:
+    return f"{_short_path(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """
+    Stack sampler over sys._current_frames(). `threads` maps thread id ->
+    label (here: blueprint of the request the thread is serving); only
+    those threads are sampled, optionally only one label.
+    """
+
+    def __init__(self, interval: float = PROFILE_DEFAULT_INTERVAL_MS / 1000, max_depth: int = PROFILE_MAX_DEPTH):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def run(self, seconds: float, threads: dict, scope: str | None = None, exclude: set | None = None) -> None:
+        exclude = exclude or set()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident in exclude or ident not in threads:
+                    continue
+                if scope is not None and threads.get(ident) != scope:
+                    continue
+                self.stacks[self._stack(frame)] += 1
+            del frames
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def _stack(self, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            names.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(names))   # root first
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: "root;...;leaf count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _top_allocations(before, after, limit: int = ALLOCATION_TOP) -> list[dict]:
+    stats = after.compare_to(before, "lineno")
+    stats = [s for s in stats if s.size_diff > 0]
+    stats.sort(key=lambda s: s.size_diff, reverse=True)
+    return [
+        {
+            "location": f"{_short_path(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+            "size_kib": round(s.size_diff / 1024, 1),
+            "count": s.count_diff,
+        }
+        for s in stats[:limit]
+    ]
+
+
+class Profiler:
+    """
+    Flask extension (profiler.init_app(app)):
+      - before/teardown_request hooks: which thread serves which blueprint
+      - GET /admin/profile?seconds=&blueprint=&interval_ms=&allocations=0|1&format=json|collapsed
+    """
+
+    def __init__(self):
+        self._active: dict[int, str] = {}    # thread id -> blueprint ("" = app route)
+        self._running = threading.Lock()
+
+    def init_app(self, app) -> None:
+        app.before_request(self._request_started)
+        app.teardown_request(self._request_finished)
+        app.add_url_rule(PROFILER_PATH, "profile", self.profile_view)
+
+    def _request_started(self) -> None:
+        self._active[threading.get_ident()] = request.blueprint or ""
+
+    def _request_finished(self, exc=None) -> None:
+        self._active.pop(threading.get_ident(), None)
+
+    def _check_token(self) -> None:
+        token = current_app.config.get("PROFILER_TOKEN") or PROFILER_TOKEN
+        if not token:
+            abort(404)
+        sent = request.headers.get("X-Profiler-Token", "")
+        if not hmac.compare_digest(sent.encode(), token.encode()):
+            abort(403)
+
+    def profile_view(self):
+        self._check_token()
+
+        seconds = min(max(request.args.get("seconds", PROFILE_DEFAULT_SECONDS, type=float), 0.1), PROFILE_MAX_SECONDS)
+        interval_ms = max(request.args.get("interval_ms", PROFILE_DEFAULT_INTERVAL_MS, type=float), 1.0)
+        scope = request.args.get("blueprint") or None
+        allocations = request.args.get("allocations") == "1"
+        if scope is not None:
+            scope = scope.removesuffix("_bp")
+            if scope not in current_app.blueprints:
+                abort(400, f"Unknown blueprint {scope!r}, known: {', '.join(sorted(current_app.blueprints))}")
+
+        if not self._running.acquire(blocking=False):
+            abort(409, "A profile is already running in this process.")
+        try:
+            profile = self.profile(seconds, interval_ms / 1000, scope, allocations)
+        finally:
+            self._running.release()
+
+        if request.args.get("format") == "collapsed":
+            return Response(profile["collapsed"], mimetype="text/plain")
+        return jsonify(profile)
+
+    def profile(self, seconds: float, interval: float, scope: str | None = None, allocations: bool = False) -> dict:
+        started_tracing = allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot() if allocations else None
+
+        sampler = SamplingProfiler(interval)
+        sampler.run(seconds, self._active, scope, exclude={threading.get_ident()})
+
+        top = None
+        if allocations:
+            after = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            top = _top_allocations(before.filter_traces(filters), after.filter_traces(filters))
+
+        result = {
+            "seconds": seconds,
+            "interval_ms": round(interval * 1000, 1),
+            "blueprint": scope,
+            "samples": sampler.samples,
+            "stack_samples": sum(sampler.stacks.values()),
+            "collapsed": sampler.collapsed(),
+            "allocations": top,
+        }
+        if not sampler.stacks:
+            result["warning"] = (
+                "No other request was running in this process. Sync workers serve one "
+                "request at a time; run gunicorn with --threads N (gthread) to profile."
+            )
+        return result
+
+
+# one instance per process, see create_app() in app.py
+profiler = Profiler()
@@ -0,0 +1,215 @@
+"""
+Per-request performance profile of the web app.
+
+For every request: number of Storage statements, DB time (both from
+connection/instrumentation.py), Jinja render time (render_template) and
+wall time. Sent back as headers
+
+    Server-Timing: db;dur=12.4;desc="7 queries", render;dur=3.1, total;dur=21.0
+    X-DB-Queries: 7
+    X-DB-Time-ms: 12.4
+
+and kept per endpoint: rolling quantiles over the last REQUEST_WINDOW
+requests plus running totals, served by GET /metrics in Prometheus text
+format. The numbers are per process – with several workers every worker
+reports its own.
+
+/metrics is off (404) unless METRICS_TOKEN / WARENWELT_METRICS_TOKEN is
+set; the scraper sends the token as "Authorization: Bearer <token>"
+(Prometheus: `authorization: {credentials: ...}`) or in X-Metrics-Token.
+The client address is not trusted – behind a reverse proxy every request
+comes from 127.0.0.1.
+"""
+import hmac
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from flask import Response, abort, before_render_template, current_app, g, request, template_rendered
+
+from connection.instrumentation import query_stats
+
+REQUEST_WINDOW = 1000            # requests per endpoint for the rolling quantiles
+QUANTILES = (0.5, 0.9, 0.99)
+METRICS_TOKEN = os.environ.get("WARENWELT_METRICS_TOKEN")     # app.config["METRICS_TOKEN"] wins
+METRICS_PATH = "/metrics"
+METRICS_TOP_STATEMENTS = 50      # SQL fingerprints exported from query_stats
+
+# metric name -> (sample field, divisor, help text)
+_SUMMARIES = {
+    "warenwelt_request_seconds": ("wall_ms", 1000.0, "Wall time per request."),
+    "warenwelt_request_db_seconds": ("db_ms", 1000.0, "Time spent in Storage statements per request."),
+    "warenwelt_request_render_seconds": ("render_ms", 1000.0, "Jinja template render time per request."),
+    "warenwelt_request_db_queries": ("queries", 1.0, "Storage statements per request."),
+}
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _quantile(values: list[float], q: float) -> float:
+    """Nearest-rank quantile of sorted values: the ceil(q * n)-th smallest."""
+    if not values:
+        return 0.0
+    return values[min(len(values), max(math.ceil(q * len(values)), 1)) - 1]
+
+
+class RequestMetrics:
+    """
+    Flask extension (request_metrics.init_app(app)):
+      - before/after_request hooks: timing + Server-Timing header
+      - template signals: render time
+      - /metrics route
+    """
+
+    def __init__(self, window: int = REQUEST_WINDOW):
+        self.window = window
+        self._samples: dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._totals: dict[str, dict] = defaultdict(
+            lambda: {"count": 0, "wall_ms": 0.0, "db_ms": 0.0, "render_ms": 0.0, "queries": 0}
+        )
+        self._status: dict[tuple[str, int], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        app.add_url_rule(METRICS_PATH, "metrics", self.metrics_view)
+
+    # ---------- per request ----------
+
+    def _start(self) -> None:
+        g.request_started = time.perf_counter()
+        g.render_ms = 0.0
+        query_stats.start_request()
+
+    def _render_started(self, sender, template, context, **extra) -> None:
+        g.render_started = time.perf_counter()
+
+    def _render_finished(self, sender, template, context, **extra) -> None:
+        started = g.pop("render_started", None)
+        if started is not None:
+            g.render_ms = g.get("render_ms", 0.0) + (time.perf_counter() - started) * 1000
+
+    def _finish(self, response):
+        summary = query_stats.request_summary()
+        started = g.get("request_started")
+        wall_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        render_ms = g.get("render_ms", 0.0)
+
+        g.db_queries = summary["count"]
+        g.db_time_ms = summary["total_ms"]
+
+        response.headers["X-DB-Queries"] = str(summary["count"])
+        response.headers["X-DB-Time-ms"] = f"{summary['total_ms']:.1f}"
+        response.headers["Server-Timing"] = (
+            f'db;dur={summary["total_ms"]:.1f};desc="{summary["count"]} queries", '
+            f"render;dur={render_ms:.1f}, "
+            f"total;dur={wall_ms:.1f}"
+        )
+
+        endpoint = request.endpoint or "unmatched"
+        if endpoint != "metrics":
+            self.record(endpoint, response.status_code, wall_ms, summary["total_ms"], render_ms, summary["count"])
+        return response
+
+    def record(self, endpoint: str, status: int, wall_ms: float, db_ms: float, render_ms: float, queries: int) -> None:
+        sample = {"wall_ms": wall_ms, "db_ms": db_ms, "render_ms": render_ms, "queries": queries}
+        with self._lock:
+            self._samples[endpoint].append(sample)
+            totals = self._totals[endpoint]
+            totals["count"] += 1
+            for key, value in sample.items():
+                totals[key] += value
+            self._status[(endpoint, status)] += 1
+
+    # ---------- reports ----------
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Per endpoint: {"count", "<field>_total", "<field>_p50/_p90/_p99"}
+        for wall_ms, db_ms, render_ms and queries (quantiles over the window).
+        """
+        with self._lock:
+            samples = {endpoint: list(window) for endpoint, window in self._samples.items()}
+            totals = {endpoint: dict(t) for endpoint, t in self._totals.items()}
+
+        result = {}
+        for endpoint, window in samples.items():
+            entry = {"count": totals[endpoint]["count"]}
+            for field in ("wall_ms", "db_ms", "render_ms", "queries"):
+                values = sorted(s[field] for s in window)
+                entry[f"{field}_total"] = totals[endpoint][field]
+                for q in QUANTILES:
+                    entry[f"{field}_p{int(q * 100)}"] = _quantile(values, q)
+            result[endpoint] = entry
+        return result
+
+    def prometheus(self) -> str:
+        """All metrics in Prometheus text exposition format (0.0.4)."""
+        snapshot = self.snapshot()
+        with self._lock:
+            status = dict(self._status)
+        lines: list[str] = []
+
+        lines.append("# HELP warenwelt_requests_total Handled requests.")
+        lines.append("# TYPE warenwelt_requests_total counter")
+        for (endpoint, code), count in sorted(status.items()):
+            lines.append(f'warenwelt_requests_total{{endpoint="{_label(endpoint)}",status="{code}"}} {count}')
+
+        for name, (field, divisor, help_text) in _SUMMARIES.items():
+            lines.append(f"# HELP {name} {help_text} Quantiles over the last {self.window} requests.")
+            lines.append(f"# TYPE {name} summary")
+            for endpoint, entry in sorted(snapshot.items()):
+                label = f'endpoint="{_label(endpoint)}"'
+                for q in QUANTILES:
+                    value = entry[f"{field}_p{int(q * 100)}"] / divisor
+                    lines.append(f'{name}{{{label},quantile="{q}"}} {round(value, 6)}')
+                lines.append(f"{name}_sum{{{label}}} {round(entry[f'{field}_total'] / divisor, 6)}")
+                lines.append(f"{name}_count{{{label}}} {entry['count']}")
+
+        # which statements the time goes to (all requests + CLI use of this process)
+        statements = query_stats.top(METRICS_TOP_STATEMENTS)
+        lines.append("# HELP warenwelt_db_statement_calls_total Executions per SQL fingerprint.")
+        lines.append("# TYPE warenwelt_db_statement_calls_total counter")
+        for entry in statements:
+            lines.append(f'warenwelt_db_statement_calls_total{{statement="{_label(entry["fingerprint"])}"}} {entry["count"]}')
+        lines.append("# HELP warenwelt_db_statement_seconds_total Time per SQL fingerprint.")
+        lines.append("# TYPE warenwelt_db_statement_seconds_total counter")
+        for entry in statements:
+            lines.append(
+                f'warenwelt_db_statement_seconds_total{{statement="{_label(entry["fingerprint"])}"}} '
+                f"{round(entry['total_ms'] / 1000, 6)}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def _check_token(self) -> None:
+        token = current_app.config.get("METRICS_TOKEN") or METRICS_TOKEN
+        if not token:
+            abort(404)
+        sent = request.headers.get("X-Metrics-Token", "")
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            sent = auth[len("Bearer "):]
+        if not hmac.compare_digest(sent.encode(), token.encode()):
+            abort(403)
+
+    def metrics_view(self):
+        self._check_token()
+        return Response(self.prometheus(), mimetype="text/plain; version=0.0.4")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._status.clear()
+
+
+# one instance per process, see create_app() in app.py
+request_metrics = RequestMetrics()
@@ -0,0 +1,57 @@
+"""
+Model services (ProductMethods, OrderMethods, ...) for the controllers.
+
+They are created on first use and kept on flask.g, i.e. per app context:
+nothing is built at import time, the database is only touched by the
+first query of a request, and every worker process / thread works with
+its own instances. The module-level names in the controllers are
+LocalProxy objects pointing here:
+
+    pm = LocalProxy(get_product_methods)
+"""
+from flask import g
+
+from models.customers.customer_methods import CustomerMethods
+from models.orders.order_methods import OrderMethods
+from models.products.product_methods import ProductMethods
+from models.reviews.review_methods import ReviewMethods
+
+# g attribute -> class
+_SERVICES = {
+    "product_methods": ProductMethods,
+    "order_methods": OrderMethods,
+    "customer_methods": CustomerMethods,
+    "review_methods": ReviewMethods,
+}
+
+
+def _service(name: str):
+    service = g.get(name)
+    if service is None:
+        service = _SERVICES[name]()
+        setattr(g, name, service)
+    return service
+
+
+def get_product_methods() -> ProductMethods:
+    return _service("product_methods")
+
+
+def get_order_methods() -> OrderMethods:
+    return _service("order_methods")
+
+
+def get_customer_methods() -> CustomerMethods:
+    return _service("customer_methods")
+
+
+def get_review_methods() -> ReviewMethods:
+    return _service("review_methods")
+
+
+def close_services(exc=None) -> None:
+    """teardown_appcontext: give back a connection a failed request still holds."""
+    for name in _SERVICES:
+        service = g.pop(name, None)
+        if service is not None:
+            service.storage.disconnect()
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("flask")
+
+from utils.request_metrics import RequestMetrics, _quantile
+
+
+def test_quantile_of_no_values_is_zero():
+    assert _quantile([], 0.5) == 0.0
+
+
+def test_quantile_of_one_value():
+    assert [_quantile([7.0], q) for q in (0.0, 0.5, 0.99, 1.0)] == [7.0] * 4
+
+
+@pytest.mark.parametrize(
+    "q, expected",
+    [(0.0, 1), (0.25, 1), (0.5, 2), (0.75, 3), (0.9, 4), (1.0, 4)],
+)
+def test_quantile_nearest_rank(q, expected):
+    assert _quantile([1, 2, 3, 4], q) == expected
+
+
+def test_p99_of_hundred_values_is_not_the_maximum():
+    values = list(range(1, 101))
+    assert _quantile(values, 0.5) == 50
+    assert _quantile(values, 0.9) == 90
+    assert _quantile(values, 0.99) == 99
+
+
+def test_snapshot_uses_the_window():
+    metrics = RequestMetrics(window=3)
+    for wall_ms in (100.0, 1.0, 2.0, 3.0):
+        metrics.record("products.product_list", 200, wall_ms, 0.0, 0.0, 1)
+    entry = metrics.snapshot()["products.product_list"]
+    assert entry["count"] == 4
+    assert entry["wall_ms_total"] == 106.0
+    assert entry["wall_ms_p50"] == 2.0      # 100 ms fell out of the window
+    assert entry["wall_ms_p99"] == 3.0
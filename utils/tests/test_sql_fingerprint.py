@@ -0,0 +1,36 @@
+import pytest
+
+from connection.instrumentation import fingerprint
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        ("SELECT * FROM product WHERE product_id = %s", "SELECT * FROM product WHERE product_id = ?"),
+        ("SELECT a FROM t WHERE b = %(b)s", "SELECT a FROM t WHERE b = ?"),
+        ("SELECT * FROM t WHERE price > 12.5 LIMIT 10", "SELECT * FROM t WHERE price > ? LIMIT ?"),
+        ("SELECT * FROM c WHERE name = 'Anna' OR name = \"Bob\"", "SELECT * FROM c WHERE name = ? OR name = ?"),
+        ("SELECT * FROM c WHERE name = 'O''Brien' AND city = 'Köln'", "SELECT * FROM c WHERE name = ? AND city = ?"),
+        ("SELECT * FROM c WHERE note = 'it\\'s' AND id = 3", "SELECT * FROM c WHERE note = ? AND id = ?"),
+        ("SELECT  a,\n       b\n  FROM t\n WHERE c = %s  ", "SELECT a, b FROM t WHERE c = ?"),
+    ],
+)
+def test_literals_and_whitespace(sql, expected):
+    assert fingerprint(sql) == expected
+
+
+def test_identifiers_with_digits_are_kept():
+    assert fingerprint("SELECT col2 FROM t2") == "SELECT col2 FROM t2"
+
+
+def test_in_lists_of_any_length_are_one_statement():
+    one = fingerprint("SELECT * FROM product WHERE product_id IN (%s)")
+    three = fingerprint("SELECT * FROM product WHERE product_id IN (%s, %s, %s)")
+    literal = fingerprint("SELECT * FROM product WHERE product_id IN (1,2,3,4)")
+    assert one == three == literal == "SELECT * FROM product WHERE product_id IN (...)"
+
+
+def test_multi_row_insert_is_one_statement():
+    single = fingerprint("INSERT INTO t (a, b) VALUES (%s, %s)")
+    multi = fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)")
+    assert single == multi == "INSERT INTO t (a, b) VALUES (...)"